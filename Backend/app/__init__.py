@@ -19,6 +19,42 @@ def create_app():
     jwt.init_app(app)
     CORS(app)
 
+    from app.utils import auth_utils
+    from app.utils.dispatch import dispatcher
+    from app.utils.passwords import hasher
+    auth_utils.init_app(app)
+    dispatcher.init_app(app)
+    hasher.init_app(app)
+
+    # Keep aggregate tables in step with financial writes
+    from app.utils import arrears, balances, journal, ledger, rollups
+    ledger.register_listeners()
+    balances.register_listeners()
+    journal.register_listeners()
+    rollups.register_listeners()
+    arrears.register_listeners()
+    app.cli.add_command(ledger.ledger_cli)
+    app.cli.add_command(balances.balances_cli)
+    app.cli.add_command(journal.journal_cli)
+    app.cli.add_command(arrears.rent_cli)
+
+    from app.utils.sla import maintenance_cli
+    app.cli.add_command(maintenance_cli)
+
+    from app.utils import search
+    search.register_listeners()
+    app.cli.add_command(search.minutes_cli)
+
+    from app.utils.idempotency import idempotency_cli
+    app.cli.add_command(idempotency_cli)
+
+    from app.utils.response_cache import response_cache
+    response_cache.init_app(app)
+
+    # Periodic jobs: `flask loans scan` from cron, or one `flask loans schedule` process
+    from app.utils.loan_scanner import loans_cli
+    app.cli.add_command(loans_cli)
+
     # Register Blueprints
     from app.routes.auth import auth_bp
     from app.routes.loan import loan_bp 
@@ -28,6 +64,7 @@ def create_app():
     from app.routes.report import report_bp
     from app.routes.user import user_bp
     from app.routes.maintances import maintenance_bp
+    from app.routes.rent import rent_bp
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
     app.register_blueprint(loan_bp, url_prefix="/api/loan")
@@ -37,6 +74,7 @@ def create_app():
     app.register_blueprint(report_bp, url_prefix="/api/report")
     app.register_blueprint(user_bp, url_prefix="/api/user")
     app.register_blueprint(maintenance_bp, url_prefix="/api/maintenance") 
+    app.register_blueprint(rent_bp, url_prefix="/api/rent")
 
 
     # Optional: Global error handler
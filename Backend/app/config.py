@@ -9,8 +9,54 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite:///tustahimili.db")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Password hashing: bcrypt cost factor and the size of its worker pool
+    BCRYPT_LOG_ROUNDS = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+    BCRYPT_WORKERS = int(os.environ.get("BCRYPT_WORKERS", 2))
+    BCRYPT_QUEUE_SIZE = int(os.environ.get("BCRYPT_QUEUE_SIZE", 32))
+    BCRYPT_TIMEOUT = int(os.environ.get("BCRYPT_TIMEOUT", 30))  # seconds
+    # Separate pool for bulk member imports, so they never queue ahead of logins
+    BCRYPT_BULK_WORKERS = int(os.environ.get("BCRYPT_BULK_WORKERS", 2))
+    BCRYPT_BULK_TIMEOUT = int(os.environ.get("BCRYPT_BULK_TIMEOUT", 60))  # seconds per import
+
     # Optional: JWT token expiration (e.g., 2 days)
     JWT_ACCESS_TOKEN_EXPIRES = 172800  # seconds
 
+    # EventSource cannot set headers, so the notification stream also accepts ?jwt=
+    JWT_TOKEN_LOCATION = ["headers", "query_string"]
+
+    # Authenticated user/role cache used by role_required
+    PRINCIPAL_CACHE_SIZE = int(os.environ.get("PRINCIPAL_CACHE_SIZE", 4096))
+    PRINCIPAL_CACHE_TTL = int(os.environ.get("PRINCIPAL_CACHE_TTL", 60))  # seconds
+
     # Optional: Frontend CORS control
     CORS_HEADERS = "Content-Type"
+
+    # In-process report response cache (entries, LRU-evicted). Table versions
+    # are per process too: a write in another worker or a CLI job does not
+    # invalidate this worker's entries, so run one worker or disable it
+    RESPONSE_CACHE_ENABLED = os.environ.get("RESPONSE_CACHE_ENABLED", "1") == "1"
+    RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 512))
+
+    # Notification dispatch: queue notification writes off the request path
+    NOTIFY_ASYNC = os.environ.get("NOTIFY_ASYNC", "1") == "1"
+    NOTIFY_WORKERS = int(os.environ.get("NOTIFY_WORKERS", 2))
+    NOTIFY_BATCH_SIZE = int(os.environ.get("NOTIFY_BATCH_SIZE", 500))
+    NOTIFY_QUEUE_MAXSIZE = int(os.environ.get("NOTIFY_QUEUE_MAXSIZE", 10000))
+
+    # Idempotency-Key: how long a stored response is replayed, and how long
+    # an unfinished request holds its key before a retry may take over
+    IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", 86400))  # seconds
+    IDEMPOTENCY_LOCK_TIMEOUT = int(os.environ.get("IDEMPOTENCY_LOCK_TIMEOUT", 60))  # seconds
+
+    # Loan eligibility: borrow up to MULTIPLIER x savings minus outstanding loans
+    LOAN_ELIGIBILITY_MULTIPLIER = float(os.environ.get("LOAN_ELIGIBILITY_MULTIPLIER", 3))
+    # Also subtract loan requests still awaiting a decision
+    LOAN_ELIGIBILITY_COUNT_PENDING = os.environ.get("LOAN_ELIGIBILITY_COUNT_PENDING", "1") == "1"
+
+    # Overdue-loan scanner: `flask loans schedule` runs a scan every N seconds (default hourly)
+    LOAN_SCAN_INTERVAL = int(os.environ.get("LOAN_SCAN_INTERVAL", 3600))
+    LOAN_SCAN_DAYS = int(os.environ.get("LOAN_SCAN_DAYS", 3))
+
+    # Server-Sent Events notification stream
+    NOTIFY_STREAM_HEARTBEAT = int(os.environ.get("NOTIFY_STREAM_HEARTBEAT", 15))  # seconds
+    NOTIFY_STREAM_LOOKBACK = int(os.environ.get("NOTIFY_STREAM_LOOKBACK", 30))  # seconds
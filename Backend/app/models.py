@@ -30,6 +30,8 @@ class User(db.Model):
     password_hash = db.Column(db.String(128), nullable=False)
     role_id = db.Column(db.Integer, db.ForeignKey('role.id'), nullable=False)
     person_id = db.Column(db.Integer, db.ForeignKey('person.id'), nullable=False)
+    # Broadcasts sent before this are not in the user's inbox (NULL: accounts older than the column)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=True)
 
     role = db.relationship('Role')
     notifications = db.relationship('Notification', backref='user', lazy=True, cascade="all, delete-orphan")
@@ -48,10 +50,25 @@ class Contribution(db.Model):
     payment_method = db.Column(db.String(50), nullable=False)
     receipt_code = db.Column(db.String(50), nullable=True)
 
+    __table_args__ = (
+        # A receipt can only be recorded once per payment method
+        db.Index(
+            "uq_contribution_receipt", "payment_method", "receipt_code", unique=True,
+            sqlite_where=db.text("receipt_code IS NOT NULL AND receipt_code <> ''"),
+            postgresql_where=db.text("receipt_code IS NOT NULL AND receipt_code <> ''"),
+        ),
+    )
+
     def __repr__(self):
         return f"<Contribution {self.amount} by Person ID {self.person_id}>"
 
 # -------------------- Loans --------------------
+# Loan statuses whose amount counts as money lent out
+LOAN_ISSUED_STATUSES = ("approved", "overdue", "repaid")
+# Loan statuses that still have a balance to collect
+LOAN_OPEN_STATUSES = ("approved", "overdue")
+
+
 class Loan(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(db.Float, nullable=False)
@@ -62,12 +79,39 @@ class Loan(db.Model):
     status = db.Column(db.String(30), default="pending")
     due_date = db.Column(db.Date)
     interest = db.Column(db.Float, default=0.0)  # Added for reporting
-    repayment_amount = db.Column(db.Float, default=0.0)  # Added for reporting
+    # Running total of this loan's LoanRepayment rows, kept in step by repay_loan;
+    # every balance, report and the portfolio read this column
+    repayment_amount = db.Column(db.Float, default=0.0)
+    installments = db.Column(db.Integer, default=1, nullable=False)  # monthly, last one on due_date
+    reminded_at = db.Column(db.DateTime, nullable=True)  # due-soon reminder sent by the loan scan
     person_id = db.Column(db.Integer, db.ForeignKey('person.id'), nullable=False)
 
+    repayments = db.relationship('LoanRepayment', backref='loan', lazy=True, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Due-date sweeps: status = 'approved' AND due_date BETWEEN ...
+        db.Index("ix_loan_status_due_date", "status", "due_date"),
+        # Loan book listing: newest first, optionally filtered by status
+        db.Index("ix_loan_request_date", "request_date"),
+        db.Index("ix_loan_status_request_date", "status", "request_date"),
+    )
+
     def __repr__(self):
         return f"<Loan {self.amount} to Person ID {self.person_id}>"
 
+
+class LoanRepayment(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    loan_id = db.Column(db.Integer, db.ForeignKey('loan.id'), nullable=False, index=True)
+    amount = db.Column(db.Float, nullable=False)
+    paid_date = db.Column(db.Date, default=datetime.utcnow)
+    payment_method = db.Column(db.String(50), nullable=False, default="M-Pesa")
+    receipt_code = db.Column(db.String(50), nullable=True)
+    recorded_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+
+    def __repr__(self):
+        return f"<LoanRepayment {self.amount} for Loan ID {self.loan_id}>"
+
 # -------------------- Meetings --------------------
 class Meeting(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -78,6 +122,10 @@ class Meeting(db.Model):
 
     minutes = db.relationship('Minute', backref='meeting', lazy=True, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        db.Index("ix_meeting_date", "date"),
+    )
+
     def __repr__(self):
         return f"<Meeting on {self.date} at {self.location}>"
 
@@ -101,9 +149,51 @@ class Notification(db.Model):
     is_read = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Keyset pagination of a user's inbox: (user_id, created_at, id)
+        db.Index("ix_notification_user_created", "user_id", "created_at", "id"),
+        # Unread counter only touches unread rows
+        db.Index(
+            "ix_notification_unread", "user_id",
+            sqlite_where=db.text("is_read = 0"),
+            postgresql_where=db.text("is_read = false"),
+        ),
+    )
+
     def __repr__(self):
         return f"<Notification to User ID {self.user_id}>"
 
+class BroadcastNotification(db.Model):
+    """One row per announcement sent to every member (meetings, minutes)."""
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(120), nullable=False)
+    message = db.Column(db.Text, nullable=False)
+    created_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    receipts = db.relationship('BroadcastReceipt', backref='broadcast', lazy=True, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        db.Index("ix_broadcast_notification_created", "created_at", "id"),
+    )
+
+    def __repr__(self):
+        return f"<BroadcastNotification {self.title}>"
+
+
+class BroadcastReceipt(db.Model):
+    """Marks a broadcast as read by one user; absence means unread."""
+    broadcast_id = db.Column(db.Integer, db.ForeignKey('broadcast_notification.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    read_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.Index("ix_broadcast_receipt_user", "user_id"),
+    )
+
+    def __repr__(self):
+        return f"<BroadcastReceipt {self.broadcast_id} read by User ID {self.user_id}>"
+
 # -------------------- Property & Rent --------------------
 class Property(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -111,6 +201,7 @@ class Property(db.Model):
     location = db.Column(db.String(200), nullable=True)         
     monthly_rent = db.Column(db.Float, nullable=False)          
     is_occupied = db.Column(db.Boolean, default=True)
+    occupied_since = db.Column(db.Date, nullable=True)  # let date: rent is due from this month on
     tenant_name = db.Column(db.String(100), nullable=True)
     tenant_phone = db.Column(db.String(20), nullable=True)
 
@@ -130,9 +221,44 @@ class RentPayment(db.Model):
     receipt_code = db.Column(db.String(50), nullable=True)
     notes = db.Column(db.String(200), nullable=True)
 
+    __table_args__ = (
+        db.Index(
+            "uq_rent_payment_receipt", "payment_method", "receipt_code", unique=True,
+            sqlite_where=db.text("receipt_code IS NOT NULL AND receipt_code <> ''"),
+            postgresql_where=db.text("receipt_code IS NOT NULL AND receipt_code <> ''"),
+        ),
+    )
+
     def __repr__(self):
         return f"<RentPayment {self.amount} for Property ID {self.property_id}>"
 
+class RentInvoice(db.Model):
+    """Rent due from one property for one month, and what has been paid against it.
+
+    Generated by `flask rent invoices` for occupied properties, from the
+    month they were let; amount_paid is kept in step with RentPayment
+    writes. Invoiced months are served from here instead of re-aggregating
+    payments.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    property_id = db.Column(db.Integer, db.ForeignKey('property.id'), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # 'YYYY-MM'
+    amount_due = db.Column(db.Float, nullable=False)
+    amount_paid = db.Column(db.Float, nullable=False, default=0.0)
+    tenant_name = db.Column(db.String(100), nullable=True)
+    tenant_phone = db.Column(db.String(20), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    property = db.relationship('Property', backref=db.backref('invoices', lazy=True, cascade="all, delete-orphan"))
+
+    __table_args__ = (
+        db.UniqueConstraint("property_id", "month", name="uq_rent_invoice_property_month"),
+        db.Index("ix_rent_invoice_month", "month"),
+    )
+
+    def __repr__(self):
+        return f"<RentInvoice {self.month} for Property ID {self.property_id}>"
+
 # -------------------- Maintenance Requests --------------------
 class MaintenanceRequest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -143,5 +269,168 @@ class MaintenanceRequest(db.Model):
     resolved_date = db.Column(db.DateTime, nullable=True)
     resolution_notes = db.Column(db.String(255), nullable=True)
 
+    __table_args__ = (
+        # Queue listing and open-request metrics: status = ... ORDER BY reported_date
+        db.Index("ix_maintenance_request_status_reported", "status", "reported_date"),
+    )
+
     def __repr__(self):
         return f"<MaintenanceRequest for Property ID {self.property_id}>"
+
+
+class ResolutionSketch(db.Model):
+    """Log-bucketed histogram of time-to-resolve, per property (0 = all properties).
+
+    Each resolved request adds one to the bucket its duration falls in, so
+    percentiles are read from a few dozen rows instead of the request history.
+    """
+    property_id = db.Column(db.Integer, primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ResolutionSketch property={self.property_id} bucket={self.bucket}>"
+
+# -------------------- Ledger Totals --------------------
+class LedgerTotals(db.Model):
+    """Running group-wide totals, kept in step with every financial write.
+
+    A single row (id=1) updated in the same transaction as the
+    contribution, loan or rent payment that changes it.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    total_contributions = db.Column(db.Float, nullable=False, default=0.0)
+    total_loans_issued = db.Column(db.Float, nullable=False, default=0.0)
+    total_loan_interest = db.Column(db.Float, nullable=False, default=0.0)
+    total_rent = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<LedgerTotals contributions={self.total_contributions}>"
+
+
+# -------------------- Report Rollups --------------------
+class ReportRollup(db.Model):
+    """Cached monthly total of one report series for a closed month.
+
+    ``person_id`` is 0 for the group-wide series. Rows are deleted whenever
+    a write lands in their month, and recomputed on the next read.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    series = db.Column(db.String(30), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM
+    person_id = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0.0)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint("series", "person_id", "month", name="uq_report_rollup_series_person_month"),
+    )
+
+    def __repr__(self):
+        return f"<ReportRollup {self.series} {self.month}>"
+
+
+# -------------------- Member Balances --------------------
+class MemberBalance(db.Model):
+    """Per-member running balances used for loan eligibility.
+
+    Updated in the same transaction as the contribution or loan write
+    that changes them, so eligibility checks never scan history.
+    """
+    person_id = db.Column(db.Integer, db.ForeignKey('person.id'), primary_key=True)
+    savings = db.Column(db.Float, nullable=False, default=0.0)      # sum of contributions
+    outstanding = db.Column(db.Float, nullable=False, default=0.0)  # amount + interest - repaid on open loans
+    pending = db.Column(db.Float, nullable=False, default=0.0)      # loan requests awaiting a decision
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<MemberBalance person={self.person_id} savings={self.savings}>"
+
+
+# -------------------- Journal --------------------
+class JournalEntry(db.Model):
+    """One balanced financial event. Append-only: corrections are new entries."""
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    source_type = db.Column(db.String(30), nullable=False)   # contribution, loan, rent_payment
+    source_id = db.Column(db.Integer, nullable=False)
+    memo = db.Column(db.String(200), nullable=True)
+
+    lines = db.relationship('JournalLine', backref='entry', lazy=True)
+
+    __table_args__ = (
+        db.Index("ix_journal_entry_source", "source_type", "source_id"),
+    )
+
+    def __repr__(self):
+        return f"<JournalEntry {self.id} {self.source_type} #{self.source_id}>"
+
+
+class JournalLine(db.Model):
+    """A debit (positive) or credit (negative) in integer cents; an entry's lines sum to zero."""
+    id = db.Column(db.Integer, primary_key=True)
+    entry_id = db.Column(db.Integer, db.ForeignKey('journal_entry.id'), nullable=False, index=True)
+    account = db.Column(db.String(30), nullable=False)
+    person_id = db.Column(db.Integer, nullable=False, default=0)  # 0 = not tied to a member
+    amount_cents = db.Column(db.BigInteger, nullable=False)
+
+    __table_args__ = (
+        # Balance tails: lines for an account after a snapshot's last entry
+        db.Index("ix_journal_line_account_entry", "account", "person_id", "entry_id"),
+    )
+
+    def __repr__(self):
+        return f"<JournalLine {self.account} {self.amount_cents}>"
+
+
+class AccountSnapshot(db.Model):
+    """Balance of every (account, member) as of a journal entry, so reads only sum the tail after it."""
+    id = db.Column(db.Integer, primary_key=True)
+    through_entry_id = db.Column(db.Integer, nullable=False)
+    account = db.Column(db.String(30), nullable=False)
+    person_id = db.Column(db.Integer, nullable=False, default=0)
+    balance_cents = db.Column(db.BigInteger, nullable=False)
+    taken_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("through_entry_id", "account", "person_id", name="uq_account_snapshot"),
+    )
+
+    def __repr__(self):
+        return f"<AccountSnapshot {self.account} @ {self.through_entry_id}>"
+
+
+# -------------------- Idempotent Requests --------------------
+class IdempotencyKey(db.Model):
+    """The stored response to a POST sent with an Idempotency-Key header.
+
+    A row with no status_code is a request still in flight.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    key = db.Column(db.String(100), nullable=False)
+    endpoint = db.Column(db.String(100), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "key", name="uq_idempotency_user_key"),
+    )
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.key} for User ID {self.user_id}>"
+
+
+# -------------------- Scheduled Jobs --------------------
+class JobState(db.Model):
+    """When each periodic job last ran."""
+    name = db.Column(db.String(50), primary_key=True)
+    last_run_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<JobState {self.name} @ {self.last_run_at}>"
@@ -1,8 +1,11 @@
+from concurrent.futures import TimeoutError as HashTimeout
 from flask import Blueprint, request, jsonify
-from app import db, bcrypt
+from app import db
 from app.models import User, Role, Person
 from flask_jwt_extended import create_access_token
 from sqlalchemy.exc import IntegrityError
+from app.utils.auth_utils import Principal, principal_cache
+from app.utils.passwords import hasher, PasswordHasherBusy
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -20,19 +23,19 @@ def register():
         if User.query.filter_by(email=data["email"]).first():
             return jsonify(message="Email already registered"), 409
 
-        # Create associated person
-        person = Person(full_name=data["full_name"], phone=data["phone"])
-        db.session.add(person)
-        db.session.flush()  # Get person.id before commit
-
-        # Hash password
-        hashed_pw = bcrypt.generate_password_hash(data["password"]).decode("utf-8")
-
         # Get role object
         role = Role.query.filter(Role.name.ilike(data["role"])).first()
         if not role:
             return jsonify(message="Invalid role"), 400
 
+        # Hash password on the bcrypt pool
+        hashed_pw = hasher.hash(data["password"])
+
+        # Create associated person
+        person = Person(full_name=data["full_name"], phone=data["phone"])
+        db.session.add(person)
+        db.session.flush()  # Get person.id before commit
+
         # Create user
         user = User(
             email=data["email"],
@@ -47,6 +50,9 @@ def register():
 
     except KeyError as e:
         return jsonify(message=f"Missing field: {e.args[0]}"), 400
+    except (PasswordHasherBusy, HashTimeout):
+        db.session.rollback()
+        return jsonify(message="Server busy, please retry"), 503, {"Retry-After": "1"}
     except IntegrityError:
         db.session.rollback()
         return jsonify(message="Registration failed — likely duplicate info"), 400
@@ -65,8 +71,22 @@ def login():
 
     user = User.query.filter_by(email=data["email"]).first()
 
-    if user and bcrypt.check_password_hash(user.password_hash, data["password"]):
-        token = create_access_token(identity=user.id)
-        return jsonify(token=token, role=user.role.name), 200
+    try:
+        valid = user is not None and hasher.check(user.password_hash, data["password"])
+
+        # Transparently upgrade hashes made with an old cost factor
+        if valid and hasher.needs_rehash(user.password_hash):
+            user.password_hash = hasher.hash(data["password"])
+            db.session.commit()
+    except (PasswordHasherBusy, HashTimeout):
+        db.session.rollback()
+        return jsonify(message="Server busy, please retry"), 503, {"Retry-After": "1"}
+
+    if valid:
+        role = user.role.name
+        # The role is re-read through the principal cache on each request, not trusted from the token
+        token = create_access_token(identity=str(user.id))
+        principal_cache.set(user.id, Principal(user.id, user.person_id, user.email, role))
+        return jsonify(token=token, role=role), 200
 
     return jsonify(message="Invalid credentials"), 401
@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import get_jwt_identity
 from app import db
-from app.models import Contribution, User
-from app.utils.auth_utils import role_required
-from app.utils.notify import send_notification  # ✅ Import this
+from app.models import Contribution, Person
+from app.utils.auth_utils import role_required, current_principal
+from app.utils.notify import send_notification, send_notifications_batch  # ✅ Import this
+from app.utils.export import filter_date_range, stream_export
+from app.utils.statements import ingest_statement, receipt_notifications
+from app.utils.idempotency import idempotent
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 
 contrib_bp = Blueprint("contrib", __name__)
@@ -11,31 +14,45 @@ contrib_bp = Blueprint("contrib", __name__)
 
 # -------------------------------------------
 # ✅ Member submits contribution
+#    Safe to retry: send an Idempotency-Key header, and a receipt code is
+#    only ever recorded once per payment method
 # -------------------------------------------
 @contrib_bp.route("/submit", methods=["POST"])
 @role_required(["Member", "Chairperson"])
+@idempotent
 def submit_contribution():
-    user = User.query.get(get_jwt_identity())
+    user = current_principal()
     data = request.get_json()
 
     contribution = Contribution(
         amount=data["amount"],
         date=datetime.strptime(data["date"], "%Y-%m-%d"),
         payment_method=data.get("payment_method", "M-Pesa"),
-        receipt_code=data.get("receipt_code", ""),
+        receipt_code=(data.get("receipt_code") or "").strip().upper() or None,
         person_id=user.person_id,
     )
     db.session.add(contribution)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Same receipt already recorded (e.g. a concurrent retry): answer with that row
+        db.session.rollback()
+        existing = Contribution.query.filter_by(
+            payment_method=contribution.payment_method,
+            receipt_code=contribution.receipt_code
+        ).first()
+        if existing is None or existing.person_id != user.person_id:
+            return jsonify(message="This receipt code has already been used"), 409
+        return jsonify(message="Contribution already recorded", id=existing.id), 200
 
     # ✅ Notify the user
     send_notification(
-        user_id=user.id,
+        user_id=user.user_id,
         title="Contribution Received",
         message=f"We received your contribution of KES {contribution.amount} on {contribution.date.strftime('%Y-%m-%d')}."
     )
 
-    return jsonify(message="Contribution recorded successfully"), 201
+    return jsonify(message="Contribution recorded successfully", id=contribution.id), 201
 
 
 # -------------------------------------------
@@ -44,7 +61,7 @@ def submit_contribution():
 @contrib_bp.route("/my", methods=["GET"])
 @role_required(["Member", "Chairperson"])
 def view_my_contributions():
-    user = User.query.get(get_jwt_identity())
+    user = current_principal()
     records = Contribution.query.filter_by(person_id=user.person_id).all()
 
     return jsonify([
@@ -74,3 +91,63 @@ def view_all_contributions():
             "receipt_code": c.receipt_code
         } for c in records
     ]), 200
+
+
+# -------------------------------------------
+# ✅ Admins export contributions (streamed)
+#    ?start=YYYY-MM-DD&end=YYYY-MM-DD&format=csv|ndjson&gzip=1
+# -------------------------------------------
+@contrib_bp.route("/export", methods=["GET"])
+@role_required(["Chairperson", "Treasurer"])
+def export_contributions():
+    query = db.session.query(
+        Contribution.id, Person.full_name, Contribution.amount, Contribution.date,
+        Contribution.payment_method, Contribution.receipt_code
+    ).join(Person, Contribution.person_id == Person.id)\
+     .order_by(Contribution.date.desc(), Contribution.id.desc())
+
+    try:
+        query = filter_date_range(query, Contribution.date)
+        return stream_export(
+            query,
+            ["id", "member", "amount", "date", "payment_method", "receipt_code"],
+            "contributions"
+        )
+    except ValueError as e:
+        return jsonify(message=str(e)), 400
+
+
+# -------------------------------------------
+# 📥 Treasurer uploads an M-Pesa statement
+#    multipart "file" or a text/csv body; ?dry_run=1 reports without saving
+# -------------------------------------------
+@contrib_bp.route("/statement", methods=["POST"])
+@role_required(["Chairperson", "Treasurer"])
+def upload_statement():
+    upload = request.files.get("file")
+    if upload:
+        stream = upload.stream
+    elif request.mimetype == "text/csv":
+        stream = request.stream
+    else:
+        return jsonify(message="Upload the statement as 'file' or send it as text/csv"), 400
+    dry_run = request.args.get("dry_run") in ("1", "true")
+
+    try:
+        report, paid = ingest_statement(stream)
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.commit()
+    except ValueError as e:
+        db.session.rollback()
+        return jsonify(message=str(e)), 400
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify(message="Some receipts were recorded concurrently, nothing was saved — upload again"), 409
+
+    if not dry_run:
+        send_notifications_batch(receipt_notifications(paid))
+
+    created = report["contributions"]["count"] + report["rent_payments"]["count"]
+    return jsonify(dry_run=dry_run, **report), 201 if created and not dry_run else 200
@@ -1,10 +1,14 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import get_jwt_identity
-from datetime import datetime
+from sqlalchemy.orm import contains_eager
+from datetime import datetime, date
 from app import db
-from app.models import User, Loan, Person
-from app.utils.auth_utils import role_required
-from app.utils.notify import send_notification  # ✅ Notification function
+from app.models import Loan, LoanRepayment, Person, LOAN_OPEN_STATUSES
+from app.utils.auth_utils import role_required, current_principal
+from app.utils.notify import send_notifications_bulk  # ✅ Notification function
+from app.utils.export import filter_date_range, stream_export
+from app.utils.amortization import portfolio, portfolio_totals, position, schedule
+from app.utils.response_cache import response_cache
+from app.utils.balances import eligibility
 
 loan_bp = Blueprint("loan", __name__)
 
@@ -15,14 +19,36 @@ loan_bp = Blueprint("loan", __name__)
 @loan_bp.route("/request", methods=["POST"])
 @role_required(["Member", "Chairperson"])
 def request_loan():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
+    user = current_principal()
+
+    data = request.get_json(silent=True) or {}
+    try:
+        amount = float(data["amount"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify(message="A numeric amount is required"), 400
+    if amount <= 0:
+        return jsonify(message="Amount must be positive"), 400
+
+    # 🔒 Borrow up to the multiplier x savings, less what is already owed or requested
+    limits = eligibility(user.person_id)
+    if amount > limits["available"]:
+        return jsonify(message=f"Loan exceeds your limit of KES {limits['available']:.2f}", eligibility=limits), 400
+
+    try:
+        due_date = datetime.strptime(data["due_date"], "%Y-%m-%d")
+        installments = int(data.get("installments") or 1)
+    except KeyError:
+        return jsonify(message="Missing field: due_date"), 400
+    except (TypeError, ValueError):
+        return jsonify(message="due_date must be YYYY-MM-DD and installments a whole number"), 400
+    if installments < 1:
+        return jsonify(message="installments must be at least 1"), 400
 
-    data = request.get_json()
     loan = Loan(
-        amount=data["amount"],
+        amount=amount,
         purpose=data.get("purpose"),
-        due_date=datetime.strptime(data["due_date"], "%Y-%m-%d"),
+        due_date=due_date,
+        installments=installments,
         person_id=user.person_id,
     )
 
@@ -31,13 +57,60 @@ def request_loan():
     return jsonify(message="Loan request submitted"), 201
 
 
+# -------------------------------------------
+# 🧮 How much a member can still borrow
+#    Admins may pass ?person_id= to check another member
+# -------------------------------------------
+@loan_bp.route("/eligibility", methods=["GET"])
+@role_required(["Member", "Chairperson", "Treasurer"])
+def loan_eligibility():
+    principal = current_principal()
+    person_id = principal.person_id
+    if principal.role != "Member" and request.args.get("person_id"):
+        person_id = request.args.get("person_id", type=int)
+        if person_id is None or not db.session.get(Person, person_id):
+            return jsonify(message="Member not found"), 404
+
+    return jsonify(person_id=person_id, **eligibility(person_id)), 200
+
+
 # -------------------------------------------
 # 📌 Admins view all loan requests
+#    ?status=pending,approved&person_id=3&start=YYYY-MM-DD&end=YYYY-MM-DD
+#    &sort=request_date&order=desc&page=1&per_page=50
 # -------------------------------------------
+LOAN_SORT_KEYS = ("request_date", "due_date", "amount", "status", "id")
+
+
 @loan_bp.route("/all", methods=["GET"])
 @role_required(["Chairperson", "Treasurer"])
 def view_all_loans():
-    loans = Loan.query.order_by(Loan.request_date.desc()).all()
+    sort = request.args.get("sort", "request_date")
+    if sort not in LOAN_SORT_KEYS:
+        return jsonify(message=f"sort must be one of {', '.join(LOAN_SORT_KEYS)}"), 400
+    descending = request.args.get("order", "desc") == "desc"
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 50, type=int), 1), 200)
+
+    # Borrower loaded in the same query (inner join: person_id is NOT NULL)
+    query = Loan.query.join(Loan.person).options(contains_eager(Loan.person))
+
+    statuses = [s for s in request.args.get("status", "").split(",") if s]
+    if statuses:
+        query = query.filter(Loan.status.in_(statuses))
+    person_id = request.args.get("person_id", type=int)
+    if person_id:
+        query = query.filter(Loan.person_id == person_id)
+    try:
+        query = filter_date_range(query, Loan.request_date)
+    except ValueError:
+        return jsonify(message="start and end must be YYYY-MM-DD"), 400
+
+    total = query.order_by(None).count()
+    column = getattr(Loan, sort)
+    loans = query.order_by(column.desc() if descending else column.asc(), Loan.id.desc())\
+                 .offset((page - 1) * per_page).limit(per_page).all()
+
     results = []
     for loan in loans:
         results.append({
@@ -46,9 +119,10 @@ def view_all_loans():
             "amount": loan.amount,
             "purpose": loan.purpose,
             "status": loan.status,
-            "due_date": loan.due_date.strftime("%Y-%m-%d"),
+            "request_date": loan.request_date.strftime("%Y-%m-%d") if loan.request_date else None,
+            "due_date": loan.due_date.strftime("%Y-%m-%d") if loan.due_date else None,
         })
-    return jsonify(loans=results), 200
+    return jsonify(loans=results, page=page, per_page=per_page, total=total), 200
 
 
 # -------------------------------------------
@@ -57,25 +131,37 @@ def view_all_loans():
 @loan_bp.route("/approve/<int:loan_id>", methods=["POST"])
 @role_required(["Chairperson", "Treasurer"])
 def approve_loan(loan_id):
-    approver_id = get_jwt_identity()
-    approver = User.query.get(approver_id)
-    loan = Loan.query.get(loan_id)
+    approver = current_principal()
+    # Row lock: a concurrent approve/reject waits and then sees the new status
+    loan = db.session.get(Loan, loan_id, with_for_update=True)
 
     if not loan:
         return jsonify(message="Loan not found"), 404
+    if loan.status != "pending":
+        return jsonify(message=f"Only pending loans can be approved, this one is {loan.status}"), 400
 
     # ❌ Prevent approving your own loan
     if approver.person_id == loan.person_id:
         return jsonify(message="Cannot approve your own loan"), 403
 
+    data = request.get_json(silent=True) or {}
+    if "interest" in data:
+        try:
+            interest = float(data["interest"])
+        except (TypeError, ValueError):
+            return jsonify(message="interest must be a number"), 400
+        if interest < 0:
+            return jsonify(message="interest must not be negative"), 400
+        loan.interest = interest
+
     loan.status = "approved"
     loan.approved = True
-    loan.approved_by = approver_id
+    loan.approved_by = approver.user_id
     db.session.commit()
 
     # ✅ Send notification to the member
-    send_notification(
-        user_id=loan.person.user.id,
+    send_notifications_bulk(
+        [u.id for u in loan.person.users],
         title="Loan Approved",
         message=f"Your loan of KES {loan.amount} has been approved!"
     )
@@ -89,12 +175,13 @@ def approve_loan(loan_id):
 @loan_bp.route("/reject/<int:loan_id>", methods=["POST"])
 @role_required(["Chairperson", "Treasurer"])
 def reject_loan(loan_id):
-    approver_id = get_jwt_identity()
-    approver = User.query.get(approver_id)
-    loan = Loan.query.get(loan_id)
+    approver = current_principal()
+    loan = db.session.get(Loan, loan_id, with_for_update=True)
 
     if not loan:
         return jsonify(message="Loan not found"), 404
+    if loan.status != "pending":
+        return jsonify(message=f"Only pending loans can be rejected, this one is {loan.status}"), 400
 
     if approver.person_id == loan.person_id:
         return jsonify(message="Cannot reject your own loan"), 403
@@ -104,10 +191,126 @@ def reject_loan(loan_id):
     db.session.commit()
 
     # ✅ Notify user
-    send_notification(
-        user_id=loan.person.user.id,
+    send_notifications_bulk(
+        [u.id for u in loan.person.users],
         title="Loan Rejected",
         message=f"Your loan request of KES {loan.amount} was rejected."
     )
 
     return jsonify(message="Loan rejected"), 200
+
+
+# -------------------------------------------
+# 📤 Admins export the loan book (streamed)
+#    ?start=YYYY-MM-DD&end=YYYY-MM-DD&format=csv|ndjson&gzip=1
+# -------------------------------------------
+@loan_bp.route("/export", methods=["GET"])
+@role_required(["Chairperson", "Treasurer"])
+def export_loans():
+    query = db.session.query(
+        Loan.id, Person.full_name, Loan.amount, Loan.purpose, Loan.status,
+        Loan.request_date, Loan.due_date, Loan.interest, Loan.repayment_amount
+    ).join(Person, Loan.person_id == Person.id)\
+     .order_by(Loan.request_date.desc(), Loan.id.desc())
+
+    try:
+        query = filter_date_range(query, Loan.request_date)
+        return stream_export(
+            query,
+            ["id", "member", "amount", "purpose", "status", "request_date", "due_date", "interest", "repayment_amount"],
+            "loans"
+        )
+    except ValueError as e:
+        return jsonify(message=str(e)), 400
+
+
+# -------------------------------------------
+# 💵 Admin records a loan repayment
+# -------------------------------------------
+@loan_bp.route("/<int:loan_id>/repay", methods=["POST"])
+@role_required(["Chairperson", "Treasurer"])
+def repay_loan(loan_id):
+    # Row lock: concurrent repayments add to repayment_amount one after the other
+    loan = db.session.get(Loan, loan_id, with_for_update=True)
+    if not loan:
+        return jsonify(message="Loan not found"), 404
+    if loan.status not in LOAN_OPEN_STATUSES:
+        return jsonify(message=f"Cannot repay a loan that is {loan.status}"), 400
+
+    data = request.get_json(silent=True) or {}
+    try:
+        amount = float(data["amount"])
+        paid_date = datetime.strptime(data["paid_date"], "%Y-%m-%d") if data.get("paid_date") else datetime.utcnow()
+    except KeyError as e:
+        return jsonify(message=f"Missing field: {e.args[0]}"), 400
+    except (TypeError, ValueError):
+        return jsonify(message="Invalid amount or paid_date"), 400
+    if amount <= 0:
+        return jsonify(message="Amount must be positive"), 400
+    outstanding = (loan.amount or 0.0) + (loan.interest or 0.0) - (loan.repayment_amount or 0.0)
+    if amount > outstanding + 0.005:
+        return jsonify(message=f"Amount exceeds the outstanding balance of KES {max(outstanding, 0.0):.2f}"), 400
+
+    db.session.add(LoanRepayment(
+        loan_id=loan.id,
+        amount=amount,
+        paid_date=paid_date,
+        payment_method=data.get("payment_method", "M-Pesa"),
+        receipt_code=data.get("receipt_code"),
+        recorded_by=current_principal().user_id,
+    ))
+    loan.repayment_amount = (loan.repayment_amount or 0.0) + amount
+    balance = outstanding - amount
+    if balance <= 0.005:
+        loan.status = "repaid"
+    db.session.commit()
+
+    send_notifications_bulk(
+        [u.id for u in loan.person.users],
+        title="Loan Repayment Received",
+        message=f"We received KES {amount} towards your loan #{loan.id}. Balance: KES {max(balance, 0):.2f}."
+    )
+
+    return jsonify(message="Repayment recorded", balance=round(max(balance, 0.0), 2), status=loan.status), 201
+
+
+# -------------------------------------------
+# 📅 Installment schedule for one loan (admins or the borrower)
+# -------------------------------------------
+@loan_bp.route("/<int:loan_id>/schedule", methods=["GET"])
+@role_required(["Member", "Chairperson", "Treasurer"])
+def loan_schedule(loan_id):
+    loan = Loan.query.get(loan_id)
+    if not loan:
+        return jsonify(message="Loan not found"), 404
+
+    principal = current_principal()
+    if principal.role == "Member" and principal.person_id != loan.person_id:
+        return jsonify(message="Access denied"), 403
+
+    today = date.today()
+    return jsonify({
+        "loan_id": loan.id,
+        "status": loan.status,
+        "position": position(loan.amount, loan.interest, loan.installments, loan.due_date, loan.repayment_amount, today),
+        "installments": schedule(loan, today)
+    }), 200
+
+
+# -------------------------------------------
+# 📊 Portfolio position: outstanding, accrued interest, arrears
+#    ?detail=1 adds the per-loan breakdown
+# -------------------------------------------
+@loan_bp.route("/portfolio", methods=["GET"])
+@role_required(["Chairperson", "Treasurer"])
+# Arrears and accrued interest move with the calendar, so the date is part of the key
+@response_cache.cached("loan", "loan_repayment", vary=lambda: date.today().isoformat())
+def loan_portfolio():
+    today = date.today()
+    result = {"as_of": today.strftime("%Y-%m-%d"), "totals": portfolio_totals(today)}
+    if request.args.get("detail") in ("1", "true"):
+        result["loans"] = [
+            {**p, "due_date": p["due_date"].strftime("%Y-%m-%d") if p["due_date"] else None}
+            for p in portfolio(today)
+        ]
+    return jsonify(result), 200
@@ -2,6 +2,10 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity
 from app.models import MaintenanceRequest, Property
 from app.utils.auth_utils import role_required
+from app.utils.export import filter_date_range, stream_export
+from app.utils.sla import ALL_PROPERTIES, MAINTENANCE_OPEN_STATUSES, RESOLVED, record_resolution, sketches
+from sqlalchemy import func
+from sqlalchemy.orm import contains_eager
 from app import db
 from datetime import datetime
 
@@ -20,11 +24,31 @@ def report_issue():
     return jsonify(message="Maintenance request submitted"), 201
 
 
+# ----------------------
+# Request queue
+#    ?status=Pending,In Progress&property_id=&page=1&per_page=50
+#    Total count in the X-Total-Count header
+# ----------------------
 @maintenance_bp.route("/", methods=["GET"])
 @role_required(["Chairperson", "Rent Manager"])
 def list_requests():
-    requests = MaintenanceRequest.query.order_by(MaintenanceRequest.reported_date.desc()).all()
-    return jsonify([
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 50, type=int), 1), 200)
+
+    query = MaintenanceRequest.query.join(MaintenanceRequest.property)\
+                                    .options(contains_eager(MaintenanceRequest.property))
+    statuses = [s.strip() for s in request.args.get("status", "").split(",") if s.strip()]
+    if statuses:
+        query = query.filter(MaintenanceRequest.status.in_(statuses))
+    property_id = request.args.get("property_id", type=int)
+    if property_id:
+        query = query.filter(MaintenanceRequest.property_id == property_id)
+
+    total = query.order_by(None).count()
+    requests = query.order_by(MaintenanceRequest.reported_date.desc(), MaintenanceRequest.id.desc())\
+                    .offset((page - 1) * per_page).limit(per_page).all()
+
+    response = jsonify([
         {
             "id": r.id,
             "property": r.property.name,
@@ -34,7 +58,9 @@ def list_requests():
             "resolved_date": r.resolved_date.strftime("%Y-%m-%d") if r.resolved_date else None,
             "resolution_notes": r.resolution_notes
         } for r in requests
-    ]), 200
+    ])
+    response.headers["X-Total-Count"] = str(total)
+    return response, 200
 
 
 @maintenance_bp.route("/resolve/<int:req_id>", methods=["POST"])
@@ -45,8 +71,74 @@ def resolve_request(req_id):
     if not request_obj:
         return jsonify(message="Request not found"), 404
 
-    request_obj.status = "Resolved"
-    request_obj.resolved_date = datetime.utcnow()
     request_obj.resolution_notes = data.get("resolution_notes", "")
+    if request_obj.status != RESOLVED:
+        request_obj.status = RESOLVED
+        request_obj.resolved_date = datetime.utcnow()
+        # 📈 Count the turnaround once, when the request is first resolved
+        record_resolution(db.session, request_obj)
     db.session.commit()
     return jsonify(message="Request marked as resolved"), 200
+
+
+# ----------------------
+# SLA metrics: open queue and time-to-resolve percentiles
+# ----------------------
+@maintenance_bp.route("/metrics", methods=["GET"])
+@role_required(["Chairperson", "Rent Manager"])
+def maintenance_metrics():
+    now = datetime.utcnow()
+    open_queue = {
+        property_id: (count, oldest)
+        for property_id, count, oldest in db.session.query(
+            MaintenanceRequest.property_id,
+            func.count(MaintenanceRequest.id),
+            func.min(MaintenanceRequest.reported_date)
+        ).filter(MaintenanceRequest.status.in_(MAINTENANCE_OPEN_STATUSES))
+         .group_by(MaintenanceRequest.property_id)
+    }
+    resolution = sketches()
+    empty = {"resolved": 0, "p50_hours": None, "p90_hours": None}
+
+    def age_days(reported):
+        return round((now - reported).total_seconds() / 86400, 1) if reported else None
+
+    properties = []
+    for property_id, name in db.session.query(Property.id, Property.name).order_by(Property.id):
+        count, oldest = open_queue.get(property_id, (0, None))
+        properties.append({
+            "property_id": property_id,
+            "property": name,
+            "open_requests": count,
+            "oldest_open_age_days": age_days(oldest),
+            **resolution.get(property_id, empty),
+        })
+
+    oldest = min((o for _, o in open_queue.values() if o), default=None)
+    return jsonify({
+        "open_requests": sum(count for count, _ in open_queue.values()),
+        "oldest_open_age_days": age_days(oldest),
+        **resolution.get(ALL_PROPERTIES, empty),
+        "properties": properties
+    }), 200
+
+
+@maintenance_bp.route("/export", methods=["GET"])
+@role_required(["Chairperson", "Rent Manager"])
+def export_requests():
+    query = db.session.query(
+        MaintenanceRequest.id, Property.name, MaintenanceRequest.issue_description,
+        MaintenanceRequest.status, MaintenanceRequest.reported_date,
+        MaintenanceRequest.resolved_date, MaintenanceRequest.resolution_notes
+    ).join(Property, MaintenanceRequest.property_id == Property.id)\
+     .order_by(MaintenanceRequest.reported_date.desc(), MaintenanceRequest.id.desc())
+
+    try:
+        query = filter_date_range(query, MaintenanceRequest.reported_date)
+        return stream_export(
+            query,
+            ["id", "property", "description", "status", "reported_date", "resolved_date", "resolution_notes"],
+            "maintenance_requests"
+        )
+    except ValueError as e:
+        return jsonify(message=str(e)), 400
@@ -1,9 +1,11 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import get_jwt_identity
+from flask import Blueprint, Response, request, jsonify, url_for
 from app import db
-from app.models import User, Meeting, Minute
-from app.utils.auth_utils import role_required
-from app.utils.notify import send_notification  # ✅ Add this
+from app.models import Meeting, Minute
+from app.utils.auth_utils import role_required, current_principal, load_principal
+from app.utils.notify import send_broadcast
+from app.utils.search import search_minutes
+from app.utils.ical import feed_token, render_calendar, user_from_token
+from app.utils.response_cache import response_cache
 from datetime import datetime
 
 meeting_bp = Blueprint("meeting", __name__)
@@ -15,7 +17,7 @@ meeting_bp = Blueprint("meeting", __name__)
 @meeting_bp.route("/create", methods=["POST"])
 @role_required(["Secretary", "Chairperson"])
 def create_meeting():
-    user = User.query.get(get_jwt_identity())
+    user = current_principal()
     data = request.get_json()
 
     try:
@@ -23,19 +25,17 @@ def create_meeting():
             date=datetime.strptime(data["date"], "%Y-%m-%d %H:%M"),
             location=data["location"],
             description=data.get("description", ""),
-            created_by=user.id
+            created_by=user.user_id
         )
         db.session.add(meeting)
         db.session.commit()
 
-        # ✅ Notify all members about upcoming meeting
-        all_users = User.query.all()
-        for u in all_users:
-            send_notification(
-                user_id=u.id,
-                title="Upcoming Meeting",
-                message=f"New meeting scheduled on {meeting.date.strftime('%Y-%m-%d %H:%M')} at {meeting.location}."
-            )
+        # ✅ Notify all members about upcoming meeting (one broadcast row)
+        send_broadcast(
+            title="Upcoming Meeting",
+            message=f"New meeting scheduled on {meeting.date.strftime('%Y-%m-%d %H:%M')} at {meeting.location}.",
+            created_by=user.user_id
+        )
 
         return jsonify(message="Meeting created"), 201
 
@@ -44,20 +44,60 @@ def create_meeting():
 
 
 # ------------------------------------------------
-# ✅ View all upcoming meetings
+# ✅ View upcoming meetings (soonest first)
+#    ?page=1&per_page=20; total count in the X-Total-Count header
 # ------------------------------------------------
 @meeting_bp.route("/upcoming", methods=["GET"])
 @role_required(["Member", "Chairperson", "Treasurer", "Secretary"])
 def view_meetings():
-    upcoming = Meeting.query.order_by(Meeting.date.asc()).all()
-    return jsonify([
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 20, type=int), 1), 100)
+
+    # Meeting times are entered in local time, so compare with local now
+    query = Meeting.query.filter(Meeting.date >= datetime.now())
+    total = query.count()
+    upcoming = query.order_by(Meeting.date.asc(), Meeting.id.asc())\
+                    .offset((page - 1) * per_page).limit(per_page).all()
+
+    response = jsonify([
         {
             "id": m.id,
             "date": m.date.strftime("%Y-%m-%d %H:%M"),
             "location": m.location,
             "description": m.description
         } for m in upcoming
-    ]), 200
+    ])
+    response.headers["X-Total-Count"] = str(total)
+    return response, 200
+
+
+# ------------------------------------------------
+# 📅 Personal calendar subscription link
+# ------------------------------------------------
+@meeting_bp.route("/calendar-link", methods=["GET"])
+@role_required(["Member", "Chairperson", "Treasurer", "Secretary"])
+def calendar_link():
+    token = feed_token(current_principal().user_id)
+    return jsonify(url=url_for("meeting.calendar_feed", token=token, _external=True)), 200
+
+
+# ------------------------------------------------
+# 📅 iCalendar feed for calendar apps (authenticated by the signed link)
+#    Rendered once per change to the meeting table; answers If-None-Match with 304
+# ------------------------------------------------
+@meeting_bp.route("/calendar/<token>.ics", methods=["GET"])
+def calendar_feed(token):
+    user_id = user_from_token(token)
+    if user_id is None or load_principal(user_id) is None:
+        return jsonify(message="Invalid calendar link"), 404
+    return _render_feed()
+
+
+@response_cache.cached("meeting")
+def _render_feed():
+    # Every member sees the same meetings, so one cached copy serves all feeds
+    meetings = Meeting.query.order_by(Meeting.date.asc()).all()
+    return Response(render_calendar(meetings), mimetype="text/calendar")
 
 
 # ------------------------------------------------
@@ -66,25 +106,23 @@ def view_meetings():
 @meeting_bp.route("/<int:meeting_id>/minute", methods=["POST"])
 @role_required(["Secretary"])
 def add_minutes(meeting_id):
-    user = User.query.get(get_jwt_identity())
+    user = current_principal()
     data = request.get_json()
 
     minutes = Minute(
         meeting_id=meeting_id,
-        written_by=user.id,
+        written_by=user.user_id,
         content=data["content"]
     )
     db.session.add(minutes)
-    db.session.commit()
-
-    # ✅ Notify all members that minutes are ready
-    all_users = User.query.all()
-    for u in all_users:
-        send_notification(
-            user_id=u.id,
-            title="Meeting Minutes Posted",
-            message=f"Minutes for meeting #{meeting_id} are now available."
-        )
+    db.session.commit()  # 🔎 the search index is updated in the same transaction
+
+    # ✅ Notify all members that minutes are ready (one broadcast row)
+    send_broadcast(
+        title="Meeting Minutes Posted",
+        message=f"Minutes for meeting #{meeting_id} are now available.",
+        created_by=user.user_id
+    )
 
     return jsonify(message="Minutes saved"), 201
 
@@ -104,3 +142,19 @@ def get_minutes(meeting_id):
             "timestamp": m.timestamp.strftime("%Y-%m-%d %H:%M")
         } for m in minutes
     ]), 200
+
+
+# ------------------------------------------------
+# 🔎 Search minutes across all meetings
+#    ?q=interest rate&limit=20&offset=0
+# ------------------------------------------------
+@meeting_bp.route("/search", methods=["GET"])
+@role_required(["Member", "Chairperson", "Secretary", "Treasurer"])
+def search_meeting_minutes():
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify(message="q is required"), 400
+    limit = min(max(request.args.get("limit", 20, type=int), 1), 100)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+
+    return jsonify(query=query, results=search_minutes(query, limit, offset)), 200
@@ -1,26 +1,288 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
 from flask_jwt_extended import get_jwt_identity
-from app.models import Notification
+from sqlalchemy import and_, or_, exists, false, insert, literal, select, update
+from app import db
+from app.models import Notification, BroadcastNotification, BroadcastReceipt, User
 from app.utils.auth_utils import role_required
+from app.utils.dispatch import dispatcher
+from app.utils.pubsub import broker
+from datetime import datetime, timedelta
+import base64
+import json
 
 notify_bp = Blueprint("notify", __name__)
 
+ALL_ROLES = ["Member", "Chairperson", "Treasurer", "Secretary", "RentManager", "Rent Manager"]
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+# Inbox items are ordered by (created_at, kind, id) descending, where kind
+# is "n" for direct notifications and "b" for broadcasts.
+DIRECT, BROADCAST = "n", "b"
+
+
+def _encode_cursor(created_at, kind, item_id):
+    raw = f"{created_at.isoformat()}|{kind}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    created_at, kind, item_id = raw.split("|")
+    if kind not in (DIRECT, BROADCAST):
+        raise ValueError(kind)
+    return datetime.fromisoformat(created_at), kind, int(item_id)
+
+
+def _before_cursor(model, kind, cursor):
+    """Filter rows of one source that sort strictly before ``cursor`` (older)."""
+    created_at, cursor_kind, item_id = cursor
+    if kind < cursor_kind:
+        return model.created_at <= created_at
+    if kind > cursor_kind:
+        return model.created_at < created_at
+    return or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < item_id),
+    )
+
+
+def _after_cursor(model, kind, cursor):
+    """Filter rows of one source that sort strictly after ``cursor`` (newer)."""
+    created_at, cursor_kind, item_id = cursor
+    if kind > cursor_kind:
+        return model.created_at >= created_at
+    if kind < cursor_kind:
+        return model.created_at > created_at
+    return or_(
+        model.created_at > created_at,
+        and_(model.created_at == created_at, model.id > item_id),
+    )
+
+
+def _member_since(user_id):
+    return db.session.query(User.created_at).filter(User.id == user_id).scalar()
+
+
+def _visible_broadcasts(query, since):
+    """Limit ``query`` to broadcasts sent since the user joined."""
+    if since is None:
+        return query
+    return query.filter(BroadcastNotification.created_at >= since)
+
+
+def _inbox_items(user_id, limit, before=None, after=None, since=None):
+    """Merge direct and broadcast notifications for one user.
+
+    Broadcasts older than ``since`` (the user's join date) are left out.
+    Returns up to ``limit + 1`` tuples of (created_at, kind, id, row, is_read),
+    newest first, or oldest first when paging forward with ``after``.
+    """
+    direct = Notification.query.filter_by(user_id=user_id)
+    broadcasts = db.session.query(BroadcastNotification, BroadcastReceipt.read_at)\
+                           .outerjoin(BroadcastReceipt, and_(
+                               BroadcastReceipt.broadcast_id == BroadcastNotification.id,
+                               BroadcastReceipt.user_id == user_id,
+                           ))
+    broadcasts = _visible_broadcasts(broadcasts, since)
+
+    if before:
+        direct = direct.filter(_before_cursor(Notification, DIRECT, before))
+        broadcasts = broadcasts.filter(_before_cursor(BroadcastNotification, BROADCAST, before))
+    if after:
+        direct = direct.filter(_after_cursor(Notification, DIRECT, after))
+        broadcasts = broadcasts.filter(_after_cursor(BroadcastNotification, BROADCAST, after))
+
+    newest_first = after is None
+    direct_order = (Notification.created_at, Notification.id)
+    broadcast_order = (BroadcastNotification.created_at, BroadcastNotification.id)
+    if newest_first:
+        direct_order = [col.desc() for col in direct_order]
+        broadcast_order = [col.desc() for col in broadcast_order]
+
+    direct = direct.order_by(*direct_order).limit(limit + 1).all()
+    broadcasts = broadcasts.order_by(*broadcast_order).limit(limit + 1).all()
+
+    items = [(n.created_at, DIRECT, n.id, n, n.is_read) for n in direct]
+    items += [(b.created_at, BROADCAST, b.id, b, read_at is not None) for b, read_at in broadcasts]
+    items.sort(key=lambda item: item[:3], reverse=newest_first)
+    return items[:limit + 1]
+
+
+def _serialize(item):
+    created_at, kind, item_id, n, is_read = item
+    return {
+        "id": item_id,
+        "type": "broadcast" if kind == BROADCAST else "direct",
+        "title": n.title,
+        "message": n.message,
+        "date": created_at.strftime("%Y-%m-%d %H:%M"),
+        "is_read": is_read
+    }
+
+
 # -----------------------------------------
 # 🔔 Get my notifications (any role)
+#    Direct and broadcast notifications merged into one stream,
+#    keyset-paginated: ?limit=20&cursor=<X-Next-Cursor>
 # -----------------------------------------
 @notify_bp.route("/", methods=["GET"])
-@role_required(["Member", "Chairperson", "Treasurer", "Secretary", "RentManager"])
+@role_required(ALL_ROLES)
 def get_my_notifications():
     user_id = get_jwt_identity()
-    notifications = Notification.query.filter_by(user_id=user_id)\
-                                      .order_by(Notification.created_at.desc()).all()
-
-    return jsonify([
-        {
-            "id": n.id,
-            "title": n.title,
-            "message": n.message,
-            "date": n.created_at.strftime("%Y-%m-%d %H:%M"),
-            "is_read": n.is_read
-        } for n in notifications
-    ]), 200
+    limit = min(max(request.args.get("limit", DEFAULT_PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            cursor = _decode_cursor(cursor)
+        except (ValueError, UnicodeDecodeError):
+            return jsonify(message="Invalid cursor"), 400
+
+    items = _inbox_items(user_id, limit, before=cursor, since=_member_since(user_id))
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    response = jsonify([_serialize(item) for item in items])
+    if has_more:
+        response.headers["X-Next-Cursor"] = _encode_cursor(*items[-1][:3])
+    return response, 200
+
+
+# -----------------------------------------
+# 📡 Live notification stream (Server-Sent Events)
+#    Resumes from the Last-Event-ID header sent on reconnect.
+#    Browsers: new EventSource("/api/notifications/stream?jwt=<token>")
+# -----------------------------------------
+@notify_bp.route("/stream", methods=["GET"])
+@role_required(ALL_ROLES)
+def stream_notifications():
+    user_id = int(get_jwt_identity())
+    heartbeat = current_app.config.get("NOTIFY_STREAM_HEARTBEAT", 15)
+    lookback = timedelta(seconds=current_app.config.get("NOTIFY_STREAM_LOOKBACK", 30))
+    since = _member_since(user_id)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    if last_event_id:
+        try:
+            cursor = _decode_cursor(last_event_id)
+        except (ValueError, UnicodeDecodeError):
+            return jsonify(message="Invalid Last-Event-ID"), 400
+    else:
+        latest = _inbox_items(user_id, 0, since=since)
+        cursor = latest[0][:3] if latest else (datetime.utcnow(), "", 0)
+    db.session.close()
+
+    def generate():
+        # Notifications are committed by background workers, so one may land
+        # slightly after a newer one was streamed. Each wake-up re-reads a
+        # short lookback window and skips what this connection already sent
+        # or what the client had before it connected.
+        sub = broker.subscribe(user_id)
+        position, sent, strict = cursor, {}, True
+        try:
+            yield f"retry: {heartbeat * 1000}\n\n"
+            while True:
+                start = position if strict else (position[0] - lookback, "", 0)
+                items = _inbox_items(user_id, MAX_PAGE_SIZE, after=start, since=since)[:MAX_PAGE_SIZE]
+                db.session.close()
+
+                for item in items:
+                    key = item[1:3]
+                    if key in sent or item[:3] <= cursor:
+                        continue
+                    sent[key] = item[0]
+                    position = max(position, item[:3])
+                    event_id = _encode_cursor(*item[:3])
+                    yield f"id: {event_id}\nevent: notification\ndata: {json.dumps(_serialize(item))}\n\n"
+
+                horizon = position[0] - lookback
+                sent = {key: created_at for key, created_at in sent.items() if created_at >= horizon}
+
+                # A full page means more rows are waiting: keep reading strictly forward
+                strict = len(items) == MAX_PAGE_SIZE
+                if not strict and not sub.wait(heartbeat):
+                    yield ": keepalive\n\n"
+        finally:
+            broker.unsubscribe(sub)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# -----------------------------------------
+# 🔢 Unread counter (served from indexes)
+# -----------------------------------------
+@notify_bp.route("/unread-count", methods=["GET"])
+@role_required(ALL_ROLES)
+def unread_count():
+    user_id = get_jwt_identity()
+    direct = db.session.query(db.func.count(Notification.id))\
+                       .filter(Notification.user_id == user_id, Notification.is_read == false())\
+                       .scalar()
+    unread_broadcasts = db.session.query(db.func.count(BroadcastNotification.id))\
+                                  .filter(~exists().where(
+                                      BroadcastReceipt.broadcast_id == BroadcastNotification.id,
+                                      BroadcastReceipt.user_id == user_id,
+                                  ))
+    unread_broadcasts = _visible_broadcasts(unread_broadcasts, _member_since(user_id)).scalar()
+    return jsonify(unread=direct + unread_broadcasts), 200
+
+
+# -----------------------------------------
+# ✅ Mark notifications as read in bulk
+#    Body: {"ids": [...], "broadcast_ids": [...]} or {"all": true}
+# -----------------------------------------
+@notify_bp.route("/read", methods=["POST"])
+@role_required(ALL_ROLES)
+def mark_read():
+    user_id = int(get_jwt_identity())
+    data = request.get_json() or {}
+    mark_all = bool(data.get("all"))
+    ids = data.get("ids") or []
+    broadcast_ids = data.get("broadcast_ids") or []
+    if not (mark_all or ids or broadcast_ids):
+        return jsonify(message="Provide 'ids', 'broadcast_ids' or 'all'"), 400
+
+    updated = 0
+    if mark_all or ids:
+        stmt = update(Notification).where(
+            Notification.user_id == user_id,
+            Notification.is_read == false(),
+        )
+        if not mark_all:
+            stmt = stmt.where(Notification.id.in_(ids))
+        result = db.session.execute(stmt.values(is_read=True), execution_options={"synchronize_session": False})
+        updated += result.rowcount
+
+    if mark_all or broadcast_ids:
+        unread = select(BroadcastNotification.id, literal(user_id), literal(datetime.utcnow()))\
+            .where(~exists().where(
+                BroadcastReceipt.broadcast_id == BroadcastNotification.id,
+                BroadcastReceipt.user_id == user_id,
+            ))
+        since = _member_since(user_id)
+        if since is not None:
+            unread = unread.where(BroadcastNotification.created_at >= since)
+        if not mark_all:
+            unread = unread.where(BroadcastNotification.id.in_(broadcast_ids))
+        result = db.session.execute(
+            insert(BroadcastReceipt).from_select(["broadcast_id", "user_id", "read_at"], unread)
+        )
+        updated += result.rowcount
+
+    db.session.commit()
+    return jsonify(updated=updated), 200
+
+
+# -----------------------------------------
+# 📊 Notification dispatch queue depth and lag
+# -----------------------------------------
+@notify_bp.route("/dispatch-stats", methods=["GET"])
+@role_required(["Chairperson"])
+def dispatch_stats():
+    return jsonify(dispatcher.stats()), 200
@@ -3,7 +3,15 @@ from flask_jwt_extended import get_jwt_identity
 from app import db
 from app.models import Property, RentPayment, User
 from app.utils.auth_utils import role_required
-from datetime import datetime
+from app.utils.export import filter_date_range, stream_export
+from app.utils.idempotency import idempotent
+from app.utils.arrears import arrears
+from app.utils.periods import add_months, current_month, month_bounds, month_key, parse_month
+from app.utils.response_cache import response_cache
+from sqlalchemy import case, func
+from sqlalchemy.orm import contains_eager
+from sqlalchemy.exc import IntegrityError
+from datetime import date, datetime
 
 rent_bp = Blueprint("rent", __name__)
 
@@ -14,11 +22,22 @@ rent_bp = Blueprint("rent", __name__)
 @role_required(["Chairperson", "Rent Manager"])
 def add_property():
     data = request.get_json()
+    is_occupied = data.get("is_occupied", True)
+    occupied_since = None
+    if is_occupied:
+        # Rent is owed from the let date, never from before the property was added unless stated
+        try:
+            occupied_since = datetime.strptime(data["occupied_since"], "%Y-%m-%d").date() \
+                if data.get("occupied_since") else date.today()
+        except (TypeError, ValueError):
+            return jsonify(message="occupied_since must be YYYY-MM-DD"), 400
+
     property = Property(
         name=data["name"],
         location=data.get("location"),
         monthly_rent=data["monthly_rent"],
-        is_occupied=data.get("is_occupied", True),
+        is_occupied=is_occupied,
+        occupied_since=occupied_since,
         tenant_name=data.get("tenant_name"),
         tenant_phone=data.get("tenant_phone"),
     )
@@ -38,6 +57,7 @@ def get_properties():
             "location": p.location,
             "monthly_rent": p.monthly_rent,
             "is_occupied": p.is_occupied,
+            "occupied_since": p.occupied_since.strftime("%Y-%m-%d") if p.occupied_since else None,
             "tenant_name": p.tenant_name,
             "tenant_phone": p.tenant_phone
         } for p in properties
@@ -48,6 +68,7 @@ def get_properties():
 # ----------------------
 @rent_bp.route("/payment", methods=["POST"])
 @role_required(["Chairperson", "Rent Manager"])
+@idempotent
 def record_payment():
     data = request.get_json()
     payment = RentPayment(
@@ -55,18 +76,32 @@ def record_payment():
         amount=data["amount"],
         payment_date=datetime.strptime(data["payment_date"], "%Y-%m-%d"),
         payment_method=data.get("payment_method", "M-Pesa"),
-        receipt_code=data.get("receipt_code"),
+        receipt_code=(data.get("receipt_code") or "").strip().upper() or None,
         notes=data.get("notes")
     )
     db.session.add(payment)
-    db.session.commit()
-    return jsonify(message="Rent payment recorded"), 201
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Same receipt already recorded: answer with that row instead of a duplicate
+        db.session.rollback()
+        existing = RentPayment.query.filter_by(
+            payment_method=payment.payment_method,
+            receipt_code=payment.receipt_code
+        ).first()
+        if existing is None or existing.property_id != payment.property_id:
+            return jsonify(message="This receipt code has already been used"), 409
+        return jsonify(message="Rent payment already recorded", id=existing.id), 200
+    return jsonify(message="Rent payment recorded", id=payment.id), 201
 
 
 @rent_bp.route("/payments", methods=["GET"])
 @role_required(["Chairperson", "Rent Manager"])
 def view_all_payments():
-    payments = RentPayment.query.order_by(RentPayment.payment_date.desc()).all()
+    payments = RentPayment.query.join(RentPayment.property)\
+                                .options(contains_eager(RentPayment.property))\
+                                .order_by(RentPayment.payment_date.desc())\
+                                .all()
     return jsonify([
         {
             "id": p.id,
@@ -78,3 +113,136 @@ def view_all_payments():
             "notes": p.notes
         } for p in payments
     ]), 200
+
+
+@rent_bp.route("/payments/export", methods=["GET"])
+@role_required(["Chairperson", "Rent Manager"])
+def export_payments():
+    query = db.session.query(
+        RentPayment.id, Property.name, RentPayment.amount, RentPayment.payment_date,
+        RentPayment.payment_method, RentPayment.receipt_code, RentPayment.notes
+    ).join(Property, RentPayment.property_id == Property.id)\
+     .order_by(RentPayment.payment_date.desc(), RentPayment.id.desc())
+
+    try:
+        query = filter_date_range(query, RentPayment.payment_date)
+        return stream_export(
+            query,
+            ["id", "property", "amount", "payment_date", "payment_method", "receipt_code", "notes"],
+            "rent_payments"
+        )
+    except ValueError as e:
+        return jsonify(message=str(e)), 400
+
+
+# ----------------------
+# Portfolio Dashboard
+#    Occupancy, collection rate and trailing-12-month revenue per property
+# ----------------------
+def _rate(part, whole):
+    return round(part / whole, 4) if whole else None
+
+
+def _months_billed(p, start, end):
+    """Months of the ``start``..``end`` window a property is billed for, as arrears.compute_months bills it."""
+    if not p.is_occupied or p.occupied_since is None:
+        return 0
+    start_year, start_month = max((p.occupied_since.year, p.occupied_since.month), parse_month(start))
+    end_year, end_month = parse_month(end)
+    return max((end_year - start_year) * 12 + (end_month - start_month) + 1, 0)
+
+
+@rent_bp.route("/portfolio", methods=["GET"])
+@role_required(["Chairperson", "Rent Manager"])
+# This-month figures roll over with the calendar, so the month is part of the key
+@response_cache.cached("property", "rent_payment", vary=current_month)
+def rent_portfolio():
+    end = current_month()
+    start = month_key(*add_months(*parse_month(end), -11))
+    lower, upper = month_bounds(start, end, RentPayment.payment_date)
+    month_start, _ = month_bounds(end, end, RentPayment.payment_date)
+
+    # One grouped pass over the trailing 12 months of payments
+    revenue = {
+        property_id: (total or 0.0, this_month or 0.0, last_paid)
+        for property_id, total, this_month, last_paid in db.session.query(
+            RentPayment.property_id,
+            func.sum(RentPayment.amount),
+            func.sum(case((RentPayment.payment_date >= month_start, RentPayment.amount), else_=0.0)),
+            func.max(RentPayment.payment_date)
+        ).filter(RentPayment.payment_date >= lower, RentPayment.payment_date < upper)
+         .group_by(RentPayment.property_id)
+    }
+
+    properties = []
+    totals = {"properties": 0, "occupied": 0, "monthly_rent_roll": 0.0, "revenue_12m": 0.0,
+              "collected_this_month": 0.0, "potential_12m": 0.0}
+    for p in Property.query.order_by(Property.id):
+        revenue_12m, this_month, last_paid = revenue.get(p.id, (0.0, 0.0, None))
+        # Potential revenue only counts the months since the property was let
+        months_billed = _months_billed(p, start, end)
+        due = p.monthly_rent if months_billed else 0.0
+        potential = p.monthly_rent * months_billed
+        properties.append({
+            "id": p.id,
+            "name": p.name,
+            "location": p.location,
+            "is_occupied": p.is_occupied,
+            "tenant_name": p.tenant_name,
+            "monthly_rent": p.monthly_rent,
+            "revenue_12m": round(revenue_12m, 2),
+            "collected_this_month": round(this_month, 2),
+            "collection_rate": _rate(this_month, due),
+            "collection_rate_12m": _rate(revenue_12m, potential),
+            "last_payment_date": last_paid.strftime("%Y-%m-%d") if last_paid else None,
+        })
+        totals["properties"] += 1
+        totals["occupied"] += 1 if p.is_occupied else 0
+        totals["monthly_rent_roll"] += due
+        totals["revenue_12m"] += revenue_12m
+        totals["collected_this_month"] += this_month
+        totals["potential_12m"] += potential
+
+    summary = {field: round(value, 2) for field, value in totals.items()}
+    summary.update(
+        occupancy_rate=_rate(totals["occupied"], totals["properties"]),
+        collection_rate=_rate(totals["collected_this_month"], totals["monthly_rent_roll"]),
+        collection_rate_12m=_rate(totals["revenue_12m"], totals["potential_12m"]),
+    )
+    return jsonify({"as_of": end, "start": start, "totals": summary, "properties": properties}), 200
+
+
+# ----------------------
+# Rent Arrears
+#    ?start=YYYY-MM&end=YYYY-MM (default: the last 12 months)&property_id=&only_arrears=1
+# ----------------------
+ARREARS_MAX_MONTHS = 60
+
+
+@rent_bp.route("/arrears", methods=["GET"])
+@role_required(["Chairperson", "Rent Manager"])
+def rent_arrears():
+    end = request.args.get("end") or current_month()
+    try:
+        end_year, end_month = parse_month(end)
+        start = request.args.get("start") or month_key(*add_months(end_year, end_month, -11))
+        start_year, start_month = parse_month(start)
+    except ValueError:
+        return jsonify(message="start and end must be YYYY-MM"), 400
+    start, end = month_key(start_year, start_month), month_key(end_year, end_month)
+    span = (end_year - start_year) * 12 + (end_month - start_month) + 1
+    if span < 1:
+        return jsonify(message="start must not be after end"), 400
+    if span > ARREARS_MAX_MONTHS:
+        return jsonify(message=f"At most {ARREARS_MAX_MONTHS} months per request"), 400
+
+    properties = arrears(start, end, request.args.get("property_id", type=int))
+    if request.args.get("only_arrears") in ("1", "true"):
+        properties = [p for p in properties if p["arrears"] > 0]
+
+    return jsonify({
+        "start": start,
+        "end": end,
+        "total_arrears": round(sum(p["arrears"] for p in properties), 2),
+        "properties": properties
+    }), 200
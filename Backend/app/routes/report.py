@@ -1,9 +1,14 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity
 from app.models import Contribution, Loan, RentPayment, User, Person
+from app.utils.ledger import get_totals
+from app.utils.journal import ACCOUNTS, natural_balance, balances as journal_balances
+from app.utils.periods import PERIODS, add_months, current_month, month_key, parse_month, period_of
+from app.utils.rollups import ALL_MEMBERS, SERIES, monthly_series
+from app.utils.response_cache import response_cache
 from app.utils.auth_utils import role_required
 from app import db
-from sqlalchemy import func
+from sqlalchemy import func, or_
 
 report_bp = Blueprint("report", __name__)
 
@@ -13,17 +18,16 @@ report_bp = Blueprint("report", __name__)
 # ------------------------------------------------
 @report_bp.route("/summary", methods=["GET"])
 @role_required(["Chairperson", "Treasurer", "Secretary"])
+@response_cache.cached("contribution", "loan", "rent_payment", "person")
 def summary_report():
-    total_contributions = db.session.query(func.sum(Contribution.amount)).scalar() or 0
-    total_loans = db.session.query(func.sum(Loan.amount)).filter(Loan.status == "approved").scalar() or 0
-    total_rent = db.session.query(func.sum(Rent.amount)).scalar() or 0
-
+    # LedgerTotals, not the journal: see the scope note in app/utils/journal.py
+    totals = get_totals()
     total_members = db.session.query(Person).count()
 
     return jsonify({
-        "total_contributions": total_contributions,
-        "total_loans_issued": total_loans,
-        "total_rent_collected": total_rent,
+        "total_contributions": totals["total_contributions"],
+        "total_loans_issued": totals["total_loans_issued"],
+        "total_rent_collected": totals["total_rent"],
         "total_members": total_members
     })
 
@@ -33,6 +37,7 @@ def summary_report():
 # ------------------------------------------------
 @report_bp.route("/member/<int:person_id>", methods=["GET"])
 @role_required(["Chairperson", "Treasurer", "Secretary", "Member"])
+@response_cache.cached("contribution", "loan", "person")
 def member_report(person_id):
     person = Person.query.get(person_id)
     if not person:
@@ -56,10 +61,12 @@ def member_report(person_id):
 # ------------------------------------------------
 @report_bp.route("/income", methods=["GET"])
 @role_required(["Chairperson", "Treasurer"])
+@response_cache.cached("contribution", "loan", "rent_payment")
 def income_report():
-    total_contributions = db.session.query(func.sum(Contribution.amount)).scalar() or 0
-    total_interest = db.session.query(func.sum(Loan.interest)).scalar() or 0
-    total_rent = db.session.query(func.sum(Rent.amount)).scalar() or 0
+    totals = get_totals()
+    total_contributions = totals["total_contributions"]
+    total_interest = totals["total_loan_interest"]
+    total_rent = totals["total_rent"]
 
     return jsonify({
         "contributions": total_contributions,
@@ -67,3 +74,177 @@ def income_report():
         "rent_income": total_rent,
         "total_income": total_contributions + total_interest + total_rent
     })
+
+
+# ------------------------------------------------
+# ✅ 4. Period trends (monthly / quarterly / yearly)
+#    ?period=month&start=2025-01&end=2025-12&person_id=3
+#    &series=contributions,loans,rent
+# ------------------------------------------------
+# Each closed month in range is computed and stored as a rollup row on first read
+TRENDS_MAX_MONTHS = 120
+
+
+@report_bp.route("/trends", methods=["GET"])
+@role_required(["Chairperson", "Treasurer", "Secretary"])
+# The default window ends at the current month, so the month is part of the key
+@response_cache.cached("contribution", "loan", "rent_payment", vary=current_month)
+def trends_report():
+    period = request.args.get("period", "month")
+    if period not in PERIODS:
+        return jsonify(message=f"period must be one of {', '.join(PERIODS)}"), 400
+
+    end = request.args.get("end") or current_month()
+    try:
+        end_year, end_month = parse_month(end)
+        start = request.args.get("start") or month_key(*add_months(end_year, end_month, -11))
+        start_year, start_month = parse_month(start)
+    except ValueError:
+        return jsonify(message="start and end must be YYYY-MM"), 400
+    start, end = month_key(start_year, start_month), month_key(end_year, end_month)
+    span = (end_year - start_year) * 12 + (end_month - start_month) + 1
+    if span < 1:
+        return jsonify(message="start must not be after end"), 400
+    if span > TRENDS_MAX_MONTHS:
+        return jsonify(message=f"At most {TRENDS_MAX_MONTHS} months per request"), 400
+
+    person_id = request.args.get("person_id", ALL_MEMBERS, type=int)
+    names = [n.strip() for n in request.args.get("series", ",".join(SERIES)).split(",") if n.strip()]
+    unknown = [n for n in names if n not in SERIES]
+    if unknown:
+        return jsonify(message=f"Unknown series: {', '.join(unknown)}"), 400
+
+    result = {}
+    for name in names:
+        # Rent is collected per property, not per member
+        if person_id and SERIES[name].person is None:
+            continue
+
+        buckets = {}
+        for month, total, count in monthly_series(name, start, end, person_id):
+            key = period_of(month, period)
+            bucket = buckets.setdefault(key, {"period": key, "total": 0.0, "count": 0})
+            bucket["total"] += total
+            bucket["count"] += count
+        result[name] = list(buckets.values())
+
+    return jsonify({
+        "period": period,
+        "start": start,
+        "end": end,
+        "person_id": person_id or None,
+        "series": result
+    })
+
+
+# ------------------------------------------------
+# ✅ 5. All-members financial statement (Admin)
+#    ?q=<name or phone>&sort=contributions&order=desc&page=1&per_page=50
+# ------------------------------------------------
+MEMBER_SORT_KEYS = ("name", "contributions", "loans_taken", "loans_repaid", "id")
+
+
+@report_bp.route("/members", methods=["GET"])
+@role_required(["Chairperson", "Treasurer", "Secretary"])
+@response_cache.cached("contribution", "loan", "person")
+def members_report():
+    sort = request.args.get("sort", "name")
+    if sort not in MEMBER_SORT_KEYS:
+        return jsonify(message=f"sort must be one of {', '.join(MEMBER_SORT_KEYS)}"), 400
+    descending = request.args.get("order", "asc") == "desc"
+    page = max(request.args.get("page", 1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", 50, type=int), 1), 200)
+
+    # One aggregate per table, grouped by person, joined back to Person
+    contributions = db.session.query(
+        Contribution.person_id,
+        func.sum(Contribution.amount).label("total")
+    ).group_by(Contribution.person_id).subquery()
+    loans = db.session.query(
+        Loan.person_id,
+        func.sum(Loan.amount).label("taken"),
+        func.sum(Loan.repayment_amount).label("repaid")
+    ).group_by(Loan.person_id).subquery()
+
+    columns = {
+        "id": Person.id,
+        "name": Person.full_name,
+        "contributions": func.coalesce(contributions.c.total, 0).label("contributions"),
+        "loans_taken": func.coalesce(loans.c.taken, 0).label("loans_taken"),
+        "loans_repaid": func.coalesce(loans.c.repaid, 0).label("loans_repaid"),
+    }
+    query = db.session.query(
+        Person.id, Person.full_name, Person.phone,
+        columns["contributions"], columns["loans_taken"], columns["loans_repaid"]
+    ).outerjoin(contributions, contributions.c.person_id == Person.id)\
+     .outerjoin(loans, loans.c.person_id == Person.id)
+
+    search = request.args.get("q")
+    if search:
+        pattern = f"%{search}%"
+        query = query.filter(or_(Person.full_name.ilike(pattern), Person.phone.ilike(pattern)))
+
+    total = query.order_by(None).count()
+    sort_column = columns[sort].desc() if descending else columns[sort].asc()
+    rows = query.order_by(sort_column, Person.id.asc())\
+                .offset((page - 1) * per_page).limit(per_page).all()
+
+    return jsonify({
+        "members": [
+            {
+                "person_id": person_id,
+                "member_name": name,
+                "phone": phone,
+                "contributions": contributed,
+                "loans_taken": taken,
+                "loans_repaid": repaid
+            } for person_id, name, phone, contributed, taken, repaid in rows
+        ],
+        "page": page,
+        "per_page": per_page,
+        "total": total
+    })
+
+
+# ------------------------------------------------
+# ✅ 6. Journal account balances (Admin)
+#    Newest snapshot + the entries after it; ?by_member=1 splits member accounts
+# ------------------------------------------------
+@report_bp.route("/accounts", methods=["GET"])
+@role_required(["Chairperson", "Treasurer"])
+@response_cache.cached("journal_line", "account_snapshot")
+def account_balances():
+    totals = {account: 0 for account in ACCOUNTS}
+    for (account, _), cents in journal_balances().items():
+        totals[account] = totals.get(account, 0) + cents
+
+    return jsonify({
+        "accounts": [
+            {"account": account, "normal_side": ACCOUNTS.get(account, "debit"),
+             "balance": natural_balance(account, cents)}
+            for account, cents in totals.items()
+        ]
+    })
+
+
+@report_bp.route("/accounts/<account>", methods=["GET"])
+@role_required(["Chairperson", "Treasurer"])
+@response_cache.cached("journal_line", "account_snapshot")
+def account_balance(account):
+    if account not in ACCOUNTS:
+        return jsonify(message=f"account must be one of {', '.join(ACCOUNTS)}"), 400
+    person_id = request.args.get("person_id", type=int)
+
+    rows = journal_balances(account=account, person_id=person_id)
+    result = {
+        "account": account,
+        "normal_side": ACCOUNTS[account],
+        "person_id": person_id,
+        "balance": natural_balance(account, sum(rows.values())),
+    }
+    if request.args.get("by_member") in ("1", "true"):
+        result["members"] = [
+            {"person_id": pid, "balance": natural_balance(account, cents)}
+            for (_, pid), cents in sorted(rows.items(), key=lambda item: item[0][1])
+        ]
+    return jsonify(result)
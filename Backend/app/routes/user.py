@@ -1,8 +1,13 @@
+from concurrent.futures import TimeoutError as HashTimeout
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity
 from app import db
 from app.models import User, Person, Role
-from app.utils.auth_utils import role_required
+from app.utils.auth_utils import role_required, evict_principal
+from app.utils.passwords import hasher, PasswordHasherBusy
+from sqlalchemy.exc import IntegrityError
+import csv
+import io
 
 user_bp = Blueprint("user", __name__)
 
@@ -64,6 +69,8 @@ def list_users():
 @role_required(["Chairperson"])
 def change_user_role(user_id):
     user = User.query.get(user_id)
+    if not user:
+        return jsonify(message="User not found"), 404
     data = request.get_json()
 
     new_role = Role.query.filter_by(name=data["role"]).first()
@@ -72,5 +79,126 @@ def change_user_role(user_id):
 
     user.role_id = new_role.id
     db.session.commit()
+    evict_principal(user.id)
 
     return jsonify(message=f"User role updated to {new_role.name}"), 200
+
+
+# ----------------------------------------------
+# ✅ 5. Bulk member onboarding (Chairperson)
+#    JSON: [{"full_name", "phone", "email", "password", "role"}, ...]
+#          or {"members": [...]}
+#    CSV:  upload as "file" or send as text/csv with the same columns
+# ----------------------------------------------
+IMPORT_FIELDS = ("full_name", "phone", "email", "password")
+IMPORT_BATCH_SIZE = 200
+# Every row is bcrypt-hashed inside the request: keep an import within BCRYPT_BULK_TIMEOUT
+IMPORT_MAX_ROWS = 500
+
+
+def _read_import_rows():
+    upload = request.files.get("file")
+    if upload:
+        text = upload.stream.read().decode("utf-8-sig")
+        return list(csv.DictReader(io.StringIO(text)))
+    if request.mimetype == "text/csv":
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("members")
+    return data if isinstance(data, list) else None
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+@user_bp.route("/import", methods=["POST"])
+@role_required(["Chairperson"])
+def import_members():
+    rows = _read_import_rows()
+    if not rows:
+        return jsonify(message="No members provided"), 400
+    if len(rows) > IMPORT_MAX_ROWS:
+        return jsonify(message=f"At most {IMPORT_MAX_ROWS} members per import"), 400
+
+    # Resolve every role once
+    roles = {r.name.lower(): r.id for r in Role.query.all()}
+
+    results = [
+        {"row": i + 1, "email": row.get("email") if isinstance(row, dict) else None}
+        for i, row in enumerate(rows)
+    ]
+    valid = []
+    seen_emails, seen_phones = set(), set()
+    for result, row in zip(results, rows):
+        if not isinstance(row, dict):
+            result.update(status="error", message="Row must be an object")
+            continue
+        row = {k: (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}
+        missing = [f for f in IMPORT_FIELDS if not row.get(f)]
+        role_id = roles.get(str(row.get("role") or "Member").lower())
+        if missing:
+            result.update(status="error", message=f"Missing field: {missing[0]}")
+        elif not all(isinstance(row[f], str) for f in IMPORT_FIELDS):
+            result.update(status="error", message="Fields must be text")
+        elif not role_id:
+            result.update(status="error", message="Invalid role")
+        elif row["email"] in seen_emails or row["phone"] in seen_phones:
+            result.update(status="error", message="Duplicate email or phone in upload")
+        else:
+            seen_emails.add(row["email"])
+            seen_phones.add(row["phone"])
+            valid.append((result, row, role_id))
+
+    # Set-based duplicate check against existing members
+    taken_emails, taken_phones = set(), set()
+    for chunk in _chunks(list(seen_emails), 500):
+        taken_emails.update(e for (e,) in db.session.query(User.email).filter(User.email.in_(chunk)))
+    for chunk in _chunks(list(seen_phones), 500):
+        taken_phones.update(p for (p,) in db.session.query(Person.phone).filter(Person.phone.in_(chunk)))
+
+    pending = []
+    for result, row, role_id in valid:
+        if row["email"] in taken_emails:
+            result.update(status="error", message="Email already registered")
+        elif row["phone"] in taken_phones:
+            result.update(status="error", message="Phone already registered")
+        else:
+            pending.append((result, row, role_id))
+
+    try:
+        hashes = hasher.hash_many([row["password"] for _, row, _ in pending])
+
+        for batch in _chunks(list(zip(pending, hashes)), IMPORT_BATCH_SIZE):
+            people = [
+                Person(full_name=row["full_name"], phone=row["phone"])
+                for (_, row, _), _ in batch
+            ]
+            db.session.add_all(people)
+            db.session.flush()
+
+            db.session.add_all([
+                User(email=row["email"], password_hash=pw_hash, role_id=role_id, person_id=person.id)
+                for ((_, row, role_id), pw_hash), person in zip(batch, people)
+            ])
+            db.session.flush()
+        db.session.commit()
+    except (PasswordHasherBusy, HashTimeout):
+        db.session.rollback()
+        return jsonify(message="Server busy, please retry"), 503, {"Retry-After": "5"}
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify(message="Import failed — duplicate info was added concurrently, nothing was saved"), 409
+
+    for result, _, _ in pending:
+        result.update(status="created")
+
+    created = len(pending)
+    return jsonify(
+        created=created,
+        failed=len(rows) - created,
+        results=results
+    ), 201 if created else 400
@@ -0,0 +1,123 @@
+from collections import defaultdict
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from app import db
+
+DRIFT_TOLERANCE = 0.005
+
+
+# ---------------------------------------
+# A row's values before and after a flush
+# ---------------------------------------
+def old_value(obj, attr):
+    """The value ``attr`` had when ``obj`` was loaded, before pending changes."""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.added:
+        return None
+    return getattr(obj, attr)
+
+
+def row_values(obj, version="current"):
+    """``value(attr)`` reading ``obj``'s current attributes, or its pre-flush ones for version="old"."""
+    if version == "current":
+        return lambda attr: getattr(obj, attr)
+    return lambda attr: old_value(obj, attr)
+
+
+def _keep_history(target, value, oldvalue, initiator):
+    return value
+
+
+def keep_history(*attributes):
+    """Load the previous value of each attribute on set so ``old_value`` can see it."""
+    for attribute in attributes:
+        if not event.contains(attribute, "set", _keep_history):
+            event.listen(attribute, "set", _keep_history, active_history=True, retval=True)
+
+
+# ---------------------------------------
+# Aggregate tables kept in step with writes
+# ---------------------------------------
+def collect_deltas(session, models, row_amounts):
+    """{key: {field: amount}} that the session's pending writes to ``models`` add to an aggregate.
+
+    ``row_amounts(obj, value)`` returns {key: {field: amount}} for one row,
+    reading its attributes through ``value``. Inserts add the row's amounts,
+    deletes subtract them and updates add the new amounts less the old.
+    """
+    deltas = defaultdict(lambda: defaultdict(float))
+
+    def add(obj, version, sign):
+        for key, amounts in row_amounts(obj, row_values(obj, version)).items():
+            for field, amount in amounts.items():
+                deltas[key][field] += sign * amount
+
+    for obj in session.new:
+        if isinstance(obj, models):
+            add(obj, "current", 1)
+    for obj in session.deleted:
+        if isinstance(obj, models):
+            add(obj, "old", -1)
+    for obj in session.dirty:
+        if isinstance(obj, models) and session.is_modified(obj):
+            add(obj, "current", 1)
+            add(obj, "old", -1)
+
+    return {
+        key: {field: amount for field, amount in fields.items() if amount}
+        for key, fields in deltas.items()
+        if any(fields.values())
+    }
+
+
+def add_to_rows(session, table, fields, deltas, **values):
+    """Add ``{key: {field: amount}}`` to the rows of ``table`` with those primary keys.
+
+    Missing rows are created with the other ``fields`` at zero. It is a single
+    INSERT ... ON CONFLICT DO UPDATE, so two transactions writing the first
+    amount for a key cannot both insert. ``values`` (e.g. updated_at) are
+    set on every row touched. ORM writes reach this through the flush hooks;
+    call it directly for bulk Core writes that bypass the session.
+    """
+    deltas = {key: amounts for key, amounts in deltas.items() if amounts}
+    if not deltas:
+        return
+
+    (key_column,) = table.primary_key.columns
+    rows = [
+        {key_column.name: key, **{field: deltas[key].get(field, 0.0) for field in fields}, **values}
+        for key in sorted(deltas)  # one lock order for every writer
+    ]
+    dialect = db.engine.dialect.name
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(table)
+        stmt = stmt.on_duplicate_key_update({
+            **{field: table.c[field] + stmt.inserted[field] for field in fields},
+            **{name: stmt.inserted[name] for name in values},
+        })
+    else:
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+        stmt = stmt.on_conflict_do_update(index_elements=[key_column], set_={
+            **{field: table.c[field] + stmt.excluded[field] for field in fields},
+            **{name: stmt.excluded[name] for name in values},
+        })
+    session.connection().execute(stmt, rows)
+
+
+def find_drift(stored, actual, fields):
+    """{key: {field: (stored, actual)}} where stored and recomputed values disagree.
+
+    A key missing from ``stored`` drifts on every field; one missing from
+    ``actual`` is expected to be zero.
+    """
+    drift = {}
+    for key in set(stored) | set(actual):
+        row, expected = stored.get(key), actual.get(key, {})
+        for field in fields:
+            stored_value = row.get(field) if row else None
+            expected_value = expected.get(field, 0.0)
+            if stored_value is None or abs(stored_value - expected_value) > DRIFT_TOLERANCE:
+                drift.setdefault(key, {})[field] = (stored_value, expected_value)
+    return drift
@@ -0,0 +1,173 @@
+import calendar
+from datetime import date
+from sqlalchemy import case, extract, func, select
+from app import db
+from app.models import Loan, LOAN_OPEN_STATUSES
+
+# Loans use flat interest: the total due (amount + interest) is split into
+# equal monthly installments, the last one falling on ``due_date``.
+
+
+def add_months(day, n):
+    index = day.year * 12 + (day.month - 1) + n
+    year, month = index // 12, index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def installments_due(due_date, installments, today):
+    """How many of the loan's installments fall on or before ``today`` (closed form, no loop)."""
+    if due_date is None:
+        return 0
+    months_left = (due_date.year - today.year) * 12 + (due_date.month - today.month)
+    this_month_day = min(due_date.day, calendar.monthrange(today.year, today.month)[1])
+    first_due_offset = months_left if this_month_day <= today.day else months_left + 1
+    return min(max(installments - max(first_due_offset, 0), 0), installments)
+
+
+def position(amount, interest, installments, due_date, repaid, today):
+    """Outstanding principal, accrued interest and arrears of one loan.
+
+    Repayments are split between principal and interest in proportion to
+    the loan's total due.
+    """
+    amount, interest, repaid = amount or 0.0, interest or 0.0, repaid or 0.0
+    installments = max(installments or 1, 1)
+    total_due = amount + interest
+    due_count = installments_due(due_date, installments, today)
+    expected = total_due * due_count / installments
+    principal_share = amount / total_due if total_due else 1.0
+
+    return {
+        "installments_due": due_count,
+        "expected_to_date": round(expected, 2),
+        "repaid": round(repaid, 2),
+        "balance": round(max(total_due - repaid, 0.0), 2),
+        "outstanding_principal": round(max(amount - repaid * principal_share, 0.0), 2),
+        "accrued_interest": round(interest * due_count / installments, 2),
+        "arrears": round(max(expected - repaid, 0.0), 2),
+    }
+
+
+def schedule(loan, today=None):
+    """Installment-by-installment schedule for one loan, with repayments applied oldest first."""
+    today = today or date.today()
+    installments = max(loan.installments or 1, 1)
+    amount, interest = loan.amount or 0.0, loan.interest or 0.0
+    remaining = loan.repayment_amount or 0.0
+    rows = []
+    for number in range(1, installments + 1):
+        due_on = add_months(loan.due_date, number - installments) if loan.due_date else None
+        due = (amount + interest) / installments
+        paid = min(remaining, due)
+        remaining -= paid
+        if paid >= due - 0.005:
+            status = "paid"
+        elif due_on and due_on <= today:
+            status = "overdue"
+        else:
+            status = "upcoming"
+        rows.append({
+            "number": number,
+            "due_date": due_on.strftime("%Y-%m-%d") if due_on else None,
+            "principal": round(amount / installments, 2),
+            "interest": round(interest / installments, 2),
+            "amount": round(due, 2),
+            "paid": round(paid, 2),
+            "status": status,
+        })
+    return rows
+
+
+# ---------------------------------------
+# Portfolio: the same arithmetic as position(), as SQL over every loan
+# ---------------------------------------
+def _greatest(value, floor):
+    # Native two-argument max/min: a CASE would evaluate ``value`` twice, and it nests
+    if db.engine.dialect.name == "sqlite":
+        return func.max(value, floor)
+    return func.greatest(value, floor)
+
+
+def _least(value, ceiling):
+    if db.engine.dialect.name == "sqlite":
+        return func.min(value, ceiling)
+    return func.least(value, ceiling)
+
+
+def positions_subquery(today, statuses=LOAN_OPEN_STATUSES):
+    """Subquery with ``position()`` of every loan in ``statuses`` as of ``today``, computed in SQL.
+
+    Built in stages so each intermediate value (months to due date,
+    installments due) is evaluated once per row.
+    """
+    base = db.session.query(
+        Loan.id.label("loan_id"),
+        Loan.person_id,
+        Loan.due_date,
+        func.coalesce(Loan.amount, 0.0).label("amount"),
+        func.coalesce(Loan.interest, 0.0).label("interest"),
+        func.coalesce(Loan.repayment_amount, 0.0).label("repaid"),
+        _greatest(func.coalesce(Loan.installments, 1), 1).label("installments"),
+        ((extract("year", Loan.due_date) - today.year) * 12
+         + (extract("month", Loan.due_date) - today.month)).label("months_left"),
+        extract("day", Loan.due_date).label("due_day"),
+    ).filter(Loan.status.in_(statuses)).subquery("loan_base")
+
+    # installments_due(): the month offset of the first installment not yet due
+    if today.day == calendar.monthrange(today.year, today.month)[1]:
+        first_due_offset = base.c.months_left  # every due day is clamped to or before today
+    else:
+        first_due_offset = base.c.months_left + case((base.c.due_day <= today.day, 0), else_=1)
+    counted = db.session.query(
+        base,
+        (base.c.amount + base.c.interest).label("total_due"),
+        case(
+            (base.c.due_date.is_(None), 0),
+            else_=_least(_greatest(base.c.installments - _greatest(first_due_offset, 0), 0), base.c.installments),
+        ).label("installments_due"),
+    ).subquery("loan_counted")
+
+    expected = counted.c.total_due * counted.c.installments_due / counted.c.installments
+    principal_share = case((counted.c.total_due > 0, counted.c.amount / counted.c.total_due), else_=1.0)
+    return db.session.query(
+        counted.c.loan_id,
+        counted.c.person_id,
+        counted.c.due_date,
+        counted.c.installments_due,
+        expected.label("expected_to_date"),
+        counted.c.repaid,
+        _greatest(counted.c.total_due - counted.c.repaid, 0.0).label("balance"),
+        _greatest(counted.c.amount - counted.c.repaid * principal_share, 0.0).label("outstanding_principal"),
+        (counted.c.interest * counted.c.installments_due / counted.c.installments).label("accrued_interest"),
+        _greatest(expected - counted.c.repaid, 0.0).label("arrears"),
+    ).subquery("loan_position")
+
+
+def portfolio(today=None, statuses=LOAN_OPEN_STATUSES):
+    """Position of every open loan, computed by the database in one query."""
+    positions = positions_subquery(today or date.today(), statuses)
+    rows = db.session.execute(select(positions).order_by(positions.c.loan_id))
+    return [
+        {"loan_id": loan_id, "person_id": person_id, "due_date": due_date, "installments_due": due_count,
+         "expected_to_date": round(expected, 2), "repaid": round(repaid, 2), "balance": round(balance, 2),
+         "outstanding_principal": round(principal, 2), "accrued_interest": round(accrued, 2),
+         "arrears": round(arrears, 2)}
+        for loan_id, person_id, due_date, due_count, expected, repaid, balance, principal, accrued, arrears in rows
+    ]
+
+
+SUMMARY_FIELDS = ("balance", "outstanding_principal", "accrued_interest", "arrears", "repaid")
+
+
+def portfolio_totals(today=None, statuses=LOAN_OPEN_STATUSES):
+    """Portfolio-wide totals aggregated in SQL, without loading the loans."""
+    positions = positions_subquery(today or date.today(), statuses)
+    row = db.session.query(
+        *(func.coalesce(func.sum(positions.c[field]), 0.0) for field in SUMMARY_FIELDS),
+        func.count(positions.c.loan_id),
+        func.coalesce(func.sum(case((positions.c.arrears >= 0.005, 1), else_=0)), 0),
+    ).one()
+
+    totals = {field: round(value, 2) for field, value in zip(SUMMARY_FIELDS, row)}
+    totals["loans"], totals["loans_in_arrears"] = row[-2], int(row[-1])
+    return totals
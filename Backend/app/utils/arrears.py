@@ -0,0 +1,210 @@
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, func, insert, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Property, RentInvoice, RentPayment, Role, User
+from app.utils.aggregates import collect_deltas, keep_history
+from app.utils.notify import send_notifications_bulk
+from app.utils.periods import (
+    add_months, current_month, month_bounds, month_bucket, month_key, month_range, parse_month
+)
+from app.utils.response_cache import mark_dirty
+
+MANAGER_ROLES = ("Rent Manager", "RentManager", "Chairperson")
+
+
+# ---------------------------------------
+# Rent due vs paid, every property x month in two queries
+# ---------------------------------------
+def compute_months(months, property_id=None):
+    """(property_id, name, tenant_name, tenant_phone, month, due, paid) for occupied properties.
+
+    A property is billed from the month it was let (Property.occupied_since)
+    at its current rent. Payments are grouped by (property, month) in one
+    query and spread over the month grid here, so the range length is not
+    limited by the database.
+    """
+    if not months:
+        return []
+    bucket = month_bucket(RentPayment.payment_date)
+    lower, upper = month_bounds(months[0], months[-1], RentPayment.payment_date)
+    paid = db.session.query(RentPayment.property_id, bucket, func.sum(RentPayment.amount))\
+                     .filter(RentPayment.payment_date >= lower, RentPayment.payment_date < upper)
+    properties = db.session.query(
+        Property.id, Property.name, Property.tenant_name, Property.tenant_phone,
+        Property.monthly_rent, month_bucket(Property.occupied_since)
+    ).filter(Property.is_occupied.is_(True), Property.occupied_since.isnot(None))
+    if property_id:
+        paid = paid.filter(RentPayment.property_id == property_id)
+        properties = properties.filter(Property.id == property_id)
+
+    paid_by_month = {(pid, month): total or 0.0 for pid, month, total in paid.group_by(RentPayment.property_id, bucket)}
+    return [
+        (pid, name, tenant_name, tenant_phone, month, rent, paid_by_month.get((pid, month), 0.0))
+        for pid, name, tenant_name, tenant_phone, rent, let_month in properties.order_by(Property.id)
+        for month in months
+        if month >= let_month
+    ]
+
+
+def generate_invoices(months):
+    """Create missing invoices for occupied properties in ``months``. Returns how many were created.
+
+    Only months from each property's occupied_since onwards are invoiced.
+    Called by the invoicing job; request handlers only read invoices.
+    """
+    existing = set(
+        db.session.query(RentInvoice.property_id, RentInvoice.month).filter(RentInvoice.month.in_(months))
+    )
+    rows = [
+        {"property_id": pid, "month": month, "amount_due": due, "amount_paid": paid,
+         "tenant_name": tenant_name, "tenant_phone": tenant_phone}
+        for pid, _, tenant_name, tenant_phone, month, due, paid in compute_months(months)
+        if (pid, month) not in existing
+    ]
+    if not rows:
+        return 0
+    try:
+        db.session.execute(insert(RentInvoice), rows)
+        mark_dirty(db.session, RentInvoice.__table__.name)
+        db.session.commit()
+    except IntegrityError:
+        # Another run invoiced the same months first
+        db.session.rollback()
+        return 0
+    return len(rows)
+
+
+def arrears(start, end, property_id=None):
+    """Rent due, paid and outstanding per property for each month from ``start`` to ``end``.
+
+    Read-only. Invoiced (property, month) pairs come from RentInvoice; pairs
+    the invoicing job has not reached yet (the open month, or a property let
+    after that month's run) are computed live. Months after the current one
+    are ignored.
+    """
+    months = [m for m in month_range(start, end) if m <= current_month()]
+    if not months:
+        return []
+
+    invoices = db.session.query(
+        RentInvoice.property_id, Property.name, RentInvoice.tenant_name, RentInvoice.tenant_phone,
+        RentInvoice.month, RentInvoice.amount_due, RentInvoice.amount_paid
+    ).join(Property, RentInvoice.property_id == Property.id)\
+     .filter(RentInvoice.month >= months[0], RentInvoice.month <= months[-1])
+    if property_id:
+        invoices = invoices.filter(RentInvoice.property_id == property_id)
+    rows = invoices.all()
+
+    invoiced = {(pid, month) for pid, _, _, _, month, _, _ in rows}
+    rows.extend(row for row in compute_months(months, property_id) if (row[0], row[4]) not in invoiced)
+
+    properties = {}
+    for pid, name, tenant_name, tenant_phone, month, due, paid in rows:
+        entry = properties.setdefault(pid, {
+            "property_id": pid, "property": name, "tenant_name": tenant_name, "tenant_phone": tenant_phone,
+            "months": [], "total_due": 0.0, "total_paid": 0.0,
+        })
+        entry["months"].append({"month": month, "due": due, "paid": round(paid, 2), "balance": round(due - paid, 2)})
+        entry["total_due"] += due
+        entry["total_paid"] += paid
+
+    for entry in properties.values():
+        entry["months"].sort(key=lambda m: m["month"])
+        entry["total_due"] = round(entry["total_due"], 2)
+        entry["total_paid"] = round(entry["total_paid"], 2)
+        entry["arrears"] = round(max(entry["total_due"] - entry["total_paid"], 0.0), 2)
+        entry["months_in_arrears"] = sum(1 for m in entry["months"] if m["balance"] > 0.005)
+    return sorted(properties.values(), key=lambda p: p["property_id"])
+
+
+# ---------------------------------------
+# Keep invoice amount_paid in step with payments
+# ---------------------------------------
+def _payment_amounts(obj, value):
+    """{(property_id, month): {"amount_paid": amount}} one payment adds to its month's invoice."""
+    paid_on = value("payment_date") or datetime.utcnow()  # the column default
+    return {(value("property_id"), paid_on.strftime("%Y-%m")): {"amount_paid": value("amount") or 0}}
+
+
+def _before_flush(session, flush_context, instances):
+    deltas = collect_deltas(session, RentPayment, _payment_amounts)
+
+    table = RentInvoice.__table__
+    touched = False
+    for (property_id, month), fields in deltas.items():
+        result = session.connection().execute(
+            update(table)
+            .where(table.c.property_id == property_id, table.c.month == month)
+            .values(amount_paid=table.c.amount_paid + fields["amount_paid"])
+        )
+        touched = touched or result.rowcount > 0
+    if touched:
+        mark_dirty(session, table.name)
+
+
+def register_listeners():
+    if event.contains(db.session, "before_flush", _before_flush):
+        return
+    event.listen(db.session, "before_flush", _before_flush)
+    keep_history(RentPayment.property_id, RentPayment.payment_date, RentPayment.amount)
+
+
+# ---------------------------------------
+# Monthly invoicing job
+# ---------------------------------------
+def outstanding_by_property(through_month):
+    """{property_id: (name, outstanding)} for properties whose invoices up to ``through_month`` are short."""
+    balance = func.sum(RentInvoice.amount_due - RentInvoice.amount_paid)
+    rows = db.session.query(RentInvoice.property_id, Property.name, balance)\
+                     .join(Property, RentInvoice.property_id == Property.id)\
+                     .filter(RentInvoice.month <= through_month)\
+                     .group_by(RentInvoice.property_id, Property.name)\
+                     .having(balance > 0.005)
+    return {pid: (name, round(outstanding, 2)) for pid, name, outstanding in rows}
+
+
+def run_invoicing(month=None):
+    """Invoice every occupied property for ``month`` and alert rent managers to arrears.
+
+    The month before is invoiced too if a run was missed.
+    """
+    month = month or current_month()
+    created = generate_invoices([month_key(*add_months(*parse_month(month), -1)), month])
+    behind = outstanding_by_property(month)
+
+    if behind:
+        worst = sorted(behind.values(), key=lambda item: -item[1])
+        total = sum(outstanding for _, outstanding in worst)
+        listed = ", ".join(f"{name} (KES {outstanding:.2f})" for name, outstanding in worst[:10])
+        more = f" and {len(worst) - 10} more" if len(worst) > 10 else ""
+        managers = [
+            user_id for (user_id,) in db.session.query(User.id)
+                                                .join(Role, User.role_id == Role.id)
+                                                .filter(Role.name.in_(MANAGER_ROLES))
+        ]
+        send_notifications_bulk(
+            managers,
+            title="Rent Arrears",
+            message=f"{len(worst)} properties owe KES {total:.2f} in rent as of {month}: {listed}{more}."
+        )
+    return {"month": month, "invoices_created": created, "properties_in_arrears": len(behind)}
+
+
+rent_cli = AppGroup("rent", help="Rent invoicing jobs.")
+
+
+@rent_cli.command("invoices")
+@click.option("--month", default=None, help="Month to invoice as YYYY-MM (default: current month).")
+def invoices_command(month):
+    """Generate monthly rent invoices and flag tenants in arrears."""
+    if month:
+        try:
+            parse_month(month)
+        except ValueError:
+            raise click.BadParameter("use YYYY-MM", param_hint="--month")
+    result = run_invoicing(month)
+    click.echo(f"{result['invoices_created']} invoices created for {result['month']}, "
+               f"{result['properties_in_arrears']} properties in arrears.")
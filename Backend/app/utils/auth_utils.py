@@ -1,7 +1,55 @@
 from functools import wraps
+from collections import namedtuple
 from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
-from flask import jsonify
-from app.models import User
+from flask import jsonify, g
+from app import db
+from app.models import User, Role
+from app.utils.cache import TTLCache
+
+# The authenticated user as seen by handlers, without a User/Role round trip
+Principal = namedtuple("Principal", ["user_id", "person_id", "email", "role"])
+
+# Sized from app.config in init_app; modules import this instance by name
+principal_cache = TTLCache(maxsize=4096, ttl=60)
+
+
+def init_app(app):
+    principal_cache.configure(
+        maxsize=app.config.get("PRINCIPAL_CACHE_SIZE", 4096),
+        ttl=app.config.get("PRINCIPAL_CACHE_TTL", 60),
+    )
+
+
+def load_principal(user_id):
+    """Return the cached Principal for ``user_id`` (one joined query on a miss) and attach it to ``g``."""
+    user_id = int(user_id)
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        row = db.session.query(User.id, User.person_id, User.email, Role.name)\
+                        .join(Role, User.role_id == Role.id)\
+                        .filter(User.id == user_id)\
+                        .first()
+        if row is None:
+            return None
+        principal = Principal(*row)
+        principal_cache.set(user_id, principal)
+
+    g.principal = principal
+    return principal
+
+
+def current_principal():
+    """The Principal loaded by ``role_required`` for this request."""
+    principal = g.get("principal")
+    if principal is None:
+        principal = load_principal(get_jwt_identity())
+    return principal
+
+
+def evict_principal(user_id):
+    """Drop a cached Principal so a role or profile change applies on the next request."""
+    principal_cache.delete(int(user_id))
+
 
 def role_required(allowed_roles):
     def decorator(fn):
@@ -9,13 +57,12 @@ def role_required(allowed_roles):
         def wrapper(*args, **kwargs):
             try:
                 verify_jwt_in_request()
-                current_user_id = get_jwt_identity()
-                user = User.query.get(current_user_id)
+                principal = load_principal(get_jwt_identity())
 
-                if not user:
+                if not principal:
                     return jsonify({"message": "User not found"}), 404
 
-                if user.role.name not in allowed_roles:
+                if principal.role not in allowed_roles:
                     return jsonify({"message": "Access denied"}), 403
 
                 return fn(*args, **kwargs)
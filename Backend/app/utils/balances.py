@@ -0,0 +1,148 @@
+from collections import defaultdict
+from datetime import datetime
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import event, func, insert
+from app import db
+from app.models import Contribution, Loan, MemberBalance, LOAN_OPEN_STATUSES
+from app.utils.aggregates import add_to_rows, collect_deltas, find_drift, keep_history
+
+BALANCE_FIELDS = ("savings", "outstanding", "pending")
+
+
+# ---------------------------------------
+# Per-row contribution to a member's balance
+# ---------------------------------------
+def _loan_balance(status, amount, interest, repaid):
+    status = status or "pending"
+    owed = (amount or 0) + (interest or 0) - (repaid or 0)
+    return {
+        "outstanding": max(owed, 0) if status in LOAN_OPEN_STATUSES else 0,
+        "pending": (amount or 0) if status == "pending" else 0,
+    }
+
+
+def _row_balance(obj, value):
+    """{person_id: {field: amount}} one contribution or loan adds to its member's balance."""
+    if isinstance(obj, Contribution):
+        return {value("person_id"): {"savings": value("amount") or 0}}
+    return {value("person_id"): _loan_balance(value("status"), value("amount"),
+                                              value("interest"), value("repayment_amount"))}
+
+
+def apply_deltas(session, deltas):
+    """Add ``{person_id: {field: amount}}`` to member balances inside the session's transaction."""
+    add_to_rows(session, MemberBalance.__table__, BALANCE_FIELDS, deltas, updated_at=datetime.utcnow())
+
+
+def _before_flush(session, flush_context, instances):
+    apply_deltas(session, collect_deltas(session, (Contribution, Loan), _row_balance))
+
+
+TRACKED_ATTRIBUTES = (
+    Contribution.person_id, Contribution.amount,
+    Loan.person_id, Loan.status, Loan.amount, Loan.interest, Loan.repayment_amount,
+)
+
+
+def register_listeners():
+    if event.contains(db.session, "before_flush", _before_flush):
+        return
+    event.listen(db.session, "before_flush", _before_flush)
+    keep_history(*TRACKED_ATTRIBUTES)
+
+
+# ---------------------------------------
+# Reading and eligibility
+# ---------------------------------------
+def compute_balances(person_id=None):
+    """Recompute balances from the base tables, for one member or everyone. Returns {person_id: {field: amount}}."""
+    savings = db.session.query(Contribution.person_id, func.sum(Contribution.amount))\
+                        .group_by(Contribution.person_id)
+    loans = db.session.query(Loan.person_id, Loan.status, Loan.amount, Loan.interest, Loan.repayment_amount)\
+                      .filter(Loan.status.in_(LOAN_OPEN_STATUSES + ("pending",)))
+    if person_id is not None:
+        savings = savings.filter(Contribution.person_id == person_id)
+        loans = loans.filter(Loan.person_id == person_id)
+
+    balances = defaultdict(lambda: {field: 0.0 for field in BALANCE_FIELDS})
+    for pid, total in savings:
+        balances[pid]["savings"] = total or 0.0
+    for pid, status, amount, interest, repaid in loans:
+        for field, value in _loan_balance(status, amount, interest, repaid).items():
+            balances[pid][field] += value
+    return dict(balances)
+
+
+def get_balance(person_id):
+    """One member's balance from the cache row, computing it from history only if the row is missing."""
+    row = db.session.get(MemberBalance, person_id)
+    if row is None:
+        return compute_balances(person_id).get(person_id, {field: 0.0 for field in BALANCE_FIELDS})
+    return {field: getattr(row, field) for field in BALANCE_FIELDS}
+
+
+def eligibility(person_id):
+    """How much a member may still borrow under the configured policy."""
+    balance = get_balance(person_id)
+    multiplier = current_app.config.get("LOAN_ELIGIBILITY_MULTIPLIER", 3)
+    committed = balance["outstanding"]
+    if current_app.config.get("LOAN_ELIGIBILITY_COUNT_PENDING", True):
+        committed += balance["pending"]
+    limit = balance["savings"] * multiplier
+    return {
+        **{field: round(amount, 2) for field, amount in balance.items()},
+        "multiplier": multiplier,
+        "limit": round(limit, 2),
+        "available": round(max(limit - committed, 0.0), 2),
+    }
+
+
+# ---------------------------------------
+# Verifying and rebuilding
+# ---------------------------------------
+def verify():
+    """Compare stored balances with a fresh recompute. Returns {person_id: {field: (stored, actual)}}."""
+    stored = {
+        row.person_id: {field: getattr(row, field) for field in BALANCE_FIELDS}
+        for row in MemberBalance.query
+    }
+    return find_drift(stored, compute_balances(), BALANCE_FIELDS)
+
+
+def rebuild():
+    """Overwrite every stored balance with a fresh recompute."""
+    balances = compute_balances()
+    table = MemberBalance.__table__
+    now = datetime.utcnow()
+    db.session.execute(table.delete())
+    if balances:
+        db.session.execute(insert(table), [
+            {"person_id": person_id, "updated_at": now, **fields}
+            for person_id, fields in balances.items()
+        ])
+    db.session.commit()
+    return len(balances)
+
+
+balances_cli = AppGroup("balances", help="Maintain the per-member balance cache.")
+
+
+@balances_cli.command("verify")
+def verify_command():
+    """Report drift between member balances and the base tables."""
+    drift = verify()
+    if not drift:
+        click.echo("Member balances match the base tables.")
+        return
+    for person_id, fields in sorted(drift.items()):
+        for field, (stored, actual) in fields.items():
+            click.echo(f"person {person_id} {field}: stored={stored} actual={actual}")
+    raise SystemExit(1)
+
+
+@balances_cli.command("rebuild")
+def rebuild_command():
+    """Recompute every member balance from the base tables."""
+    click.echo(f"Rebuilt balances for {rebuild()} members.")
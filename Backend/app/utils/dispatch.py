@@ -0,0 +1,172 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+
+_STOP = object()
+
+
+class NotificationDispatcher:
+    """In-process queue that commits notification rows in micro-batches.
+
+    Request handlers hand rows to ``submit`` and return immediately; a small
+    pool of worker threads drains the queue and writes each batch with one
+    insert and one commit. When the queue is full the rows are dropped and
+    logged rather than blocking the caller.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._queue = None
+        self._workers = []
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._shutdown_registered = False
+        self._last_batch_lag = None
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # Workers of an earlier init_app are bound to its queue: drain and stop them first
+        if self._workers:
+            self.shutdown(timeout=5)
+        self.app = app
+        self._queue = queue.Queue(maxsize=app.config.get("NOTIFY_QUEUE_MAXSIZE", 10000))
+        app.extensions["notify_dispatcher"] = self
+        if not self._shutdown_registered:
+            atexit.register(self.shutdown, timeout=5)
+            self._shutdown_registered = True
+
+    @property
+    def enabled(self):
+        return self.app is not None and self.app.config.get("NOTIFY_ASYNC", True)
+
+    # ---------------------------------------
+    # Producer side
+    # ---------------------------------------
+    def submit(self, rows):
+        """Queue notification rows. Returns False if async dispatch is disabled."""
+        if not self.enabled:
+            return False
+
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((time.monotonic(), rows))
+        except queue.Full:
+            self._count("dropped", len(rows))
+            logging.error(f"Notification queue full, dropped {len(rows)} notifications")
+        return True
+
+    def flush(self, timeout=None):
+        """Block until every queued notification has been written. Returns False on timeout."""
+        if self._queue is None:
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout=None):
+        """Drain the queue and stop the workers."""
+        self.flush(timeout)
+        with self._lock:
+            workers, self._workers = self._workers, []
+            for _ in workers:
+                self._queue.put(_STOP)
+        for worker in workers:
+            worker.join(timeout)
+
+    def stats(self):
+        with self._queue.mutex:
+            depth = len(self._queue.queue)
+            oldest = self._queue.queue[0][0] if depth and self._queue.queue[0] is not _STOP else None
+
+        return {
+            "queue_depth": depth,
+            "oldest_pending_seconds": round(time.monotonic() - oldest, 3) if oldest else 0.0,
+            "last_batch_lag_seconds": round(self._last_batch_lag, 3) if self._last_batch_lag is not None else None,
+            "workers": len(self._workers),
+            **self.counters(),
+        }
+
+    def counters(self):
+        with self._stats_lock:
+            return {"written": self.written, "failed": self.failed, "dropped": self.dropped}
+
+    def _count(self, name, n):
+        # Workers and request threads update these concurrently
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    # ---------------------------------------
+    # Worker side
+    # ---------------------------------------
+    def _ensure_started(self):
+        if self._workers:
+            return
+        with self._lock:
+            if self._workers:
+                return
+            for i in range(self.app.config.get("NOTIFY_WORKERS", 2)):
+                worker = threading.Thread(target=self._run, args=(self.app, self._queue),
+                                          name=f"notify-dispatch-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+
+    def _run(self, app, work):
+        # A worker keeps the app and queue it was started with, even after init_app swaps them
+        batch_size = app.config.get("NOTIFY_BATCH_SIZE", 500)
+
+        while True:
+            item = work.get()
+            if item is _STOP:
+                work.task_done()
+                return
+
+            batch = [item]
+            rows = list(item[1])
+            stop = False
+            while len(rows) < batch_size:
+                try:
+                    item = work.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                rows.extend(item[1])
+
+            self._write(app, rows)
+            self._last_batch_lag = time.monotonic() - batch[0][0]
+            for _ in batch:
+                work.task_done()
+
+            if stop:
+                work.task_done()
+                return
+
+    def _write(self, app, rows):
+        from app import db
+        from app.utils.notify import write_notifications
+
+        with app.app_context():
+            try:
+                if write_notifications(rows):
+                    self._count("written", len(rows))
+                else:
+                    self._count("failed", len(rows))
+            finally:
+                db.session.remove()
+
+
+dispatcher = NotificationDispatcher()
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, timedelta
+from flask import Response, request, stream_with_context
+from app import db
+
+EXPORT_FORMATS = ("csv", "ndjson")
+CHUNK_ROWS = 500
+
+
+def filter_date_range(query, column):
+    """Apply ?start=YYYY-MM-DD&end=YYYY-MM-DD (both inclusive) to ``column``. Raises ValueError on bad dates."""
+    start, end = request.args.get("start"), request.args.get("end")
+    is_datetime = isinstance(column.type, db.DateTime)
+
+    def bound(value):
+        parsed = datetime.strptime(value, "%Y-%m-%d")
+        return parsed if is_datetime else parsed.date()
+
+    if start:
+        query = query.filter(column >= bound(start))
+    if end:
+        query = query.filter(column < bound(end) + timedelta(days=1))
+    return query
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _encode_chunks(rows, columns, fmt):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == "csv" else None
+    if writer:
+        writer.writerow(columns)
+
+    for count, row in enumerate(rows, 1):
+        values = [_plain(v) for v in row]
+        if writer:
+            writer.writerow(values)
+        else:
+            buffer.write(json.dumps(dict(zip(columns, values))))
+            buffer.write("\n")
+
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_export(query, columns, filename):
+    """Stream ``query`` rows as CSV or NDJSON without materialising the result.
+
+    Rows are pulled from a server-side cursor in batches (``yield_per``) and
+    written out a chunk at a time, so worker memory stays flat. Honours
+    ?format=csv|ndjson and ?gzip=1.
+    """
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    compress = request.args.get("gzip") in ("1", "true")
+
+    rows = query.execution_options(stream_results=True).yield_per(CHUNK_ROWS)
+    chunks = _encode_chunks(rows, columns, fmt)
+    filename = f"{filename}.{fmt}"
+    mimetype = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    if compress:
+        chunks = _gzip(chunks)
+        filename += ".gz"
+        mimetype = "application/gzip"
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
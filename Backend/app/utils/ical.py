@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from itsdangerous import BadSignature, URLSafeSerializer
+from flask import current_app
+
+FEED_SALT = "meeting-calendar-feed"
+EVENT_DURATION = timedelta(hours=2)
+PRODID = "-//Tustahimili Na Lulu//Meetings//EN"
+
+
+# ---------------------------------------
+# Feed tokens: the URL is the credential, since calendar apps cannot send a JWT
+# ---------------------------------------
+def _serializer():
+    return URLSafeSerializer(current_app.config["SECRET_KEY"], salt=FEED_SALT)
+
+
+def feed_token(user_id):
+    return _serializer().dumps({"user_id": user_id})
+
+
+def user_from_token(token):
+    """The user id a feed token was issued to, or None if it was tampered with."""
+    try:
+        return int(_serializer().loads(token)["user_id"])
+    except (BadSignature, KeyError, TypeError, ValueError):
+        return None
+
+
+# ---------------------------------------
+# RFC 5545 rendering
+# ---------------------------------------
+def _escape(value):
+    return (value or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")\
+                        .replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def _fold(line):
+    """Split a content line into 75-octet chunks, continuation lines starting with a space."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts, start = [], 0
+    while start < len(encoded):
+        end = min(start + (75 if not parts else 74), len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:  # don't split a UTF-8 character
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start = end
+    return "\r\n ".join(parts)
+
+
+def _local(value):
+    # Meeting times are entered as local wall-clock time, so they are written as floating times
+    return value.strftime("%Y%m%dT%H%M%S")
+
+
+def render_calendar(meetings, name="Tustahimili Meetings"):
+    """iCalendar text for ``meetings`` (objects with id, date, location, description)."""
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+    for meeting in meetings:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:meeting-{meeting.id}@tustahimili",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_local(meeting.date)}",
+            f"DTEND:{_local(meeting.date + EVENT_DURATION)}",
+            f"SUMMARY:{_escape('Group meeting' + (' at ' + meeting.location if meeting.location else ''))}",
+            f"LOCATION:{_escape(meeting.location)}",
+            f"DESCRIPTION:{_escape(meeting.description)}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
@@ -0,0 +1,127 @@
+import hashlib
+from datetime import datetime, timedelta
+from functools import wraps
+import click
+from flask import current_app, jsonify, make_response, request
+from flask.cli import AppGroup
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import IdempotencyKey
+from app.utils.auth_utils import current_principal
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 100
+
+
+def _fingerprint():
+    digest = hashlib.sha256(f"{request.method} {request.path}\n".encode())
+    digest.update(request.get_data())
+    return digest.hexdigest()
+
+
+def _claim(user_id, key, fingerprint, now):
+    """Reserve ``key`` for this request. Returns (row, claimed); an unclaimed row belongs to an earlier request."""
+    lock_timeout = timedelta(seconds=current_app.config.get("IDEMPOTENCY_LOCK_TIMEOUT", 60))
+    existing = IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+    if existing is not None:
+        expired = existing.expires_at <= now
+        abandoned = existing.status_code is None and existing.created_at <= now - lock_timeout
+        if not (expired or abandoned):
+            return existing, False
+        db.session.delete(existing)
+        db.session.commit()
+
+    row = IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        endpoint=request.endpoint,
+        request_hash=fingerprint,
+        created_at=now,
+        expires_at=now + timedelta(seconds=current_app.config.get("IDEMPOTENCY_TTL", 86400)),
+    )
+    db.session.add(row)
+    try:
+        db.session.commit()
+        return row, True
+    except IntegrityError:
+        # A concurrent retry claimed it first
+        db.session.rollback()
+        return IdempotencyKey.query.filter_by(user_id=user_id, key=key).first(), False
+
+
+def _release(row_id):
+    db.session.rollback()
+    db.session.execute(delete(IdempotencyKey).where(IdempotencyKey.id == row_id))
+    db.session.commit()
+
+
+def idempotent(fn):
+    """Make a POST safe to retry when the client sends an Idempotency-Key header.
+
+    The first request with a key runs normally and its response (anything
+    below 500) is stored for IDEMPOTENCY_TTL seconds. A retry with the same
+    key and body gets the stored response back without running the handler
+    again; a retry while the first is still running gets 409. Reusing a key
+    for a different request is a 422. Apply below ``role_required``.
+    """
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key:
+            return fn(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return jsonify(message=f"{HEADER} must be at most {MAX_KEY_LENGTH} characters"), 400
+
+        fingerprint = _fingerprint()
+        row, claimed = _claim(current_principal().user_id, key, fingerprint, datetime.utcnow())
+
+        if not claimed:
+            if row is None or row.status_code is None:
+                response = jsonify(message="A request with this Idempotency-Key is still being processed")
+                response.status_code = 409
+                response.headers["Retry-After"] = "1"
+                return response
+            if row.endpoint != request.endpoint or row.request_hash != fingerprint:
+                return jsonify(message=f"{HEADER} was already used for a different request"), 422
+            response = current_app.response_class(row.response_body, status=row.status_code,
+                                                  mimetype="application/json")
+            response.headers["Idempotent-Replayed"] = "true"
+            return response
+
+        row_id = row.id
+        try:
+            response = make_response(fn(*args, **kwargs))
+        except Exception:
+            _release(row_id)
+            raise
+        if response.status_code >= 500:
+            _release(row_id)
+            return response
+
+        db.session.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == row_id)
+            .values(status_code=response.status_code, response_body=response.get_data(as_text=True))
+        )
+        db.session.commit()
+        return response
+    return wrapper
+
+
+def purge_expired(now=None):
+    """Delete stored responses past their TTL. Returns the number removed."""
+    result = db.session.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.expires_at <= (now or datetime.utcnow()))
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+idempotency_cli = AppGroup("idempotency", help="Maintain stored Idempotency-Key responses.")
+
+
+@idempotency_cli.command("purge")
+def purge_command():
+    """Delete stored responses past their TTL."""
+    click.echo(f"Removed {purge_expired()} expired idempotency keys.")
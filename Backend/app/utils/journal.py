@@ -0,0 +1,316 @@
+from collections import defaultdict
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, func, insert, text
+from app import db
+from app.models import (
+    Contribution, Loan, RentPayment, JournalEntry, JournalLine, AccountSnapshot, LOAN_ISSUED_STATUSES
+)
+from app.utils.aggregates import keep_history, row_values
+from app.utils.response_cache import mark_dirty
+
+# Scope: /report/accounts reads balances from the journal. /report/summary
+# and /report/income still read LedgerTotals: cash and loans_receivable net
+# a loan's principal against its repayments, so "loans issued" cannot be
+# read back from account balances. `flask journal verify` and
+# `flask ledger verify` check both against the base tables.
+
+# Chart of accounts: name -> normal balance side
+ACCOUNTS = {
+    "cash": "debit",
+    "loans_receivable": "debit",
+    "member_savings": "credit",
+    "interest_income": "credit",
+    "rent_income": "credit",
+}
+NO_MEMBER = 0
+BACKFILL_CHUNK = 500
+
+
+def to_cents(value):
+    return int(round((value or 0) * 100))
+
+
+# ---------------------------------------
+# What each row posts to the journal
+# ---------------------------------------
+def _postings(obj, version="current"):
+    """{(account, person_id): cents} a row contributes, from its current or pre-flush ("old") values.
+
+    Debits are positive and credits negative, so every posting sums to zero.
+    """
+    value = row_values(obj, version)
+    postings = defaultdict(int)
+    if isinstance(obj, Contribution):
+        amount = to_cents(value("amount"))
+        postings[("cash", NO_MEMBER)] += amount
+        postings[("member_savings", value("person_id"))] -= amount
+    elif isinstance(obj, Loan):
+        person_id = value("person_id")
+        if (value("status") or "pending") in LOAN_ISSUED_STATUSES:
+            principal, interest = to_cents(value("amount")), to_cents(value("interest"))
+            postings[("loans_receivable", person_id)] += principal + interest
+            postings[("cash", NO_MEMBER)] -= principal
+            postings[("interest_income", NO_MEMBER)] -= interest
+        repaid = to_cents(value("repayment_amount"))
+        postings[("cash", NO_MEMBER)] += repaid
+        postings[("loans_receivable", person_id)] -= repaid
+    elif isinstance(obj, RentPayment):
+        amount = to_cents(value("amount"))
+        postings[("cash", NO_MEMBER)] += amount
+        postings[("rent_income", NO_MEMBER)] -= amount
+    return postings
+
+
+def _difference(new, old):
+    lines = defaultdict(int)
+    for key, cents in new.items():
+        lines[key] += cents
+    for key, cents in old.items():
+        lines[key] -= cents
+    return {key: cents for key, cents in lines.items() if cents}
+
+
+def _collect_changes(session):
+    """(source row, memo, lines) for updated and deleted rows, read before the flush runs."""
+    entries = []
+    for obj in session.dirty:
+        if not isinstance(obj, (Contribution, Loan, RentPayment)) or not session.is_modified(obj):
+            continue
+        lines = _difference(_postings(obj), _postings(obj, "old"))
+        if lines:
+            entries.append((obj, "adjusted", lines))
+    for obj in session.deleted:
+        lines = _difference({}, _postings(obj, "old"))
+        if lines:
+            entries.append((obj, "reversed", lines))
+    return entries
+
+
+def write_entries(connection, entries, created_at=None):
+    """Insert entries given as (source_type, source_id, memo, {(account, person_id): cents})."""
+    if not entries:
+        return
+    created_at = created_at or datetime.utcnow()
+    entry_table, line_table = JournalEntry.__table__, JournalLine.__table__
+    ids = connection.execute(
+        insert(entry_table).returning(entry_table.c.id, sort_by_parameter_order=True),
+        [
+            {"created_at": created_at, "source_type": source_type, "source_id": source_id, "memo": memo}
+            for source_type, source_id, memo, _ in entries
+        ],
+    ).scalars().all()
+    connection.execute(insert(line_table), [
+        {"entry_id": entry_id, "account": account, "person_id": person_id or NO_MEMBER, "amount_cents": cents}
+        for entry_id, (_, _, _, lines) in zip(ids, entries)
+        for (account, person_id), cents in lines.items()
+    ])
+
+
+def _before_flush(session, flush_context, instances):
+    session.info["journal_changes"] = _collect_changes(session)
+
+
+def _after_flush(session, flush_context):
+    # New rows are posted here, once their ids exist
+    collected = [(obj, "recorded", _difference(_postings(obj), {})) for obj in session.new]
+    collected += session.info.pop("journal_changes", [])
+    entries = [
+        (obj.__table__.name, obj.id, f"{obj.__table__.name} {memo}", lines)
+        for obj, memo, lines in collected
+        if lines
+    ]
+    if entries:
+        write_entries(session.connection(), entries)
+        mark_dirty(session, JournalLine.__table__.name)
+
+
+def _append_only(mapper, connection, target):
+    raise ValueError("The journal is append-only; post a correcting entry instead")
+
+
+TRACKED_ATTRIBUTES = (
+    Contribution.person_id, Contribution.amount,
+    Loan.person_id, Loan.status, Loan.amount, Loan.interest, Loan.repayment_amount,
+    RentPayment.amount,
+)
+
+
+def register_listeners():
+    if event.contains(db.session, "after_flush", _after_flush):
+        return
+    event.listen(db.session, "before_flush", _before_flush)
+    event.listen(db.session, "after_flush", _after_flush)
+    for model in (JournalEntry, JournalLine):
+        event.listen(model, "before_update", _append_only)
+        event.listen(model, "before_delete", _append_only)
+    keep_history(*TRACKED_ATTRIBUTES)
+
+
+# ---------------------------------------
+# Balances: last snapshot + tail of entries
+# ---------------------------------------
+def _latest_snapshot(through=None):
+    query = db.session.query(func.max(AccountSnapshot.through_entry_id))
+    if through is not None:
+        query = query.filter(AccountSnapshot.through_entry_id <= through)
+    return query.scalar() or 0
+
+
+def balances(account=None, person_id=None, through=None):
+    """{(account, person_id): cents} from the newest snapshot plus the entries after it.
+
+    ``through`` caps the entries included (for taking the next snapshot).
+    """
+    base = _latest_snapshot(through)
+    snapshot = db.session.query(AccountSnapshot.account, AccountSnapshot.person_id, AccountSnapshot.balance_cents)\
+                         .filter(AccountSnapshot.through_entry_id == base)
+    tail = db.session.query(JournalLine.account, JournalLine.person_id, func.sum(JournalLine.amount_cents))\
+                     .filter(JournalLine.entry_id > base)
+    if through is not None:
+        tail = tail.filter(JournalLine.entry_id <= through)
+    if account is not None:
+        snapshot = snapshot.filter(AccountSnapshot.account == account)
+        tail = tail.filter(JournalLine.account == account)
+    if person_id is not None:
+        snapshot = snapshot.filter(AccountSnapshot.person_id == person_id)
+        tail = tail.filter(JournalLine.person_id == person_id)
+
+    result = defaultdict(int)
+    for name, pid, cents in snapshot:
+        result[(name, pid)] += cents
+    for name, pid, cents in tail.group_by(JournalLine.account, JournalLine.person_id):
+        result[(name, pid)] += cents or 0
+    return {key: cents for key, cents in result.items() if cents}
+
+
+def natural_balance(account, cents):
+    """Balance in currency units, positive on the account's normal side."""
+    sign = 1 if ACCOUNTS.get(account, "debit") == "debit" else -1
+    return round(sign * cents / 100, 2)
+
+
+def _hold_journal_writers():
+    """Wait for in-flight journal writes and hold off new ones until the transaction ends.
+
+    Afterwards every entry id up to MAX(id) is committed, so a snapshot can
+    stop at that id without skipping an entry that commits later with a
+    lower id. SQLite already allows one writer at a time, and a writer
+    holds its lock until commit, so committed ids have no gaps to fill.
+    """
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute(text(f"LOCK TABLE {JournalEntry.__table__.name} IN SHARE MODE"))
+
+
+def take_snapshot():
+    """Store balances through the newest committed entry. Returns that entry id, or None if nothing is new."""
+    _hold_journal_writers()
+    through = db.session.query(func.max(JournalEntry.id)).scalar()
+    if not through or through <= _latest_snapshot():
+        db.session.rollback()
+        return None
+
+    taken_at = datetime.utcnow()
+    rows = [
+        {"through_entry_id": through, "account": account, "person_id": person_id,
+         "balance_cents": cents, "taken_at": taken_at}
+        for (account, person_id), cents in balances(through=through).items()
+    ]
+    if rows:
+        db.session.execute(insert(AccountSnapshot), rows)
+    else:
+        # Everything nets to zero: still record the snapshot point
+        db.session.add(AccountSnapshot(through_entry_id=through, account="cash", person_id=NO_MEMBER,
+                                       balance_cents=0, taken_at=taken_at))
+    db.session.commit()
+    return through
+
+
+# ---------------------------------------
+# Backfill and verification
+# ---------------------------------------
+def _source_rows():
+    for model in (Contribution, Loan, RentPayment):
+        for obj in model.query.order_by(model.id).yield_per(BACKFILL_CHUNK):
+            yield obj
+
+
+def expected_balances():
+    """{(account, person_id): cents} re-derived from the base tables (full scan)."""
+    result = defaultdict(int)
+    for obj in _source_rows():
+        for key, cents in _postings(obj).items():
+            result[key] += cents
+    return {key: cents for key, cents in result.items() if cents}
+
+
+def backfill():
+    """Post one opening entry per existing contribution, loan and rent payment. Returns the count."""
+    if db.session.query(JournalEntry.id).first():
+        raise click.ClickException("The journal already has entries; backfill only runs on an empty journal")
+
+    created_at = datetime.utcnow()
+    connection = db.session.connection()
+    count, batch = 0, []
+    for obj in _source_rows():
+        lines = _difference(_postings(obj), {})
+        if not lines:
+            continue
+        batch.append((obj.__table__.name, obj.id, f"{obj.__table__.name} opening balance", lines))
+        if len(batch) == BACKFILL_CHUNK:
+            write_entries(connection, batch, created_at)
+            count += len(batch)
+            batch = []
+    write_entries(connection, batch, created_at)
+    count += len(batch)
+    mark_dirty(db.session, JournalLine.__table__.name)
+    db.session.commit()
+    return count
+
+
+def verify():
+    """Problems found: unbalanced entries and balances that differ from the base tables."""
+    problems = []
+    unbalanced = db.session.query(JournalLine.entry_id)\
+                           .group_by(JournalLine.entry_id)\
+                           .having(func.sum(JournalLine.amount_cents) != 0)\
+                           .limit(20).all()
+    for (entry_id,) in unbalanced:
+        problems.append(f"entry {entry_id} does not balance")
+
+    actual, expected = balances(), expected_balances()
+    for key in sorted(set(actual) | set(expected), key=str):
+        if actual.get(key, 0) != expected.get(key, 0):
+            account, person_id = key
+            problems.append(f"{account} (person {person_id}): journal={actual.get(key, 0)} expected={expected.get(key, 0)} cents")
+    return problems
+
+
+journal_cli = AppGroup("journal", help="Maintain the double-entry journal.")
+
+
+@journal_cli.command("backfill")
+def backfill_command():
+    """Build the journal from existing contributions, loans and rent payments."""
+    click.echo(f"Posted {backfill()} opening entries.")
+    take_snapshot()
+
+
+@journal_cli.command("snapshot")
+def snapshot_command():
+    """Snapshot every account balance so reads only sum newer entries."""
+    through = take_snapshot()
+    click.echo(f"Snapshot taken through entry {through}." if through else "No new entries to snapshot.")
+
+
+@journal_cli.command("verify")
+def verify_command():
+    """Check that entries balance and agree with the base tables."""
+    problems = verify()
+    if not problems:
+        click.echo("Journal balances and matches the base tables.")
+        return
+    for problem in problems:
+        click.echo(problem)
+    raise SystemExit(1)
@@ -0,0 +1,121 @@
+from datetime import datetime
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, func
+from app import db
+from app.models import Contribution, Loan, RentPayment, LedgerTotals, LOAN_ISSUED_STATUSES
+from app.utils.aggregates import add_to_rows, collect_deltas, find_drift, keep_history
+
+LEDGER_ID = 1
+TOTAL_FIELDS = ("total_contributions", "total_loans_issued", "total_loan_interest", "total_rent")
+
+
+# ---------------------------------------
+# Per-row contribution to each total
+# ---------------------------------------
+def _loan_totals(status, amount, interest):
+    status = status or "pending"
+    return {
+        "total_loans_issued": (amount or 0) if status in LOAN_ISSUED_STATUSES else 0,
+        "total_loan_interest": interest or 0,
+    }
+
+
+def _row_totals(obj, value):
+    """{LEDGER_ID: {field: amount}} one contribution, loan or rent payment adds to the totals."""
+    if isinstance(obj, Contribution):
+        totals = {"total_contributions": value("amount") or 0}
+    elif isinstance(obj, Loan):
+        totals = _loan_totals(value("status"), value("amount"), value("interest"))
+    else:
+        totals = {"total_rent": value("amount") or 0}
+    return {LEDGER_ID: totals}
+
+
+def apply_deltas(session, **deltas):
+    """Add ``deltas`` ({field: amount}) to the ledger totals inside the session's transaction."""
+    add_to_rows(session, LedgerTotals.__table__, TOTAL_FIELDS, {LEDGER_ID: deltas}, updated_at=datetime.utcnow())
+
+
+def _before_flush(session, flush_context, instances):
+    deltas = collect_deltas(session, (Contribution, Loan, RentPayment), _row_totals)
+    apply_deltas(session, **deltas.get(LEDGER_ID, {}))
+
+
+# Attributes whose previous value the delta needs, even when expired before a change
+TRACKED_ATTRIBUTES = (
+    Contribution.amount,
+    Loan.status, Loan.amount, Loan.interest,
+    RentPayment.amount,
+)
+
+
+def register_listeners():
+    if event.contains(db.session, "before_flush", _before_flush):
+        return
+    event.listen(db.session, "before_flush", _before_flush)
+    keep_history(*TRACKED_ATTRIBUTES)
+
+
+# ---------------------------------------
+# Reading, rebuilding and verifying
+# ---------------------------------------
+def compute_totals():
+    """Recompute every total from the base tables (full scans)."""
+    return {
+        "total_contributions": db.session.query(func.sum(Contribution.amount)).scalar() or 0,
+        "total_loans_issued": db.session.query(func.sum(Loan.amount))
+                                        .filter(Loan.status.in_(LOAN_ISSUED_STATUSES)).scalar() or 0,
+        "total_loan_interest": db.session.query(func.sum(Loan.interest)).scalar() or 0,
+        "total_rent": db.session.query(func.sum(RentPayment.amount)).scalar() or 0,
+    }
+
+
+def get_totals():
+    """Current totals from the aggregate row, falling back to a full recompute if it is missing."""
+    row = db.session.get(LedgerTotals, LEDGER_ID)
+    if row is None:
+        return compute_totals()
+    return {field: getattr(row, field) for field in TOTAL_FIELDS}
+
+
+def verify():
+    """Compare stored totals with a fresh recompute. Returns {field: (stored, actual)} for drifted fields."""
+    row = db.session.get(LedgerTotals, LEDGER_ID)
+    stored = {LEDGER_ID: {field: getattr(row, field) for field in TOTAL_FIELDS}} if row else {}
+    return find_drift(stored, {LEDGER_ID: compute_totals()}, TOTAL_FIELDS).get(LEDGER_ID, {})
+
+
+def rebuild():
+    """Overwrite the stored totals with a fresh recompute."""
+    totals = compute_totals()
+    row = db.session.get(LedgerTotals, LEDGER_ID)
+    if row is None:
+        row = LedgerTotals(id=LEDGER_ID)
+        db.session.add(row)
+    for field, amount in totals.items():
+        setattr(row, field, amount)
+    db.session.commit()
+    return totals
+
+
+ledger_cli = AppGroup("ledger", help="Maintain the incrementally updated ledger totals.")
+
+
+@ledger_cli.command("verify")
+def verify_command():
+    """Report drift between ledger totals and the base tables."""
+    drift = verify()
+    if not drift:
+        click.echo("Ledger totals match the base tables.")
+        return
+    for field, (stored, actual) in drift.items():
+        click.echo(f"{field}: stored={stored} actual={actual}")
+    raise SystemExit(1)
+
+
+@ledger_cli.command("rebuild")
+def rebuild_command():
+    """Recompute ledger totals from the base tables."""
+    for field, amount in rebuild().items():
+        click.echo(f"{field}: {amount}")
@@ -0,0 +1,108 @@
+import logging
+import time
+from datetime import date, datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import update
+from app import db
+from app.models import Loan, User, JobState
+from app.utils.notify import send_notifications_batch
+from app.utils.response_cache import mark_dirty
+
+JOB_NAME = "loan_scan"
+
+
+def scan_loans(days=3, today=None):
+    """Flag overdue loans and remind members of loans falling due within ``days``.
+
+    Both sweeps are single UPDATE ... RETURNING statements on the
+    (status, due_date) index, so each loan is claimed by exactly one run:
+    overdue loans leave the 'approved' status, and a due-soon reminder sets
+    Loan.reminded_at. Concurrent runs (several processes, or the CLI beside
+    the scheduler) therefore never notify a member twice, and a loan
+    approved after a run is still reminded by the next one.
+    """
+    today = today or date.today()
+    now = datetime.utcnow()
+    horizon = today + timedelta(days=days)
+    returned = (Loan.id, Loan.person_id, Loan.amount, Loan.due_date)
+
+    # 'approved' and 'overdue' are both issued and open, so ledger totals and rollups are unaffected
+    overdue = db.session.execute(
+        update(Loan)
+        .where(Loan.status == "approved", Loan.due_date < today)
+        .values(status="overdue")
+        .returning(*returned),
+        execution_options={"synchronize_session": False},
+    ).all()
+    due_soon = db.session.execute(
+        update(Loan)
+        .where(Loan.status == "approved", Loan.due_date >= today, Loan.due_date <= horizon,
+               Loan.reminded_at.is_(None))
+        .values(reminded_at=now)
+        .returning(*returned),
+        execution_options={"synchronize_session": False},
+    ).all()
+    if overdue or due_soon:
+        mark_dirty(db.session, Loan.__table__.name)
+
+    state = db.session.get(JobState, JOB_NAME) or JobState(name=JOB_NAME)
+    state.last_run_at = now
+    db.session.add(state)
+    db.session.commit()
+
+    # One batched notification write for every reminder
+    person_ids = {loan.person_id for loan in overdue + due_soon}
+    users_by_person = {}
+    if person_ids:
+        for user_id, person_id in db.session.query(User.id, User.person_id).filter(User.person_id.in_(person_ids)):
+            users_by_person.setdefault(person_id, []).append(user_id)
+
+    reminders = []
+    for loan in overdue:
+        for user_id in users_by_person.get(loan.person_id, []):
+            reminders.append((user_id, "Loan Overdue",
+                              f"Your loan #{loan.id} of KES {loan.amount} was due on {loan.due_date.strftime('%Y-%m-%d')}."))
+    for loan in due_soon:
+        for user_id in users_by_person.get(loan.person_id, []):
+            reminders.append((user_id, "Loan Due Soon",
+                              f"Your loan #{loan.id} of KES {loan.amount} is due on {loan.due_date.strftime('%Y-%m-%d')}."))
+    send_notifications_batch(reminders)
+
+    return {"overdue": len(overdue), "due_soon": len(due_soon), "reminders": len(reminders)}
+
+
+loans_cli = AppGroup("loans", help="Loan maintenance jobs.")
+
+
+@loans_cli.command("scan")
+@click.option("--days", default=3, show_default=True, help="Remind members of loans due within this many days.")
+def scan_command(days):
+    """Flag overdue loans and send due-date reminders."""
+    result = scan_loans(days)
+    click.echo(f"{result['overdue']} loans marked overdue, {result['due_soon']} due soon, "
+               f"{result['reminders']} reminders sent.")
+
+
+@loans_cli.command("schedule")
+@click.option("--interval", type=int, default=None,
+              help="Seconds between scans (default: LOAN_SCAN_INTERVAL).")
+@click.option("--days", type=int, default=None, help="Reminder window in days (default: LOAN_SCAN_DAYS).")
+def schedule_command(interval, days):
+    """Run the scan every INTERVAL seconds in this process until interrupted.
+
+    Run one of these (or cron `flask loans scan`), not one per web worker.
+    """
+    interval = interval or current_app.config.get("LOAN_SCAN_INTERVAL", 3600)
+    days = days or current_app.config.get("LOAN_SCAN_DAYS", 3)
+    click.echo(f"Scanning loans every {interval}s (reminder window {days} days).")
+    while True:
+        try:
+            logging.info(f"Loan scan: {scan_loans(days)}")
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Loan scan failed: {e}")
+        finally:
+            db.session.remove()
+        time.sleep(interval)
@@ -1,16 +1,71 @@
 from app import db
-from app.models import Notification
+from app.models import Notification, BroadcastNotification
+from app.utils.dispatch import dispatcher
+from app.utils.pubsub import broker
+from sqlalchemy import insert
+from datetime import datetime
 import logging
 
 def send_notification(user_id, title, message):
+    return send_notifications_bulk([user_id], title, message)
+
+
+def send_notifications_bulk(user_ids, title, message):
+    """Send the same notification to many users.
+
+    Rows are handed to the background dispatcher when it is enabled, so the
+    caller never waits on the notifications table; otherwise they are written
+    inline with one batched insert and one commit.
+    """
+    return send_notifications_batch((user_id, title, message) for user_id in user_ids)
+
+
+def send_notifications_batch(items):
+    """Send individual notifications, given as (user_id, title, message), in one batch."""
+    created_at = datetime.utcnow()
+    rows = [
+        {
+            "user_id": user_id,
+            "title": title,
+            "message": message,
+            "is_read": False,
+            "created_at": created_at,
+        } for user_id, title, message in items
+    ]
+    if not rows:
+        return 0
+
+    if dispatcher.submit(rows):
+        return len(rows)
+    return write_notifications(rows)
+
+
+def write_notifications(rows):
+    """Insert prepared notification rows in one transaction. Returns the number written."""
+    try:
+        db.session.execute(insert(Notification), rows)
+        db.session.commit()
+        broker.publish(row["user_id"] for row in rows)
+        return len(rows)
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Failed to write {len(rows)} notifications: {e}")
+        return 0
+
+
+def send_broadcast(title, message, created_by=None):
+    """Announce something to every member with a single row.
+
+    Each user's read state lives in BroadcastReceipt, so the cost of a
+    broadcast no longer grows with the number of members.
+    """
     try:
-        notif = Notification(
-            user_id=user_id,
-            title=title,
-            message=message
-        )
-        db.session.add(notif)
+        broadcast = BroadcastNotification(title=title, message=message, created_by=created_by)
+        db.session.add(broadcast)
         db.session.commit()
+        broker.publish_all()
+        return broadcast
     except Exception as e:
         db.session.rollback()
-        logging.error(f"Failed to send notification to user {user_id}: {e}")
+        logging.error(f"Failed to send broadcast '{title}': {e}")
+        return None
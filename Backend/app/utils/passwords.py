@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, wait
+from app import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool already has as much work queued as it may hold."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a dedicated, size-limited thread pool.
+
+    bcrypt releases the GIL while it works, so a few hashing threads keep the
+    CPU cost of a login burst bounded without blocking other requests. Calls
+    beyond ``BCRYPT_WORKERS + BCRYPT_QUEUE_SIZE`` in flight are refused with
+    PasswordHasherBusy instead of piling up.
+
+    Bulk hashing (member imports) runs on its own pool, so a large import
+    cannot queue ahead of logins. One batch runs at a time and gives up after
+    ``BCRYPT_BULK_TIMEOUT`` seconds.
+    """
+
+    def __init__(self, app=None):
+        self._executor = None
+        self._bulk_executor = None
+        self._slots = None
+        self._bulk_slot = threading.Lock()
+        self.log_rounds = 12
+        self.timeout = None
+        self.bulk_timeout = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        workers = app.config.get("BCRYPT_WORKERS", 2)
+        self.log_rounds = app.config.get("BCRYPT_LOG_ROUNDS", 12)
+        self.timeout = app.config.get("BCRYPT_TIMEOUT", 30)
+        self.bulk_timeout = app.config.get("BCRYPT_BULK_TIMEOUT", 60)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._bulk_executor = ThreadPoolExecutor(
+            max_workers=app.config.get("BCRYPT_BULK_WORKERS", 2), thread_name_prefix="bcrypt-bulk"
+        )
+        self._slots = threading.BoundedSemaphore(workers + app.config.get("BCRYPT_QUEUE_SIZE", 32))
+        app.extensions["password_hasher"] = self
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # The slot is held until the hash finishes, even if the caller times out first
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result(self.timeout)
+
+    def hash(self, password):
+        return self._run(_generate, password)
+
+    def check(self, pw_hash, password):
+        return self._run(bcrypt.check_password_hash, pw_hash, password)
+
+    def hash_many(self, passwords):
+        """Hash a batch of passwords on the bulk pool (member imports).
+
+        Raises PasswordHasherBusy if another batch is running and TimeoutError
+        if the batch does not finish within ``bulk_timeout``.
+        """
+        if not self._bulk_slot.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        futures = []
+        try:
+            futures = [self._bulk_executor.submit(_generate, password) for password in passwords]
+            _, not_done = wait(futures, self.bulk_timeout)
+            if not_done:
+                raise TimeoutError()
+            return [future.result() for future in futures]
+        finally:
+            self._release_bulk_slot(futures)
+
+    def _release_bulk_slot(self, futures):
+        # Queued hashes are dropped; ones already running cannot be stopped,
+        # so the slot is held until the last of them finishes
+        running = [future for future in futures if not future.cancel() and not future.done()]
+        if not running:
+            self._bulk_slot.release()
+            return
+        left, lock = [len(running)], threading.Lock()
+
+        def finished(_):
+            with lock:
+                left[0] -= 1
+                if left[0] == 0:
+                    self._bulk_slot.release()
+
+        for future in running:
+            future.add_done_callback(finished)
+
+    def needs_rehash(self, pw_hash):
+        """True if ``pw_hash`` was made with a different cost factor than BCRYPT_LOG_ROUNDS."""
+        try:
+            return int(pw_hash.split("$")[2]) != self.log_rounds
+        except (IndexError, ValueError):
+            return True
+
+
+def _generate(password):
+    return bcrypt.generate_password_hash(password).decode("utf-8")
+
+
+hasher = PasswordHasher()
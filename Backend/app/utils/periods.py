@@ -0,0 +1,67 @@
+from datetime import date, datetime
+from sqlalchemy import func
+from app import db
+
+PERIODS = ("month", "quarter", "year")
+
+
+def parse_month(value):
+    """'YYYY-MM' -> (year, month). Raises ValueError on bad input."""
+    parsed = datetime.strptime(value, "%Y-%m")
+    return parsed.year, parsed.month
+
+
+def month_key(year, month):
+    return f"{year:04d}-{month:02d}"
+
+
+def add_months(year, month, n):
+    index = year * 12 + (month - 1) + n
+    return index // 12, index % 12 + 1
+
+
+def current_month():
+    today = date.today()
+    return month_key(today.year, today.month)
+
+
+def month_range(start, end):
+    """Every 'YYYY-MM' key from ``start`` to ``end`` inclusive."""
+    year, month = parse_month(start)
+    end_year, end_month = parse_month(end)
+    keys = []
+    while (year, month) <= (end_year, end_month):
+        keys.append(month_key(year, month))
+        year, month = add_months(year, month, 1)
+    return keys
+
+
+def month_bounds(start, end, column):
+    """Half-open [first day of ``start``, first day after ``end``) typed for ``column``."""
+    start_year, start_month = parse_month(start)
+    end_year, end_month = add_months(*parse_month(end), 1)
+    lower, upper = date(start_year, start_month, 1), date(end_year, end_month, 1)
+    if isinstance(column.type, db.DateTime):
+        return datetime.combine(lower, datetime.min.time()), datetime.combine(upper, datetime.min.time())
+    return lower, upper
+
+
+def period_of(month, period):
+    """Map a 'YYYY-MM' key to its month, quarter ('YYYY-Qn') or year bucket."""
+    if period == "month":
+        return month
+    year, month_number = parse_month(month)
+    if period == "quarter":
+        return f"{year:04d}-Q{(month_number - 1) // 3 + 1}"
+    return f"{year:04d}"
+
+
+def month_bucket(column):
+    """SQL expression truncating a date/datetime column to its 'YYYY-MM' key."""
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        return func.to_char(column, "YYYY-MM")
+    if dialect in ("mysql", "mariadb"):
+        return func.date_format(column, "%Y-%m")
+    return func.strftime("%Y-%m", column)
+
@@ -0,0 +1,64 @@
+import threading
+
+
+class Subscription:
+    """A wake-up signal for one connected client."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._event = threading.Event()
+
+    def notify(self):
+        self._event.set()
+
+    def wait(self, timeout=None):
+        """Wait for a publish. Returns False if the timeout expired first."""
+        fired = self._event.wait(timeout)
+        self._event.clear()
+        return fired
+
+
+class NotificationBroker:
+    """In-process pub/sub that tells streaming clients new notifications exist.
+
+    Only a wake-up is published; subscribers read the rows themselves from
+    the inbox, so a missed or coalesced signal never loses a notification.
+    Publishing only reaches clients connected to this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, user_id):
+        sub = Subscription(int(user_id))
+        with self._lock:
+            self._subscribers.setdefault(sub.user_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.user_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.user_id]
+
+    def publish(self, user_ids):
+        with self._lock:
+            targets = [sub for user_id in {int(u) for u in user_ids} for sub in self._subscribers.get(user_id, ())]
+        for sub in targets:
+            sub.notify()
+
+    def publish_all(self):
+        with self._lock:
+            targets = [sub for subs in self._subscribers.values() for sub in subs]
+        for sub in targets:
+            sub.notify()
+
+    def connected(self):
+        with self._lock:
+            return sum(len(subs) for subs in self._subscribers.values())
+
+
+broker = NotificationBroker()
@@ -0,0 +1,143 @@
+import hashlib
+import threading
+from functools import wraps
+from flask import current_app, make_response, request
+from sqlalchemy import event
+from app import db
+from app.utils.cache import TTLCache
+
+
+class CacheBackend:
+    """Storage used by ResponseCache. Swap in a shared store (e.g. Redis) by implementing these."""
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value):
+        raise NotImplementedError
+
+    def get_version(self, name):
+        raise NotImplementedError
+
+    def incr_version(self, name):
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """Process-local LRU for responses; table versions are kept separately and never evicted.
+
+    Versions only see commits made in this process, so with several workers
+    (or CLI jobs writing the same database) use a shared backend instead.
+    """
+
+    def __init__(self, maxsize=512):
+        self._entries = TTLCache(maxsize=maxsize)
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, value):
+        self._entries.set(key, value)
+
+    def get_version(self, name):
+        return self._versions.get(name, 0)
+
+    def incr_version(self, name):
+        with self._lock:
+            self._versions[name] = self._versions.get(name, 0) + 1
+            return self._versions[name]
+
+
+class ResponseCache:
+    """Caches GET responses keyed by endpoint, query string and the versions of the tables they read.
+
+    Every committed ORM write bumps the version of each table it touched, so
+    a cached response is never served after its inputs change. Responses
+    carry a strong ETag and answer ``If-None-Match`` with 304.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    def init_app(self, app):
+        if self.backend is None:
+            self.backend = MemoryBackend(app.config.get("RESPONSE_CACHE_SIZE", 512))
+        app.extensions["response_cache"] = self
+        if not event.contains(db.session, "after_flush", _after_flush):
+            event.listen(db.session, "after_flush", _after_flush)
+            event.listen(db.session, "after_commit", _after_commit)
+            event.listen(db.session, "after_rollback", _after_rollback)
+
+    def versions(self, tables):
+        return tuple(self.backend.get_version(t) for t in tables)
+
+    def bump(self, *tables):
+        for table in tables:
+            self.backend.incr_version(table)
+
+    def cached(self, *tables, vary=None):
+        """Cache a view's 200 responses until one of ``tables`` is written.
+
+        ``vary`` is an optional callable whose result joins the key, for views
+        that also depend on the calendar (e.g. ``current_month``).
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not current_app.config.get("RESPONSE_CACHE_ENABLED", True):
+                    return fn(*args, **kwargs)
+
+                params = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+                view_args = "&".join(f"{k}={v}" for k, v in sorted(kwargs.items()))
+                extra = vary() if vary is not None else ""
+                key = f"{request.endpoint}|{view_args}|{params}|{extra}|{self.versions(tables)}"
+
+                entry = self.backend.get(key)
+                if entry is None:
+                    response = make_response(fn(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    body = response.get_data()
+                    entry = (body, response.mimetype, hashlib.sha256(body).hexdigest()[:32])
+                    self.backend.set(key, entry)
+
+                body, mimetype, etag = entry
+                if request.if_none_match.contains(etag):
+                    response = current_app.response_class(status=304)
+                else:
+                    response = current_app.response_class(body, mimetype=mimetype)
+                response.set_etag(etag)
+                response.headers["Cache-Control"] = "private, no-cache"
+                return response
+            return wrapper
+        return decorator
+
+
+def mark_dirty(session, *tables):
+    """Record tables written outside the ORM (bulk Core statements) so their versions bump on commit."""
+    session.info.setdefault("dirty_tables", set()).update(tables)
+
+
+def _after_flush(session, flush_context):
+    tables = {
+        obj.__table__.name
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if hasattr(obj, "__table__")
+    }
+    if tables:
+        mark_dirty(session, *tables)
+
+
+def _after_commit(session):
+    tables = session.info.pop("dirty_tables", None)
+    if tables:
+        response_cache.bump(*tables)
+
+
+def _after_rollback(session):
+    session.info.pop("dirty_tables", None)
+
+
+response_cache = ResponseCache()
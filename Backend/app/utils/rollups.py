@@ -0,0 +1,109 @@
+from collections import namedtuple
+from sqlalchemy import delete, event, func
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Contribution, Loan, RentPayment, ReportRollup, LOAN_ISSUED_STATUSES
+from app.utils.aggregates import keep_history, old_value
+from app.utils.periods import current_month, month_bounds, month_bucket, month_range
+
+ALL_MEMBERS = 0
+
+# amount column, date column, person column (None if not per member), extra filter
+Series = namedtuple("Series", ["model", "amount", "date", "person", "condition"])
+
+SERIES = {
+    "contributions": Series(Contribution, Contribution.amount, Contribution.date, Contribution.person_id, None),
+    "loans": Series(Loan, Loan.amount, Loan.request_date, Loan.person_id, Loan.status.in_(LOAN_ISSUED_STATUSES)),
+    "rent": Series(RentPayment, RentPayment.amount, RentPayment.payment_date, None, None),
+}
+
+
+# ---------------------------------------
+# Computing and caching monthly buckets
+# ---------------------------------------
+def compute_months(name, start, end, person_id=ALL_MEMBERS):
+    """One GROUP BY over the month buckets between ``start`` and ``end``. Returns {month: (total, count)}."""
+    series = SERIES[name]
+    bucket = month_bucket(series.date).label("month")
+    lower, upper = month_bounds(start, end, series.date)
+
+    query = db.session.query(bucket, func.sum(series.amount), func.count())\
+                      .filter(series.date >= lower, series.date < upper)
+    if series.condition is not None:
+        query = query.filter(series.condition)
+    if person_id:
+        query = query.filter(series.person == person_id)
+
+    return {month: (total or 0.0, count) for month, total, count in query.group_by(bucket)}
+
+
+def monthly_series(name, start, end, person_id=ALL_MEMBERS):
+    """Monthly totals for one series, serving closed months from ReportRollup.
+
+    Closed months missing from the cache are computed with a single grouped
+    query and stored; the open (current) month is always computed live.
+    """
+    months = month_range(start, end)
+    open_month = current_month()
+    closed = [m for m in months if m < open_month]
+
+    cached = {}
+    if closed:
+        rows = ReportRollup.query.filter(
+            ReportRollup.series == name,
+            ReportRollup.person_id == person_id,
+            ReportRollup.month.in_(closed),
+        )
+        cached = {r.month: (r.total, r.count) for r in rows}
+
+    missing = [m for m in closed if m not in cached]
+    if missing:
+        computed = compute_months(name, missing[0], missing[-1], person_id)
+        for month in missing:
+            total, count = computed.get(month, (0.0, 0))
+            cached[month] = (total, count)
+            db.session.add(ReportRollup(series=name, month=month, person_id=person_id, total=total, count=count))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another request cached the same months first
+            db.session.rollback()
+
+    if months[-1] >= open_month:
+        cached.update(compute_months(name, max(months[0], open_month), months[-1], person_id))
+
+    return [(month, *cached.get(month, (0.0, 0))) for month in months]
+
+
+# ---------------------------------------
+# Invalidation: drop cached months that a write touches
+# ---------------------------------------
+def _touched_months(session):
+    touched = set()
+    for obj in list(session.new) + list(session.deleted) + list(session.dirty):
+        for name, series in SERIES.items():
+            if not isinstance(obj, series.model):
+                continue
+            attr = series.date.key
+            for value in (getattr(obj, attr), old_value(obj, attr) if obj not in session.new else None):
+                if value is not None:
+                    touched.add((name, value.strftime("%Y-%m")))
+    return touched
+
+
+def _before_flush(session, flush_context, instances):
+    touched = _touched_months(session)
+    if not touched:
+        return
+    table = ReportRollup.__table__
+    connection = session.connection()
+    for name in {name for name, _ in touched}:
+        months = [month for series, month in touched if series == name]
+        connection.execute(delete(table).where(table.c.series == name, table.c.month.in_(months)))
+
+
+def register_listeners():
+    if event.contains(db.session, "before_flush", _before_flush):
+        return
+    event.listen(db.session, "before_flush", _before_flush)
+    keep_history(Contribution.date, Loan.request_date, RentPayment.payment_date)
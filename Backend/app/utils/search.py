@@ -0,0 +1,235 @@
+import re
+from html import escape
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, text
+from app import db
+from app.models import Minute
+from app.utils.aggregates import keep_history, old_value
+
+# Highlight markers that cannot appear in minutes; swapped for <mark> after escaping
+MARK_START, MARK_END = "\x02", "\x03"
+SNIPPET_TOKENS = 24
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# SQLite keeps an external-content FTS5 table over minute(content), synced on
+# every Minute write. Postgres uses a GIN expression index on
+# to_tsvector('english', content), which needs no syncing.
+SQLITE_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS minute_fts USING fts5("
+    "content, content='minute', content_rowid='id', tokenize='porter unicode61')"
+)
+POSTGRES_DDL = (
+    "CREATE INDEX IF NOT EXISTS ix_minute_content_fts "
+    "ON minute USING gin (to_tsvector('english', content))"
+)
+
+
+# Tables and indexes this module manages outside the models; migrations/env.py
+# keeps autogenerate from proposing to drop them
+UNMANAGED_TABLE_PREFIX = "minute_fts"
+UNMANAGED_INDEXES = ("ix_minute_content_fts",)
+
+# Engines (by URL) whose SQLite FTS table is known to exist
+_ready = set()
+
+
+def _dialect():
+    return db.engine.dialect.name
+
+
+def is_unmanaged(name, type_):
+    """True for the search index objects, which are not part of the model metadata."""
+    if type_ == "table":
+        return name.startswith(UNMANAGED_TABLE_PREFIX)
+    return type_ == "index" and name in UNMANAGED_INDEXES
+
+
+def _highlight(snippet):
+    """HTML-escape a snippet and turn the match markers into <mark> tags."""
+    return escape(snippet or "").replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def _fts5_query(terms):
+    """Quote every term (so user input is never FTS syntax) and prefix-match the last one."""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+# ---------------------------------------
+# Searching
+# ---------------------------------------
+def search_minutes(query, limit=20, offset=0):
+    """Minutes matching every word of ``query``, best match first, with a highlighted snippet.
+
+    Returns a list of dicts (minute_id, meeting_id, meeting_date, location,
+    timestamp, snippet, rank); an empty list if ``query`` has no words.
+    """
+    terms = TOKEN_PATTERN.findall(query or "")
+    if not terms:
+        return []
+    dialect = _dialect()
+
+    if dialect == "sqlite":
+        sql = text(f"""
+            SELECT m.id, m.meeting_id, mt.date, mt.location, m.timestamp,
+                   snippet(minute_fts, 0, :start, :end, '…', {SNIPPET_TOKENS}) AS snippet,
+                   bm25(minute_fts) AS rank
+              FROM minute_fts
+              JOIN minute m ON m.id = minute_fts.rowid
+              JOIN meeting mt ON mt.id = m.meeting_id
+             WHERE minute_fts MATCH :query
+             ORDER BY rank
+             LIMIT :limit OFFSET :offset
+        """)
+        params = {"query": _fts5_query(terms)}
+    elif dialect == "postgresql":
+        sql = text(f"""
+            SELECT m.id, m.meeting_id, mt.date, mt.location, m.timestamp,
+                   ts_headline('english', m.content, q,
+                               'StartSel=' || :start || ', StopSel=' || :end || ', MaxWords={SNIPPET_TOKENS}, MinWords=8')
+                       AS snippet,
+                   -ts_rank(to_tsvector('english', m.content), q) AS rank
+              FROM minute m
+              JOIN meeting mt ON mt.id = m.meeting_id,
+                   plainto_tsquery('english', :query) q
+             WHERE to_tsvector('english', m.content) @@ q
+             ORDER BY rank
+             LIMIT :limit OFFSET :offset
+        """)
+        params = {"query": " ".join(terms)}
+    else:
+        # No full-text index on this database: plain scan, newest first
+        sql = text("""
+            SELECT m.id, m.meeting_id, mt.date, mt.location, m.timestamp,
+                   substr(m.content, 1, 200) AS snippet, 0 AS rank
+              FROM minute m
+              JOIN meeting mt ON mt.id = m.meeting_id
+             WHERE lower(m.content) LIKE :query
+             ORDER BY m.timestamp DESC
+             LIMIT :limit OFFSET :offset
+        """)
+        params = {"query": "%" + "%".join(term.lower() for term in terms) + "%"}
+
+    rows = db.session.execute(sql, {**params, "start": MARK_START, "end": MARK_END,
+                                    "limit": limit, "offset": offset})
+    return [
+        {
+            "minute_id": minute_id,
+            "meeting_id": meeting_id,
+            "meeting_date": _format(meeting_date),
+            "location": location,
+            "timestamp": _format(timestamp),
+            "snippet": _highlight(snippet),
+            "rank": round(-float(rank or 0), 4),
+        }
+        for minute_id, meeting_id, meeting_date, location, timestamp, snippet, rank in rows
+    ]
+
+
+def _format(value):
+    # Raw SQL on SQLite returns DateTime columns as strings
+    if value is None or isinstance(value, str):
+        return value[:16] if value else None
+    return value.strftime("%Y-%m-%d %H:%M")
+
+
+# ---------------------------------------
+# Keeping the SQLite index in sync
+# ---------------------------------------
+def _fts_statements(session):
+    """FTS5 'delete' / insert commands for every Minute written in this flush."""
+    statements = []
+    for obj in session.deleted:
+        if isinstance(obj, Minute):
+            statements.append(("delete", obj.id, old_value(obj, "content")))
+    for obj in session.dirty:
+        if isinstance(obj, Minute) and session.is_modified(obj):
+            statements.append(("delete", obj.id, old_value(obj, "content")))
+            statements.append(("insert", obj.id, obj.content))
+    return statements
+
+
+def _before_flush(session, flush_context, instances):
+    session.info["minute_fts"] = _fts_statements(session)
+
+
+def _after_flush(session, flush_context):
+    statements = session.info.pop("minute_fts", [])
+    statements += [("insert", obj.id, obj.content) for obj in session.new if isinstance(obj, Minute)]
+    if not statements or session.get_bind().dialect.name != "sqlite":
+        return
+
+    connection = session.connection()
+    _ensure_fts(connection)
+    for action, rowid, content in statements:
+        if action == "delete":
+            connection.execute(
+                text("INSERT INTO minute_fts(minute_fts, rowid, content) VALUES ('delete', :rowid, :content)"),
+                {"rowid": rowid, "content": content or ""},
+            )
+        else:
+            connection.execute(
+                text("INSERT INTO minute_fts(rowid, content) VALUES (:rowid, :content)"),
+                {"rowid": rowid, "content": content or ""},
+            )
+
+
+def _ensure_fts(connection):
+    """Create and fill the FTS table on databases that lack it (e.g. built with db.create_all())."""
+    key = str(connection.engine.url)
+    if key in _ready:
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'minute_fts'")
+    ).first()
+    if not exists:
+        connection.execute(text(SQLITE_DDL))
+        connection.execute(text("INSERT INTO minute_fts(minute_fts) VALUES ('rebuild')"))
+    _ready.add(key)
+
+
+def _create_index(target, connection, **kw):
+    # db.create_all() builds the minute table: build its search index alongside
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(SQLITE_DDL))
+    elif connection.dialect.name == "postgresql":
+        connection.execute(text(POSTGRES_DDL))
+
+
+def _drop_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS minute_fts"))
+    _ready.discard(str(connection.engine.url))
+
+
+def register_listeners():
+    if event.contains(db.session, "after_flush", _after_flush):
+        return
+    event.listen(db.session, "before_flush", _before_flush)
+    event.listen(db.session, "after_flush", _after_flush)
+    event.listen(Minute.__table__, "after_create", _create_index)
+    event.listen(Minute.__table__, "before_drop", _drop_index)
+    keep_history(Minute.content)
+
+
+def reindex():
+    """Create the full-text index if it is missing and rebuild it from the minute table."""
+    dialect = _dialect()
+    if dialect == "sqlite":
+        db.session.execute(text(SQLITE_DDL))
+        db.session.execute(text("INSERT INTO minute_fts(minute_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        db.session.execute(text(POSTGRES_DDL))
+    db.session.commit()
+    return dialect
+
+
+minutes_cli = AppGroup("minutes", help="Meeting minutes search index.")
+
+
+@minutes_cli.command("reindex")
+def reindex_command():
+    """Create or rebuild the minutes full-text index."""
+    click.echo(f"Minutes search index rebuilt ({reindex()}).")
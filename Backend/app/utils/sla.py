@@ -0,0 +1,129 @@
+import math
+from collections import defaultdict
+import click
+from flask.cli import AppGroup
+from sqlalchemy import insert, update
+from app import db
+from app.models import MaintenanceRequest, ResolutionSketch
+
+ALL_PROPERTIES = 0
+MAINTENANCE_OPEN_STATUSES = ("Pending", "In Progress")
+RESOLVED = "Resolved"
+
+# Buckets are powers of GAMMA, so any percentile read back is within
+# RELATIVE_ACCURACY of the true value; durations are in hours.
+RELATIVE_ACCURACY = 0.05
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+MIN_HOURS = 1 / 60  # anything faster than a minute shares the lowest bucket
+REBUILD_CHUNK = 1000
+
+
+def bucket_of(hours):
+    return math.ceil(math.log(max(hours, MIN_HOURS)) / math.log(GAMMA))
+
+
+def bucket_value(bucket):
+    """Representative duration (hours) of a bucket: the midpoint of its range."""
+    return 2 * GAMMA ** bucket / (GAMMA + 1)
+
+
+def hours_between(start, end):
+    return max((end - start).total_seconds(), 0) / 3600
+
+
+# ---------------------------------------
+# Recording resolutions
+# ---------------------------------------
+def add_counts(session, counts):
+    """Add ``{(property_id, bucket): n}`` to the sketch inside the session's transaction."""
+    table = ResolutionSketch.__table__
+    connection = session.connection()
+    for (property_id, bucket), n in counts.items():
+        result = connection.execute(
+            update(table)
+            .where(table.c.property_id == property_id, table.c.bucket == bucket)
+            .values(count=table.c.count + n)
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table).values(property_id=property_id, bucket=bucket, count=n))
+
+
+def record_resolution(session, request_obj):
+    """Count one resolved request in its property's sketch and the all-properties sketch."""
+    bucket = bucket_of(hours_between(request_obj.reported_date, request_obj.resolved_date))
+    add_counts(session, {(request_obj.property_id, bucket): 1, (ALL_PROPERTIES, bucket): 1})
+
+
+# ---------------------------------------
+# Reading percentiles
+# ---------------------------------------
+def quantiles(buckets, qs=(0.5, 0.9)):
+    """Percentiles (hours) from sorted (bucket, count) pairs; None when nothing is recorded."""
+    total = sum(count for _, count in buckets)
+    if not total:
+        return {q: None for q in qs}
+    result = {}
+    for q in qs:
+        rank, seen = q * (total - 1), 0
+        for bucket, count in buckets:
+            seen += count
+            if seen > rank:
+                result[q] = round(bucket_value(bucket), 2)
+                break
+    return result
+
+
+def sketches():
+    """{property_id: {"resolved": n, "p50_hours": ..., "p90_hours": ...}} from every sketch row (one query)."""
+    buckets = defaultdict(list)
+    for property_id, bucket, count in db.session.query(
+        ResolutionSketch.property_id, ResolutionSketch.bucket, ResolutionSketch.count
+    ).order_by(ResolutionSketch.property_id, ResolutionSketch.bucket):
+        buckets[property_id].append((bucket, count))
+
+    result = {}
+    for property_id, rows in buckets.items():
+        percentiles = quantiles(rows)
+        result[property_id] = {
+            "resolved": sum(count for _, count in rows),
+            "p50_hours": percentiles[0.5],
+            "p90_hours": percentiles[0.9],
+        }
+    return result
+
+
+# ---------------------------------------
+# Rebuilding from history
+# ---------------------------------------
+def rebuild():
+    """Recompute every sketch from the resolved requests. Returns how many were counted."""
+    counts = defaultdict(int)
+    resolved = db.session.query(
+        MaintenanceRequest.property_id, MaintenanceRequest.reported_date, MaintenanceRequest.resolved_date
+    ).filter(MaintenanceRequest.status == RESOLVED, MaintenanceRequest.resolved_date.isnot(None))
+
+    total = 0
+    for property_id, reported, resolved_at in resolved.yield_per(REBUILD_CHUNK):
+        bucket = bucket_of(hours_between(reported, resolved_at))
+        counts[(property_id, bucket)] += 1
+        counts[(ALL_PROPERTIES, bucket)] += 1
+        total += 1
+
+    table = ResolutionSketch.__table__
+    db.session.execute(table.delete())
+    if counts:
+        db.session.execute(insert(table), [
+            {"property_id": property_id, "bucket": bucket, "count": n}
+            for (property_id, bucket), n in counts.items()
+        ])
+    db.session.commit()
+    return total
+
+
+maintenance_cli = AppGroup("maintenance", help="Maintenance request metrics.")
+
+
+@maintenance_cli.command("rebuild-sketch")
+def rebuild_command():
+    """Recompute time-to-resolve sketches from the request history."""
+    click.echo(f"Rebuilt resolution sketches from {rebuild()} resolved requests.")
@@ -0,0 +1,232 @@
+import csv
+import io
+import re
+from collections import namedtuple
+from datetime import datetime
+from app import db
+from app.models import Contribution, Person, Property, RentPayment, User
+
+PAYMENT_METHOD = "M-Pesa"
+CHUNK_SIZE = 500
+
+# Accepted header names (lower-cased) for each field, covering M-Pesa
+# business statements and simple hand-made sheets
+COLUMN_ALIASES = {
+    "receipt": ("receipt no.", "receipt no", "receipt", "receipt_code", "transaction id"),
+    "time": ("completion time", "transaction date", "date"),
+    "amount": ("paid in", "amount"),
+    "party": ("other party info", "phone", "msisdn", "details"),
+    "status": ("transaction status", "status"),
+    "account": ("a/c no.", "account no.", "account"),
+}
+DATE_FORMATS = (
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y-%m-%d",
+    "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y",
+    "%d-%m-%Y %H:%M:%S", "%d-%m-%Y",
+)
+PHONE_PATTERN = re.compile(r"(?:\+?254|(?<!\d)0)([17]\d{8})(?!\d)")
+
+StatementLine = namedtuple("StatementLine", ["line", "receipt", "date", "amount", "phone", "account"])
+
+
+def normalize_phone(value):
+    """Canonical 2547XXXXXXXX form of the first Kenyan mobile number in ``value``, or None."""
+    match = PHONE_PATTERN.search(re.sub(r"[\s\-()]", "", value or ""))
+    return f"254{match.group(1)}" if match else None
+
+
+def _parse_date(value):
+    value = (value or "").strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date '{value}'")
+
+
+def _parse_amount(value):
+    value = (value or "").replace(",", "").strip()
+    return float(value) if value else 0.0
+
+
+def _header_map(row):
+    names = [(cell or "").strip().lower() for cell in row]
+    mapping = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in names:
+                mapping[field] = names.index(alias)
+                break
+    return mapping
+
+
+def parse_statement(stream):
+    """Yield (StatementLine | None, reason) for each credit line of a statement CSV, reading it row by row.
+
+    Rows before the header (statement preamble) are skipped. Withdrawals and
+    failed transactions yield (None, "ignored"); malformed rows yield
+    (None, <error message>) with the line number in the message.
+    """
+    reader = csv.reader(io.TextIOWrapper(stream, encoding="utf-8-sig", newline=""))
+    columns = None
+    for row in reader:
+        if columns is None:
+            mapping = _header_map(row)
+            if {"receipt", "time", "amount", "party"} <= mapping.keys():
+                columns = mapping
+            continue
+        if not any(cell.strip() for cell in row):
+            continue
+
+        def cell(field):
+            index = columns.get(field)
+            return row[index].strip() if index is not None and index < len(row) else ""
+
+        status = cell("status").lower()
+        if status and status != "completed":
+            yield None, "ignored"
+            continue
+        try:
+            amount = _parse_amount(cell("amount"))
+            if amount <= 0:
+                yield None, "ignored"
+                continue
+            line = StatementLine(
+                line=reader.line_num,
+                receipt=cell("receipt").upper(),
+                date=_parse_date(cell("time")),
+                amount=amount,
+                phone=normalize_phone(cell("party")),
+                account=cell("account"),
+            )
+        except ValueError as e:
+            yield None, f"Line {reader.line_num}: {e}"
+            continue
+        if not line.receipt:
+            yield None, f"Line {reader.line_num}: missing receipt number"
+            continue
+        yield line, None
+
+    if columns is None:
+        raise ValueError("No statement header found (need receipt, time, amount and payer columns)")
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _phone_index(rows):
+    index = {}
+    for key, phone in rows:
+        normalized = normalize_phone(phone)
+        if normalized:
+            index.setdefault(normalized, key)
+    return index
+
+
+def _existing_receipts(codes):
+    existing = set()
+    for model in (Contribution, RentPayment):
+        existing.update(code for (code,) in db.session.query(model.receipt_code).filter(
+            model.payment_method == PAYMENT_METHOD, model.receipt_code.in_(codes)))
+    return existing
+
+
+def ingest_statement(stream):
+    """Record every new credit in an M-Pesa statement as a Contribution or RentPayment.
+
+    Payers are matched on phone number against members and property
+    tenants through in-memory indexes built once per upload. A line whose
+    payer is both goes to rent only when its account reference mentions
+    rent. Receipt numbers already recorded, or repeated in the file, are
+    reported as duplicates. Rows are added and flushed a chunk at a time so
+    the ledger, balance and cache hooks see them; the caller commits.
+
+    Returns (report, {person_id: [StatementLine, ...]}) for the members credited.
+    """
+    members = _phone_index(db.session.query(Person.id, Person.phone))
+    tenants = _phone_index(db.session.query(Property.id, Property.tenant_phone)
+                             .filter(Property.tenant_phone.isnot(None)))
+
+    report = {
+        "lines": 0, "ignored": 0, "duplicates": 0, "unmatched": 0, "invalid": 0,
+        "contributions": {"count": 0, "total": 0.0},
+        "rent_payments": {"count": 0, "total": 0.0},
+        "exceptions": [],
+    }
+    seen = set()
+    paid = {}
+
+    for chunk in _chunks(parse_statement(stream), CHUNK_SIZE):
+        report["lines"] += len(chunk)
+        lines = []
+        for line, reason in chunk:
+            if line is not None:
+                lines.append(line)
+            elif reason == "ignored":
+                report["ignored"] += 1
+            else:
+                report["invalid"] += 1
+                report["exceptions"].append({"status": "invalid", "reason": reason})
+
+        existing = _existing_receipts([line.receipt for line in lines]) if lines else set()
+        records = []
+        for line in lines:
+            detail = {"line": line.line, "receipt_code": line.receipt, "phone": line.phone, "amount": line.amount}
+            if line.receipt in existing or line.receipt in seen:
+                report["duplicates"] += 1
+                report["exceptions"].append({**detail, "status": "duplicate"})
+                continue
+            seen.add(line.receipt)
+
+            person_id, property_id = members.get(line.phone), tenants.get(line.phone)
+            if property_id and (not person_id or "rent" in line.account.lower()):
+                records.append(RentPayment(
+                    property_id=property_id, amount=line.amount, payment_date=line.date,
+                    payment_method=PAYMENT_METHOD, receipt_code=line.receipt,
+                    notes=f"M-Pesa statement line {line.line}",
+                ))
+                report["rent_payments"]["count"] += 1
+                report["rent_payments"]["total"] += line.amount
+            elif person_id:
+                records.append(Contribution(
+                    person_id=person_id, amount=line.amount, date=line.date,
+                    payment_method=PAYMENT_METHOD, receipt_code=line.receipt,
+                ))
+                paid.setdefault(person_id, []).append(line)
+                report["contributions"]["count"] += 1
+                report["contributions"]["total"] += line.amount
+            else:
+                report["unmatched"] += 1
+                report["exceptions"].append({**detail, "status": "unmatched"})
+
+        if records:
+            db.session.add_all(records)
+            db.session.flush()
+
+    for key in ("contributions", "rent_payments"):
+        report[key]["total"] = round(report[key]["total"], 2)
+    return report, paid
+
+
+def receipt_notifications(paid):
+    """(user_id, title, message) for every member credited by a statement upload."""
+    users = {}
+    if paid:
+        for user_id, person_id in db.session.query(User.id, User.person_id).filter(User.person_id.in_(paid)):
+            users.setdefault(person_id, []).append(user_id)
+    return [
+        (user_id, "Contribution Received",
+         f"We received your contribution of KES {line.amount} on {line.date.strftime('%Y-%m-%d')}.")
+        for person_id, lines in paid.items()
+        for line in lines
+        for user_id in users.get(person_id, [])
+    ]
@@ -0,0 +1,66 @@
+"""Shared setup for the benchmark scripts: a throwaway SQLite app with seeded members."""
+import os
+import sys
+import tempfile
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+_app = None
+
+
+def make_app(**config):
+    """The benchmark app on a temporary SQLite file, with empty tables and roles seeded.
+
+    The database URL is read when ``app.config`` is imported, so one app is
+    built per process and its tables are recreated on every call.
+    """
+    global _app
+    if _app is None:
+        path = os.path.join(tempfile.mkdtemp(prefix="tustahimili-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+        os.environ.setdefault("LOAN_SCAN_INTERVAL", "0")
+        if BACKEND not in sys.path:
+            sys.path.insert(0, BACKEND)
+        from app import create_app
+        _app = create_app()
+
+    from app import db
+    from app.models import Role
+
+    _app.config.update(config)
+    with _app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add_all(Role(name=name) for name in
+                           ("Member", "Chairperson", "Treasurer", "Secretary", "Rent Manager"))
+        db.session.commit()
+    return _app
+
+
+def seed_members(count, role="Member", password_hash="x"):
+    """Insert ``count`` people with user accounts in one batch. Returns the user ids."""
+    from sqlalchemy import insert
+    from app import db
+    from app.models import Person, Role, User
+
+    role_id = Role.query.filter_by(name=role).first().id
+    start = (db.session.query(db.func.max(Person.id)).scalar() or 0) + 1
+    db.session.execute(insert(Person), [
+        {"id": start + i, "full_name": f"Member {start + i}", "phone": f"07{start + i:08d}"}
+        for i in range(count)
+    ])
+    db.session.execute(insert(User), [
+        {"email": f"member{start + i}@example.com", "password_hash": password_hash,
+         "role_id": role_id, "person_id": start + i}
+        for i in range(count)
+    ])
+    db.session.commit()
+    return [user_id for (user_id,) in db.session.query(User.id).filter(User.person_id >= start)]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(int(q * len(values)), len(values) - 1)]
@@ -0,0 +1,86 @@
+"""Portfolio engine at scale: SQL aggregation against a per-loan Python pass.
+
+Seeds ``--loans`` open loans and times portfolio_totals() (one aggregate
+query), portfolio() (per-loan rows computed in SQL) and the per-loan
+position() loop it replaced.
+
+    cd Backend && python -m benchmarks.loan_portfolio --loans 100000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks._setup import make_app, seed_members
+
+
+def seed_loans(count, person_ids):
+    from sqlalchemy import insert
+    from app import db
+    from app.models import Loan
+
+    rng = random.Random(100)
+    start = date.today()
+    for offset in range(0, count, 10000):
+        rows = []
+        for _ in range(min(10000, count - offset)):
+            amount = round(rng.uniform(500, 80000), 2)
+            rows.append({
+                "person_id": rng.choice(person_ids), "amount": amount, "interest": round(amount * 0.1, 2),
+                "installments": rng.randint(1, 12), "status": "approved",
+                "due_date": start + timedelta(days=rng.randint(-365, 365)),
+                "repayment_amount": round(rng.uniform(0, amount), 2),
+            })
+        # Core insert: the journal/balance hooks are not what is being measured
+        db.session.execute(insert(Loan), rows)
+    db.session.commit()
+
+
+def python_pass(today):
+    from app import db
+    from app.models import Loan, LOAN_OPEN_STATUSES
+    from app.utils.amortization import position
+
+    rows = db.session.query(Loan.id, Loan.amount, Loan.interest, Loan.installments, Loan.due_date,
+                            Loan.repayment_amount).filter(Loan.status.in_(LOAN_OPEN_STATUSES))
+    return [position(a, i, n, d, r, today) for _, a, i, n, d, r in rows]
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loans", type=int, default=100000)
+    parser.add_argument("--members", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    app = make_app()
+    from app.utils.amortization import portfolio, portfolio_totals
+
+    with app.app_context():
+        seed_loans(args.loans, seed_members(args.members))
+        today = date.today()
+
+        totals_time, totals = timed(lambda: portfolio_totals(today), args.repeat)
+        detail_time, detail = timed(lambda: portfolio(today), args.repeat)
+        loop_time, loop = timed(lambda: python_pass(today), args.repeat)
+
+        assert totals["loans"] == len(detail) == len(loop)
+        print(f"{args.loans} loans (best of {args.repeat})")
+        print(f"  portfolio_totals (SQL aggregate): {totals_time * 1000:8.1f} ms")
+        print(f"  portfolio (per-loan rows in SQL): {detail_time * 1000:8.1f} ms")
+        print(f"  position() per loan in Python:    {loop_time * 1000:8.1f} ms")
+        print(f"  outstanding balance: {totals['balance']:.2f}  in arrears: {totals['loans_in_arrears']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Latency of other endpoints while a burst of logins is running.
+
+Starts ``--login-threads`` clients posting to /api/auth/login in a loop and
+measures p50/p99 of GET /api/notifications/unread-count from
+``--probe-threads`` other clients, first with no logins (baseline) and then
+during the burst. Also reports login throughput and how many logins were
+refused with 503.
+
+    cd Backend && python -m benchmarks.login_throughput --rounds 12 --seconds 10
+"""
+import argparse
+import threading
+import time
+
+from benchmarks._setup import make_app, percentile, seed_members
+
+
+def hammer(app, path, stop, latencies, statuses, method="get", **kwargs):
+    client = app.test_client()
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = getattr(client, method)(path, **kwargs)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+
+def phase(app, seconds, login_threads, probe_threads, token, email):
+    stop = threading.Event()
+    probe_latencies, probe_statuses = [], {}
+    login_latencies, login_statuses = [], {}
+    threads = [
+        threading.Thread(target=hammer, args=(app, "/api/notifications/unread-count", stop,
+                                              probe_latencies, probe_statuses),
+                         kwargs={"headers": {"Authorization": f"Bearer {token}"}})
+        for _ in range(probe_threads)
+    ] + [
+        threading.Thread(target=hammer, args=(app, "/api/auth/login", stop, login_latencies, login_statuses),
+                         kwargs={"method": "post", "json": {"email": email, "password": "benchmark"}})
+        for _ in range(login_threads)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return probe_latencies, probe_statuses, login_latencies, login_statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_LOG_ROUNDS")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--login-threads", type=int, default=16)
+    parser.add_argument("--probe-threads", type=int, default=4)
+    args = parser.parse_args()
+
+    app = make_app(BCRYPT_LOG_ROUNDS=args.rounds)
+    from flask_jwt_extended import create_access_token
+    from app import bcrypt
+    from app.utils.passwords import hasher
+
+    bcrypt.init_app(app)
+    hasher.init_app(app)
+    with app.app_context():
+        password_hash = bcrypt.generate_password_hash("benchmark").decode("utf-8")
+        user_id = seed_members(1, password_hash=password_hash)[0]
+        token = create_access_token(identity=str(user_id))
+    email = f"member{user_id}@example.com"
+
+    print(f"bcrypt rounds={args.rounds} workers={app.config['BCRYPT_WORKERS']} "
+          f"queue={app.config['BCRYPT_QUEUE_SIZE']} login threads={args.login_threads}")
+    for name, login_threads in (("baseline", 0), ("during logins", args.login_threads)):
+        probes, probe_statuses, logins, login_statuses = phase(
+            app, args.seconds, login_threads, args.probe_threads, token, email)
+        print(f"{name:>14}: unread-count p50={percentile(probes, 0.5) * 1000:7.1f}ms "
+              f"p99={percentile(probes, 0.99) * 1000:7.1f}ms ({len(probes)} requests, {probe_statuses})")
+        if logins:
+            print(f"{'':>14}  login p50={percentile(logins, 0.5) * 1000:7.1f}ms "
+                  f"p99={percentile(logins, 0.99) * 1000:7.1f}ms "
+                  f"{len(logins) / args.seconds:6.1f}/s {login_statuses}")
+
+
+if __name__ == "__main__":
+    main()
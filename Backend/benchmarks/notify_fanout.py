@@ -0,0 +1,74 @@
+"""Fan-out time for one announcement against member count.
+
+Compares the old one-commit-per-member loop with ``send_notifications_bulk``
+written inline and through the background dispatcher (time to return to the
+caller, and time until every row is committed).
+
+    cd Backend && python -m benchmarks.notify_fanout --members 100 1000 5000
+"""
+import argparse
+import time
+
+from benchmarks._setup import make_app, seed_members
+
+
+def per_row(user_ids, title, message):
+    from app import db
+    from app.models import Notification
+
+    for user_id in user_ids:
+        db.session.add(Notification(user_id=user_id, title=title, message=message))
+        db.session.commit()
+
+
+def run(members, loop_limit):
+    from app import db
+    from app.models import Notification
+    from app.utils.dispatch import dispatcher
+    from app.utils.notify import send_notifications_bulk
+
+    app = make_app(NOTIFY_ASYNC=False)
+    with app.app_context():
+        user_ids = seed_members(members)
+        results = {}
+
+        if members <= loop_limit:
+            start = time.perf_counter()
+            per_row(user_ids, "Meeting", "per-row")
+            results["per_row"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        send_notifications_bulk(user_ids, "Meeting", "bulk inline")
+        results["bulk_inline"] = time.perf_counter() - start
+
+        app.config["NOTIFY_ASYNC"] = True
+        dispatcher.init_app(app)
+        start = time.perf_counter()
+        send_notifications_bulk(user_ids, "Meeting", "bulk async")
+        results["async_return"] = time.perf_counter() - start
+        dispatcher.flush()
+        results["async_committed"] = time.perf_counter() - start
+        dispatcher.shutdown()
+
+        expected = members * (3 if "per_row" in results else 2)
+        assert db.session.query(Notification).count() == expected
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--loop-limit", type=int, default=2000,
+                        help="skip the per-row baseline above this many members")
+    args = parser.parse_args()
+
+    columns = ("per_row", "bulk_inline", "async_return", "async_committed")
+    print(f"{'members':>8} " + " ".join(f"{c:>16}" for c in columns) + "   (ms)")
+    for members in args.members:
+        results = run(members, args.loop_limit)
+        cells = [f"{results[c] * 1000:16.1f}" if c in results else f"{'-':>16}" for c in columns]
+        print(f"{members:>8} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""add double-entry journal
+
+Revision ID: 0c4e7a2b9d51
+Revises: b6f2e8d40a17
+Create Date: 2026-10-18 17:25:09.811347
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c4e7a2b9d51'
+down_revision = 'b6f2e8d40a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('journal_entry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('source_type', sa.String(length=30), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('memo', sa.String(length=200), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('journal_entry', schema=None) as batch_op:
+        batch_op.create_index('ix_journal_entry_source', ['source_type', 'source_id'], unique=False)
+
+    op.create_table('journal_line',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('account', sa.String(length=30), nullable=False),
+    sa.Column('person_id', sa.Integer(), nullable=False),
+    sa.Column('amount_cents', sa.BigInteger(), nullable=False),
+    sa.ForeignKeyConstraint(['entry_id'], ['journal_entry.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('journal_line', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_journal_line_entry_id'), ['entry_id'], unique=False)
+        batch_op.create_index('ix_journal_line_account_entry', ['account', 'person_id', 'entry_id'], unique=False)
+
+    op.create_table('account_snapshot',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('through_entry_id', sa.Integer(), nullable=False),
+    sa.Column('account', sa.String(length=30), nullable=False),
+    sa.Column('person_id', sa.Integer(), nullable=False),
+    sa.Column('balance_cents', sa.BigInteger(), nullable=False),
+    sa.Column('taken_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('through_entry_id', 'account', 'person_id', name='uq_account_snapshot')
+    )
+    # Existing records are posted with `flask journal backfill`
+
+
+def downgrade():
+    op.drop_table('account_snapshot')
+
+    with op.batch_alter_table('journal_line', schema=None) as batch_op:
+        batch_op.drop_index('ix_journal_line_account_entry')
+        batch_op.drop_index(batch_op.f('ix_journal_line_entry_id'))
+
+    op.drop_table('journal_line')
+
+    with op.batch_alter_table('journal_entry', schema=None) as batch_op:
+        batch_op.drop_index('ix_journal_entry_source')
+
+    op.drop_table('journal_entry')
@@ -0,0 +1,27 @@
+"""drop job_state.processed_through
+
+Revision ID: 1eb055024282
+Revises: 2d7b9e4c6f15
+Create Date: 2026-10-19 09:41:27.318604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1eb055024282'
+down_revision = '2d7b9e4c6f15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Superseded by loan.reminded_at; nothing reads it any more
+    with op.batch_alter_table('job_state', schema=None) as batch_op:
+        batch_op.drop_column('processed_through')
+
+
+def downgrade():
+    with op.batch_alter_table('job_state', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('processed_through', sa.Date(), nullable=True))
@@ -0,0 +1,32 @@
+"""add notification inbox indexes
+
+Revision ID: 22eb3b7feb5c
+Revises: e1fe7e65cf36
+Create Date: 2026-10-18 09:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '22eb3b7feb5c'
+down_revision = 'e1fe7e65cf36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.create_index('ix_notification_user_created', ['user_id', 'created_at', 'id'], unique=False)
+        batch_op.create_index(
+            'ix_notification_unread', ['user_id'], unique=False,
+            sqlite_where=sa.text('is_read = 0'),
+            postgresql_where=sa.text('is_read = false'),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('notification', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_unread')
+        batch_op.drop_index('ix_notification_user_created')
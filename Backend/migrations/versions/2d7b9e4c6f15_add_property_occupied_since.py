@@ -0,0 +1,44 @@
+"""add property occupied_since
+
+Revision ID: 2d7b9e4c6f15
+Revises: e8a2c5f07d31
+Create Date: 2026-10-18 23:12:54.380129
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d7b9e4c6f15'
+down_revision = 'e8a2c5f07d31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('property', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('occupied_since', sa.Date(), nullable=True))
+
+    # No let date was recorded before: occupied properties are taken to be let
+    # from their first rent payment, or from today if nothing has been paid
+    op.execute("""
+        UPDATE property
+           SET occupied_since = COALESCE(
+                   (SELECT MIN(payment_date) FROM rent_payment WHERE rent_payment.property_id = property.id),
+                   CURRENT_DATE)
+         WHERE is_occupied
+    """)
+
+    # Drop unpaid invoices that /rent/arrears back-billed for months before that
+    op.execute("""
+        DELETE FROM rent_invoice
+         WHERE amount_paid = 0
+           AND month < (SELECT substr(CAST(occupied_since AS TEXT), 1, 7)
+                          FROM property WHERE property.id = rent_invoice.property_id)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('property', schema=None) as batch_op:
+        batch_op.drop_column('occupied_since')
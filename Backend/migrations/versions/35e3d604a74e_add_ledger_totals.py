@@ -0,0 +1,43 @@
+"""add ledger totals
+
+Revision ID: 35e3d604a74e
+Revises: a74e05251886
+Create Date: 2026-10-18 11:20:05.531472
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '35e3d604a74e'
+down_revision = 'a74e05251886'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ledger_totals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total_contributions', sa.Float(), nullable=False),
+    sa.Column('total_loans_issued', sa.Float(), nullable=False),
+    sa.Column('total_loan_interest', sa.Float(), nullable=False),
+    sa.Column('total_rent', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+    # Seed the single totals row from the existing records
+    op.execute("""
+        INSERT INTO ledger_totals (id, total_contributions, total_loans_issued, total_loan_interest, total_rent, updated_at)
+        SELECT 1,
+               (SELECT COALESCE(SUM(amount), 0) FROM contribution),
+               (SELECT COALESCE(SUM(amount), 0) FROM loan WHERE status = 'approved'),
+               (SELECT COALESCE(SUM(interest), 0) FROM loan),
+               (SELECT COALESCE(SUM(amount), 0) FROM rent_payment),
+               CURRENT_TIMESTAMP
+    """)
+
+
+def downgrade():
+    op.drop_table('ledger_totals')
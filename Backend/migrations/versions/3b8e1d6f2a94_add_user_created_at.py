@@ -0,0 +1,27 @@
+"""add user created_at
+
+Revision ID: 3b8e1d6f2a94
+Revises: 9d2b7f4e5a60
+Create Date: 2026-10-18 21:05:33.512870
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e1d6f2a94'
+down_revision = '9d2b7f4e5a60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Existing accounts keep NULL and still see every earlier broadcast
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('user', schema=None) as batch_op:
+        batch_op.drop_column('created_at')
@@ -0,0 +1,40 @@
+"""add minutes full-text search index
+
+Revision ID: 4f8a6e2d9c13
+Revises: e93b5d6a1c42
+Create Date: 2026-10-18 19:10:58.732164
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f8a6e2d9c13'
+down_revision = 'e93b5d6a1c42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # External-content FTS5 table over minute(content), filled from existing rows
+        op.execute(
+            "CREATE VIRTUAL TABLE minute_fts USING fts5("
+            "content, content='minute', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute("INSERT INTO minute_fts(minute_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_minute_content_fts ON minute "
+            "USING gin (to_tsvector('english', content))"
+        )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE minute_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX ix_minute_content_fts")
@@ -0,0 +1,74 @@
+"""add receipt code unique indexes
+
+Revision ID: 5e09b3f4c81d
+Revises: d2c7a9e51f03
+Create Date: 2026-10-18 16:12:33.275904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e09b3f4c81d'
+down_revision = 'd2c7a9e51f03'
+branch_labels = None
+depends_on = None
+
+RECEIPT_PRESENT = "receipt_code IS NOT NULL AND receipt_code <> ''"
+TABLES = ('contribution', 'rent_payment')
+
+
+def duplicate_receipts(table):
+    """{(payment_method, receipt_code): [ids]} for receipts recorded more than once in ``table``."""
+    rows = op.get_bind().execute(sa.text(f"""
+        SELECT a.id, a.payment_method, a.receipt_code FROM {table} a
+        WHERE a.receipt_code IS NOT NULL AND a.receipt_code <> ''
+          AND EXISTS (SELECT 1 FROM {table} b
+                      WHERE b.payment_method = a.payment_method
+                        AND b.receipt_code = a.receipt_code
+                        AND b.id <> a.id)
+        ORDER BY a.payment_method, a.receipt_code, a.id
+    """))
+    duplicates = {}
+    for row_id, method, code in rows:
+        duplicates.setdefault((method, code), []).append(row_id)
+    return duplicates
+
+
+def upgrade():
+    # Duplicate receipts are money recorded twice: which row is real is a
+    # treasurer's call, so list them and stop instead of dropping any
+    found = [(table, key, ids) for table in TABLES for key, ids in duplicate_receipts(table).items()]
+    if found:
+        listed = "\n".join(
+            f"  {table}: {method} receipt {code!r} on ids {', '.join(map(str, ids))}"
+            for table, (method, code), ids in found[:50]
+        )
+        more = f"\n  ... and {len(found) - 50} more" if len(found) > 50 else ""
+        raise RuntimeError(
+            f"{len(found)} receipt code(s) recorded more than once. Delete the duplicate rows "
+            f"or clear their receipt_code, then run the upgrade again:\n{listed}{more}"
+        )
+
+    with op.batch_alter_table('contribution', schema=None) as batch_op:
+        batch_op.create_index(
+            'uq_contribution_receipt', ['payment_method', 'receipt_code'], unique=True,
+            sqlite_where=sa.text(RECEIPT_PRESENT),
+            postgresql_where=sa.text(RECEIPT_PRESENT),
+        )
+
+    with op.batch_alter_table('rent_payment', schema=None) as batch_op:
+        batch_op.create_index(
+            'uq_rent_payment_receipt', ['payment_method', 'receipt_code'], unique=True,
+            sqlite_where=sa.text(RECEIPT_PRESENT),
+            postgresql_where=sa.text(RECEIPT_PRESENT),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('rent_payment', schema=None) as batch_op:
+        batch_op.drop_index('uq_rent_payment_receipt')
+
+    with op.batch_alter_table('contribution', schema=None) as batch_op:
+        batch_op.drop_index('uq_contribution_receipt')
@@ -0,0 +1,38 @@
+"""backfill loan repayments from repayment_amount
+
+Revision ID: 6c1f4a8e3b27
+Revises: 3b8e1d6f2a94
+Create Date: 2026-10-18 21:48:09.731442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1f4a8e3b27'
+down_revision = '3b8e1d6f2a94'
+branch_labels = None
+depends_on = None
+
+OPENING_METHOD = 'Opening balance'
+
+
+def upgrade():
+    # Loans repaid before loan_repayment existed only have the running total:
+    # record the part not yet itemised as one opening-balance repayment
+    op.execute(f"""
+        INSERT INTO loan_repayment (loan_id, amount, paid_date, payment_method)
+        SELECT loan.id,
+               loan.repayment_amount - COALESCE(itemised.total, 0),
+               CURRENT_DATE,
+               '{OPENING_METHOD}'
+          FROM loan
+          LEFT JOIN (SELECT loan_id, SUM(amount) AS total FROM loan_repayment GROUP BY loan_id) itemised
+            ON itemised.loan_id = loan.id
+         WHERE loan.repayment_amount - COALESCE(itemised.total, 0) > 0.005
+    """)
+
+
+def downgrade():
+    op.execute(f"DELETE FROM loan_repayment WHERE payment_method = '{OPENING_METHOD}'")
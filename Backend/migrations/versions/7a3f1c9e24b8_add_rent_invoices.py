@@ -0,0 +1,41 @@
+"""add rent invoices
+
+Revision ID: 7a3f1c9e24b8
+Revises: 0c4e7a2b9d51
+Create Date: 2026-10-18 18:03:44.150672
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3f1c9e24b8'
+down_revision = '0c4e7a2b9d51'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('rent_invoice',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('amount_due', sa.Float(), nullable=False),
+    sa.Column('amount_paid', sa.Float(), nullable=False),
+    sa.Column('tenant_name', sa.String(length=100), nullable=True),
+    sa.Column('tenant_phone', sa.String(length=20), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['property_id'], ['property.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('property_id', 'month', name='uq_rent_invoice_property_month')
+    )
+    with op.batch_alter_table('rent_invoice', schema=None) as batch_op:
+        batch_op.create_index('ix_rent_invoice_month', ['month'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('rent_invoice', schema=None) as batch_op:
+        batch_op.drop_index('ix_rent_invoice_month')
+
+    op.drop_table('rent_invoice')
@@ -0,0 +1,47 @@
+"""add member balance
+
+Revision ID: 8b1d4c07e2a9
+Revises: f65df6ab322b
+Create Date: 2026-10-18 15:02:47.118305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1d4c07e2a9'
+down_revision = 'f65df6ab322b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('member_balance',
+    sa.Column('person_id', sa.Integer(), nullable=False),
+    sa.Column('savings', sa.Float(), nullable=False),
+    sa.Column('outstanding', sa.Float(), nullable=False),
+    sa.Column('pending', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['person_id'], ['person.id'], ),
+    sa.PrimaryKeyConstraint('person_id')
+    )
+
+    # Seed one row per member from the existing records
+    op.execute("""
+        INSERT INTO member_balance (person_id, savings, outstanding, pending, updated_at)
+        SELECT p.id,
+               (SELECT COALESCE(SUM(c.amount), 0) FROM contribution c WHERE c.person_id = p.id),
+               (SELECT COALESCE(SUM(CASE
+                           WHEN l.amount + COALESCE(l.interest, 0) - COALESCE(l.repayment_amount, 0) > 0
+                           THEN l.amount + COALESCE(l.interest, 0) - COALESCE(l.repayment_amount, 0)
+                           ELSE 0 END), 0)
+                  FROM loan l WHERE l.person_id = p.id AND l.status IN ('approved', 'overdue')),
+               (SELECT COALESCE(SUM(l.amount), 0) FROM loan l WHERE l.person_id = p.id AND l.status = 'pending'),
+               CURRENT_TIMESTAMP
+          FROM person p
+    """)
+
+
+def downgrade():
+    op.drop_table('member_balance')
@@ -0,0 +1,34 @@
+"""add report rollups
+
+Revision ID: 94a68870694c
+Revises: 35e3d604a74e
+Create Date: 2026-10-18 12:41:19.270936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '94a68870694c'
+down_revision = '35e3d604a74e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('report_rollup',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('series', sa.String(length=30), nullable=False),
+    sa.Column('month', sa.String(length=7), nullable=False),
+    sa.Column('person_id', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('computed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('series', 'person_id', 'month', name='uq_report_rollup_series_person_month')
+    )
+
+
+def downgrade():
+    op.drop_table('report_rollup')
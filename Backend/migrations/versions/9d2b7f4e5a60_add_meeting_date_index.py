@@ -0,0 +1,26 @@
+"""add meeting date index
+
+Revision ID: 9d2b7f4e5a60
+Revises: 4f8a6e2d9c13
+Create Date: 2026-10-18 19:42:16.048395
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2b7f4e5a60'
+down_revision = '4f8a6e2d9c13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('meeting', schema=None) as batch_op:
+        batch_op.create_index('ix_meeting_date', ['date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('meeting', schema=None) as batch_op:
+        batch_op.drop_index('ix_meeting_date')
@@ -0,0 +1,51 @@
+"""add broadcast notifications and read receipts
+
+Revision ID: a74e05251886
+Revises: 22eb3b7feb5c
+Create Date: 2026-10-18 10:02:47.118904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a74e05251886'
+down_revision = '22eb3b7feb5c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('broadcast_notification',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=120), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('broadcast_notification', schema=None) as batch_op:
+        batch_op.create_index('ix_broadcast_notification_created', ['created_at', 'id'], unique=False)
+
+    op.create_table('broadcast_receipt',
+    sa.Column('broadcast_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('read_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['broadcast_id'], ['broadcast_notification.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('broadcast_id', 'user_id')
+    )
+    with op.batch_alter_table('broadcast_receipt', schema=None) as batch_op:
+        batch_op.create_index('ix_broadcast_receipt_user', ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('broadcast_receipt', schema=None) as batch_op:
+        batch_op.drop_index('ix_broadcast_receipt_user')
+    op.drop_table('broadcast_receipt')
+
+    with op.batch_alter_table('broadcast_notification', schema=None) as batch_op:
+        batch_op.drop_index('ix_broadcast_notification_created')
+    op.drop_table('broadcast_notification')
@@ -0,0 +1,45 @@
+"""add loan repayments and installment count
+
+Revision ID: c397f1948537
+Revises: 94a68870694c
+Create Date: 2026-10-18 13:55:42.604318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c397f1948537'
+down_revision = '94a68870694c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('loan_repayment',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('loan_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('paid_date', sa.Date(), nullable=True),
+    sa.Column('payment_method', sa.String(length=50), nullable=False),
+    sa.Column('receipt_code', sa.String(length=50), nullable=True),
+    sa.Column('recorded_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['loan_id'], ['loan.id'], ),
+    sa.ForeignKeyConstraint(['recorded_by'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('loan_repayment', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_loan_repayment_loan_id'), ['loan_id'], unique=False)
+
+    with op.batch_alter_table('loan', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('installments', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('loan', schema=None) as batch_op:
+        batch_op.drop_column('installments')
+
+    with op.batch_alter_table('loan_repayment', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_loan_repayment_loan_id'))
+    op.drop_table('loan_repayment')
@@ -0,0 +1,28 @@
+"""add loan listing indexes
+
+Revision ID: d2c7a9e51f03
+Revises: 8b1d4c07e2a9
+Create Date: 2026-10-18 15:40:12.604281
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2c7a9e51f03'
+down_revision = '8b1d4c07e2a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('loan', schema=None) as batch_op:
+        batch_op.create_index('ix_loan_request_date', ['request_date'], unique=False)
+        batch_op.create_index('ix_loan_status_request_date', ['status', 'request_date'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('loan', schema=None) as batch_op:
+        batch_op.drop_index('ix_loan_status_request_date')
+        batch_op.drop_index('ix_loan_request_date')
@@ -0,0 +1,33 @@
+"""add loan reminded_at
+
+Revision ID: e8a2c5f07d31
+Revises: 6c1f4a8e3b27
+Create Date: 2026-10-18 22:31:47.205816
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a2c5f07d31'
+down_revision = '6c1f4a8e3b27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('loan', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('reminded_at', sa.DateTime(), nullable=True))
+
+    # Loans inside the window earlier scans already covered have had their reminder
+    op.execute("""
+        UPDATE loan SET reminded_at = CURRENT_TIMESTAMP
+         WHERE status = 'approved'
+           AND due_date <= (SELECT processed_through FROM job_state WHERE name = 'loan_scan')
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('loan', schema=None) as batch_op:
+        batch_op.drop_column('reminded_at')
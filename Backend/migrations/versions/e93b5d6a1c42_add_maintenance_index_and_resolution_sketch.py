@@ -0,0 +1,36 @@
+"""add maintenance status index and resolution sketch
+
+Revision ID: e93b5d6a1c42
+Revises: 7a3f1c9e24b8
+Create Date: 2026-10-18 18:37:20.506913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e93b5d6a1c42'
+down_revision = '7a3f1c9e24b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('maintenance_request', schema=None) as batch_op:
+        batch_op.create_index('ix_maintenance_request_status_reported', ['status', 'reported_date'], unique=False)
+
+    op.create_table('resolution_sketch',
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('bucket', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('property_id', 'bucket')
+    )
+    # Existing history is loaded with `flask maintenance rebuild-sketch`
+
+
+def downgrade():
+    op.drop_table('resolution_sketch')
+
+    with op.batch_alter_table('maintenance_request', schema=None) as batch_op:
+        batch_op.drop_index('ix_maintenance_request_status_reported')
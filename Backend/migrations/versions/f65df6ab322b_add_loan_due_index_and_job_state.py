@@ -0,0 +1,35 @@
+"""add loan status/due_date index and job state
+
+Revision ID: f65df6ab322b
+Revises: c397f1948537
+Create Date: 2026-10-18 14:31:08.992417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f65df6ab322b'
+down_revision = 'c397f1948537'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('loan', schema=None) as batch_op:
+        batch_op.create_index('ix_loan_status_due_date', ['status', 'due_date'], unique=False)
+
+    op.create_table('job_state',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_run_at', sa.DateTime(), nullable=True),
+    sa.Column('processed_through', sa.Date(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('job_state')
+
+    with op.batch_alter_table('loan', schema=None) as batch_op:
+        batch_op.drop_index('ix_loan_status_due_date')
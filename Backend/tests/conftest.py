@@ -0,0 +1,77 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Config reads the environment at import time, so point it at a scratch
+# database before the app package is imported.
+_DB_DIR = tempfile.mkdtemp(prefix="tustahimili-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_DB_DIR, 'test.db')}"
+os.environ["NOTIFY_ASYNC"] = "0"
+os.environ["BCRYPT_LOG_ROUNDS"] = "4"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask_jwt_extended import create_access_token  # noqa: E402
+from app import create_app, db as _db  # noqa: E402
+from app.models import Person, Role, User  # noqa: E402
+from app.utils.auth_utils import principal_cache  # noqa: E402
+from app.utils.response_cache import MemoryBackend, response_cache  # noqa: E402
+
+ROLES = ("Member", "Chairperson", "Treasurer", "Secretary", "Rent Manager")
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def db(app):
+    """Empty tables with the roles seeded, inside an app context."""
+    with app.app_context():
+        _db.drop_all()
+        _db.create_all()
+        _db.session.add_all(Role(name=name) for name in ROLES)
+        _db.session.commit()
+        principal_cache.clear()
+        response_cache.backend = MemoryBackend(app.config["RESPONSE_CACHE_SIZE"])
+        yield _db
+        _db.session.remove()
+
+
+@pytest.fixture
+def client(app, db):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(db):
+    """Create a person with a login in ``role``; returns the User."""
+    count = 0
+
+    def make_user(role="Member", full_name=None):
+        nonlocal count
+        count += 1
+        person = Person(full_name=full_name or f"{role} {count}", phone=f"0799{count:06d}")
+        db.session.add(person)
+        db.session.flush()
+        user = User(email=f"user{count}@example.com", password_hash="x",
+                    role_id=Role.query.filter_by(name=role).first().id, person_id=person.id)
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    return make_user
+
+
+@pytest.fixture
+def auth_header(make_user):
+    """Authorization header for a fresh user in ``role``."""
+    def auth_header(role="Member"):
+        user = make_user(role)
+        return {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+
+    return auth_header
@@ -0,0 +1,91 @@
+from flask_jwt_extended import create_access_token, decode_token
+
+from app import bcrypt
+from app.models import User
+from app.utils.auth_utils import Principal, principal_cache
+from app.utils.passwords import hasher
+
+
+def _headers(user):
+    return {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+
+
+def test_principal_cache_is_sized_from_config(app):
+    assert (principal_cache.maxsize, principal_cache.ttl) == (
+        app.config["PRINCIPAL_CACHE_SIZE"], app.config["PRINCIPAL_CACHE_TTL"]
+    )
+
+
+def test_role_change_evicts_the_cached_principal(client, auth_header, make_user):
+    member = make_user("Member")
+    headers = _headers(member)
+    assert client.get("/api/notifications/dispatch-stats", headers=headers).status_code == 403
+    assert principal_cache.get(member.id).role == "Member"
+
+    response = client.put(f"/api/user/{member.id}/role", headers=auth_header("Chairperson"),
+                          json={"role": "Chairperson"})
+    assert response.status_code == 200
+    assert principal_cache.get(member.id) is None
+    assert client.get("/api/notifications/dispatch-stats", headers=headers).status_code == 200
+    assert principal_cache.get(member.id).role == "Chairperson"
+
+
+def test_requests_are_authorised_from_the_cache(client, make_user):
+    member = make_user("Member")
+    headers = _headers(member)
+    assert client.get("/api/notifications/unread-count", headers=headers).status_code == 200
+
+    # A cached principal is trusted until evicted or expired, without re-reading the role
+    principal_cache.set(member.id, Principal(member.id, member.person_id, member.email, "Chairperson"))
+    assert client.get("/api/notifications/dispatch-stats", headers=headers).status_code == 200
+    principal_cache.delete(member.id)
+    assert client.get("/api/notifications/dispatch-stats", headers=headers).status_code == 403
+
+
+def _register(client, email="ann@example.com", password="pa55word"):
+    response = client.post("/api/auth/register", json={
+        "email": email, "password": password, "role": "Member", "full_name": "Ann", "phone": "0700000001",
+    })
+    assert response.status_code == 201, response.get_json()
+    return User.query.filter_by(email=email).one()
+
+
+def test_login_primes_the_cache_and_leaves_the_role_out_of_the_token(client, db):
+    user = _register(client)
+    principal_cache.clear()
+    body = client.post("/api/auth/login", json={"email": user.email, "password": "pa55word"}).get_json()
+
+    assert body["role"] == "Member"
+    assert "role" not in decode_token(body["token"])
+    assert principal_cache.get(user.id) == Principal(user.id, user.person_id, user.email, "Member")
+
+
+def test_login_rehashes_an_old_cost_factor(client, db):
+    user = _register(client)
+    assert user.password_hash.startswith("$2b$04$")
+    user.password_hash = bcrypt.generate_password_hash("pa55word", 5).decode()
+    db.session.commit()
+
+    assert client.post("/api/auth/login", json={"email": user.email, "password": "wrong"}).status_code == 401
+    assert db.session.get(User, user.id).password_hash.startswith("$2b$05$")
+
+    assert client.post("/api/auth/login", json={"email": user.email, "password": "pa55word"}).status_code == 200
+    new_hash = db.session.get(User, user.id).password_hash
+    assert new_hash.startswith("$2b$04$") and not hasher.needs_rehash(new_hash)
+    assert client.post("/api/auth/login", json={"email": user.email, "password": "pa55word"}).status_code == 200
+
+
+def test_login_answers_503_when_the_hash_pool_is_full(client, db):
+    user = _register(client)
+    slots = hasher._slots
+    taken = 0
+    while slots.acquire(blocking=False):
+        taken += 1
+    try:
+        response = client.post("/api/auth/login", json={"email": user.email, "password": "pa55word"})
+    finally:
+        for _ in range(taken):
+            slots.release()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert client.post("/api/auth/login", json={"email": user.email, "password": "pa55word"}).status_code == 200
@@ -0,0 +1,48 @@
+import csv
+import gzip
+import io
+import json
+from datetime import date
+
+from app.models import Contribution
+from app.utils import export
+
+
+def _contributions(db, person_id, days):
+    db.session.add_all(
+        Contribution(person_id=person_id, amount=100 + day, date=date(2026, 3, day), payment_method="Cash")
+        for day in days
+    )
+    db.session.commit()
+
+
+def test_csv_export_streams_in_chunks(client, auth_header, make_user, db, monkeypatch):
+    monkeypatch.setattr(export, "CHUNK_ROWS", 2)
+    _contributions(db, make_user().person_id, range(1, 6))
+
+    response = client.get("/api/contribution/export", headers=auth_header("Treasurer"))
+    assert response.is_streamed and response.mimetype == "text/csv"
+    assert response.headers["Content-Disposition"] == 'attachment; filename="contributions.csv"'
+    chunks = list(response.response)
+    assert len(chunks) == 3
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+    assert rows[0] == ["id", "member", "amount", "date", "payment_method", "receipt_code"]
+    assert [row[3] for row in rows[1:]] == [f"2026-03-0{day}" for day in (5, 4, 3, 2, 1)]
+
+
+def test_ndjson_export_honours_the_date_range_and_gzip(client, auth_header, make_user, db):
+    _contributions(db, make_user().person_id, range(1, 6))
+
+    response = client.get("/api/contribution/export?format=ndjson&gzip=1&start=2026-03-02&end=2026-03-04",
+                          headers=auth_header("Treasurer"))
+    assert response.mimetype == "application/gzip"
+    assert response.headers["Content-Disposition"] == 'attachment; filename="contributions.ndjson.gz"'
+    lines = gzip.decompress(response.get_data()).decode().splitlines()
+    assert [json.loads(line)["amount"] for line in lines] == [104, 103, 102]
+
+
+def test_bad_export_parameters_are_rejected(client, auth_header, db):
+    headers = auth_header("Treasurer")
+    assert client.get("/api/contribution/export?format=xlsx", headers=headers).status_code == 400
+    assert client.get("/api/contribution/export?start=03/02/2026", headers=headers).status_code == 400
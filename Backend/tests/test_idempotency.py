@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+
+from app.models import Contribution, IdempotencyKey, Notification
+
+BODY = {"amount": 500, "date": "2026-03-01", "payment_method": "Cash"}
+
+
+def _submit(client, headers, key, body=BODY):
+    return client.post("/api/contribution/submit", json=body, headers={**headers, "Idempotency-Key": key})
+
+
+def test_a_retry_replays_the_stored_response(client, auth_header, db):
+    headers = auth_header("Member")
+    first = _submit(client, headers, "pay-1")
+    retry = _submit(client, headers, "pay-1")
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.get_json() == first.get_json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert Contribution.query.count() == 1
+    assert Notification.query.count() == 1
+
+
+def test_reusing_a_key_for_another_body_is_rejected(client, auth_header, db):
+    headers = auth_header("Member")
+    assert _submit(client, headers, "pay-1").status_code == 201
+
+    response = _submit(client, headers, "pay-1", {**BODY, "amount": 900})
+    assert response.status_code == 422
+    assert Contribution.query.count() == 1
+
+
+def test_keys_are_scoped_to_the_user(client, auth_header, db):
+    assert _submit(client, auth_header("Member"), "pay-1").status_code == 201
+    assert _submit(client, auth_header("Member"), "pay-1").status_code == 201
+    assert Contribution.query.count() == 2
+
+
+def test_a_key_still_in_flight_gets_409(client, auth_header, db, app):
+    headers = auth_header("Member")
+    assert _submit(client, headers, "pay-1").status_code == 201
+    row = IdempotencyKey.query.one()
+
+    now = datetime.utcnow()
+    db.session.add(IdempotencyKey(user_id=row.user_id, key="pay-2", endpoint=row.endpoint, request_hash=row.request_hash,
+                                  created_at=now, expires_at=now + timedelta(days=1)))
+    db.session.commit()
+    response = _submit(client, headers, "pay-2")
+    assert response.status_code == 409 and response.headers["Retry-After"] == "1"
+
+    # A claim older than the lock timeout was abandoned (the worker died): the retry runs
+    claim = IdempotencyKey.query.filter_by(key="pay-2").one()
+    claim.created_at = now - timedelta(seconds=app.config.get("IDEMPOTENCY_LOCK_TIMEOUT", 60) + 1)
+    db.session.commit()
+    assert _submit(client, headers, "pay-2").status_code == 201
+    assert Contribution.query.count() == 2
+
+
+def test_expired_keys_run_again(client, auth_header, db):
+    headers = auth_header("Member")
+    assert _submit(client, headers, "pay-1").status_code == 201
+    stored = IdempotencyKey.query.one()
+    stored.expires_at = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+
+    assert _submit(client, headers, "pay-1").status_code == 201
+    assert Contribution.query.count() == 2
@@ -0,0 +1,62 @@
+from datetime import date
+
+from sqlalchemy import func
+
+from app.models import AccountSnapshot, Contribution, JournalLine, Loan, Property, RentPayment
+from app.utils import journal
+
+
+def _post_activity(db, person_id):
+    contribution = Contribution(person_id=person_id, amount=1500.25, payment_method="Cash")
+    loan = Loan(person_id=person_id, amount=2000, interest=200, installments=2, status="pending")
+    flat = Property(name="Flat", monthly_rent=800, is_occupied=True, occupied_since=date(2026, 1, 1))
+    db.session.add_all([contribution, loan, flat])
+    db.session.commit()
+    db.session.add(RentPayment(property_id=flat.id, amount=800, payment_date=date(2026, 2, 3), payment_method="Cash"))
+    loan.status = "approved"
+    db.session.commit()
+    loan.repayment_amount = 700.5
+    contribution.amount = 1200
+    db.session.commit()
+    return contribution
+
+
+def _full_scan():
+    rows = JournalLine.query.with_entities(JournalLine.account, JournalLine.person_id, func.sum(JournalLine.amount_cents))\
+                            .group_by(JournalLine.account, JournalLine.person_id)
+    return {(account, pid): cents for account, pid, cents in rows if cents}
+
+
+def test_every_entry_balances_and_matches_the_base_tables(db, make_user):
+    contribution = _post_activity(db, make_user().person_id)
+    db.session.delete(contribution)
+    db.session.commit()
+
+    unbalanced = JournalLine.query.with_entities(JournalLine.entry_id)\
+                                  .group_by(JournalLine.entry_id)\
+                                  .having(func.sum(JournalLine.amount_cents) != 0).all()
+    assert unbalanced == []
+    assert journal.verify() == []
+    assert sum(journal.balances().values()) == 0
+
+
+def test_snapshot_plus_tail_equals_a_full_scan(db, make_user):
+    person_id = make_user().person_id
+    _post_activity(db, person_id)
+
+    through = journal.take_snapshot()
+    assert through == db.session.query(func.max(JournalLine.entry_id)).scalar()
+    assert journal.take_snapshot() is None
+    assert journal.balances() == _full_scan() == journal.expected_balances()
+
+    # Entries after the snapshot are read from the tail
+    db.session.add(Contribution(person_id=person_id, amount=99.99, payment_method="Cash"))
+    db.session.commit()
+    assert journal.balances() == _full_scan() == journal.expected_balances()
+    assert journal.balances(account="member_savings", person_id=person_id) == {
+        ("member_savings", person_id): -(120000 + 9999)
+    }
+
+    assert journal.take_snapshot() > through
+    assert db.session.query(func.count(func.distinct(AccountSnapshot.through_entry_id))).scalar() == 2
+    assert journal.balances() == _full_scan()
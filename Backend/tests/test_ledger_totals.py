@@ -0,0 +1,77 @@
+import random
+from datetime import date
+
+import pytest
+
+from app.models import Contribution, LedgerTotals, Loan, LOAN_ISSUED_STATUSES, Property, RentPayment
+from app.utils import ledger
+
+
+def _stored():
+    return {field: getattr(LedgerTotals.query.one(), field) for field in ledger.TOTAL_FIELDS}
+
+
+def test_totals_match_a_full_recompute_after_mixed_writes(db, make_user):
+    rng = random.Random(9)
+    person_id = make_user().person_id
+    flat = Property(name="Flat", monthly_rent=900, is_occupied=True, occupied_since=date(2026, 1, 1))
+    db.session.add(flat)
+    db.session.commit()
+
+    rows = []
+    for _ in range(40):
+        rows += [
+            Contribution(person_id=person_id, amount=round(rng.uniform(100, 5000), 2), payment_method="Cash"),
+            Loan(person_id=person_id, amount=round(rng.uniform(500, 9000), 2), interest=round(rng.uniform(0, 500), 2),
+                 installments=1, status=rng.choice(("pending", "rejected") + LOAN_ISSUED_STATUSES)),
+            RentPayment(property_id=flat.id, amount=900, payment_date=date(2026, 2, 1), payment_method="Cash"),
+        ]
+    db.session.add_all(rows)
+    db.session.commit()
+
+    for row in rng.sample(rows, 30):
+        if isinstance(row, Loan):
+            row.status = rng.choice(("pending", "rejected") + LOAN_ISSUED_STATUSES)
+            row.interest = round(rng.uniform(0, 500), 2)
+        else:
+            row.amount = round(rng.uniform(100, 5000), 2)
+    db.session.commit()
+    for row in rng.sample(rows, 15):
+        db.session.delete(row)
+    db.session.commit()
+
+    expected = ledger.compute_totals()
+    for field, value in _stored().items():
+        assert value == pytest.approx(expected[field], abs=0.005), field
+    assert ledger.verify() == {}
+
+
+def test_summary_and_income_read_the_totals(client, auth_header, make_user, db):
+    person_id = make_user().person_id
+    db.session.add_all([
+        Contribution(person_id=person_id, amount=1000, payment_method="Cash"),
+        Loan(person_id=person_id, amount=400, interest=40, installments=1, status="approved"),
+        Loan(person_id=person_id, amount=999, interest=0, installments=1, status="pending"),
+    ])
+    db.session.commit()
+
+    headers = auth_header("Chairperson")
+    summary = client.get("/api/report/summary", headers=headers).get_json()
+    assert (summary["total_contributions"], summary["total_loans_issued"]) == (1000, 400)
+    assert client.get("/api/report/income", headers=headers).get_json()["total_income"] == 1040
+
+
+def test_missing_row_is_created_by_the_first_write_and_drift_is_rebuilt(db, make_user):
+    assert LedgerTotals.query.count() == 0
+    assert set(ledger.verify()) == set(ledger.TOTAL_FIELDS)
+
+    person_id = make_user().person_id
+    db.session.add(Contribution(person_id=person_id, amount=250, payment_method="Cash"))
+    db.session.commit()
+    ledger.apply_deltas(db.session, total_rent=75)
+    db.session.commit()
+    assert _stored() == {"total_contributions": 250, "total_loans_issued": 0, "total_loan_interest": 0, "total_rent": 75}
+    assert ledger.verify() == {"total_rent": (75, 0)}
+
+    ledger.rebuild()
+    assert ledger.verify() == {}
@@ -0,0 +1,57 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.models import Loan, LoanRepayment
+
+
+@pytest.fixture
+def loan(db, make_user):
+    def loan(status="pending", amount=1000.0, interest=100.0):
+        loan = Loan(person_id=make_user().person_id, amount=amount, interest=interest, installments=1,
+                    due_date=date.today() + timedelta(days=30), repayment_amount=0.0, status=status)
+        db.session.add(loan)
+        db.session.commit()
+        return loan.id
+
+    return loan
+
+
+def test_repayments_accumulate_and_close_the_loan(client, auth_header, loan):
+    headers = auth_header("Treasurer")
+    loan_id = loan("approved")
+
+    assert client.post(f"/api/loan/{loan_id}/repay", headers=headers, json={"amount": 600}).status_code == 201
+    response = client.post(f"/api/loan/{loan_id}/repay", headers=headers, json={"amount": 500})
+    assert response.get_json() == {"message": "Repayment recorded", "balance": 0.0, "status": "repaid"}
+    assert Loan.query.get(loan_id).repayment_amount == 1100
+    assert LoanRepayment.query.count() == 2
+
+
+def test_overpayment_is_rejected(client, auth_header, loan):
+    headers = auth_header("Treasurer")
+    loan_id = loan("approved")
+    client.post(f"/api/loan/{loan_id}/repay", headers=headers, json={"amount": 1000})
+
+    response = client.post(f"/api/loan/{loan_id}/repay", headers=headers, json={"amount": 100.01})
+    assert response.status_code == 400
+    assert "100.00" in response.get_json()["message"]
+    assert Loan.query.get(loan_id).repayment_amount == 1000
+    assert LoanRepayment.query.count() == 1
+
+
+@pytest.mark.parametrize("action", ["approve", "reject"])
+@pytest.mark.parametrize("status", ["approved", "rejected", "repaid", "overdue"])
+def test_only_pending_loans_can_be_decided(client, auth_header, loan, action, status):
+    loan_id = loan(status)
+    response = client.post(f"/api/loan/{action}/{loan_id}", headers=auth_header("Chairperson"))
+    assert response.status_code == 400
+    assert Loan.query.get(loan_id).status == status
+
+
+def test_pending_loan_is_approved_once(client, auth_header, loan):
+    headers = auth_header("Chairperson")
+    loan_id = loan()
+    assert client.post(f"/api/loan/approve/{loan_id}", headers=headers).status_code == 200
+    assert client.post(f"/api/loan/reject/{loan_id}", headers=headers).status_code == 400
+    assert Loan.query.get(loan_id).status == "approved"
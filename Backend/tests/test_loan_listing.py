@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.models import Loan
+
+
+@contextmanager
+def count_queries(engine):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def _add_loans(db, make_user, count):
+    for i in range(count):
+        db.session.add(Loan(person_id=make_user().person_id, amount=100.0 + i,
+                            status="approved" if i % 2 else "pending",
+                            due_date=None if i % 3 == 0 else date.today() + timedelta(days=i)))
+    db.session.commit()
+
+
+@pytest.mark.parametrize("loans", [3, 40])
+def test_loan_listing_query_count_is_fixed(client, db, make_user, auth_header, loans):
+    headers = auth_header("Treasurer")
+    _add_loans(db, make_user, loans)
+    # Warm the principal cache so only the listing itself is counted
+    assert client.get("/api/loan/all?per_page=1", headers=headers).status_code == 200
+    db.session.expire_all()
+
+    with count_queries(db.engine) as statements:
+        response = client.get("/api/loan/all?per_page=50", headers=headers)
+    assert response.status_code == 200
+    assert len(response.get_json()["loans"]) == loans
+    # One COUNT for the total, one joined SELECT for the page with its borrowers
+    assert len(statements) == 2, statements
+
+
+def test_loan_listing_filters_and_paginates(client, db, make_user, auth_header):
+    headers = auth_header("Treasurer")
+    _add_loans(db, make_user, 12)
+
+    body = client.get("/api/loan/all?status=approved&sort=amount&order=asc&per_page=4&page=2", headers=headers).get_json()
+    assert body["total"] == 6
+    amounts = [loan["amount"] for loan in body["loans"]]
+    assert amounts == sorted(amounts) and len(amounts) == 2
+    assert all(loan["status"] == "approved" for loan in body["loans"])
+
+    assert client.get("/api/loan/all?sort=bogus", headers=headers).status_code == 400
+    assert client.get("/api/loan/all?start=yesterday", headers=headers).status_code == 400
@@ -0,0 +1,80 @@
+import random
+from datetime import date, timedelta
+
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app.models import Contribution, Loan, LOAN_OPEN_STATUSES
+from app.utils.amortization import portfolio, portfolio_totals, position
+
+
+@pytest.fixture
+def loans(db, make_user):
+    """Open loans spread around today with every installment count, some with no due date."""
+    rng = random.Random(14)
+    person_id = make_user().person_id
+    for i in range(300):
+        amount = round(rng.uniform(500, 80000), 2)
+        db.session.add(Loan(
+            person_id=person_id,
+            amount=amount,
+            interest=round(amount * rng.choice([0, 0.05, 0.1]), 2),
+            installments=rng.randint(1, 12),
+            due_date=None if i % 50 == 0 else date(2026, 1, 1) + timedelta(days=rng.randint(-400, 400)),
+            repayment_amount=round(rng.uniform(0, amount * 1.2), 2) if rng.random() < 0.7 else 0.0,
+            status=rng.choice(LOAN_OPEN_STATUSES + ("pending", "repaid")),
+        ))
+    db.session.commit()
+
+
+# Month ends, leap day and short months exercise the due-day clamping
+@pytest.mark.parametrize("today", [
+    date(2026, 1, 15), date(2026, 1, 31), date(2026, 2, 28), date(2028, 2, 29), date(2025, 11, 30), date(2026, 6, 1),
+])
+def test_sql_portfolio_matches_position(db, loans, today):
+    expected = {
+        loan.id: position(loan.amount, loan.interest, loan.installments, loan.due_date, loan.repayment_amount, today)
+        for loan in Loan.query.filter(Loan.status.in_(LOAN_OPEN_STATUSES))
+    }
+    rows = portfolio(today)
+
+    assert {row["loan_id"] for row in rows} == set(expected)
+    for row in rows:
+        for field, value in expected[row["loan_id"]].items():
+            assert row[field] == pytest.approx(value, abs=0.011), (row["loan_id"], field)
+
+    totals = portfolio_totals(today)
+    assert totals["loans"] == len(expected)
+    assert totals["loans_in_arrears"] == sum(1 for p in expected.values() if p["arrears"] > 0)
+    for field in ("balance", "outstanding_principal", "accrued_interest", "arrears", "repaid"):
+        assert totals[field] == pytest.approx(sum(p[field] for p in expected.values()), abs=0.01 * len(expected))
+
+
+def test_portfolio_reads_backfilled_repayments(client, auth_header, make_user, db):
+    loan = Loan(person_id=make_user().person_id, amount=1000.0, interest=0.0, installments=1,
+                due_date=date.today() + timedelta(days=30), repayment_amount=1000.0, status="approved")
+    db.session.add(loan)
+    db.session.commit()
+
+    body = client.get("/api/loan/portfolio?detail=1", headers=auth_header("Treasurer")).get_json()
+    assert body["loans"][0]["repaid"] == 1000.0
+    assert body["loans"][0]["balance"] == 0.0
+
+
+def test_loan_inputs_are_validated(client, auth_header, make_user, db):
+    member = make_user("Member")
+    db.session.add(Contribution(person_id=member.person_id, amount=1000.0, payment_method="Cash"))
+    db.session.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(identity=str(member.id))}"}
+
+    response = client.post("/api/loan/request", headers=headers,
+                           json={"amount": 10, "due_date": "2030-01-01", "installments": "many"})
+    assert response.status_code == 400
+    assert "installments" in response.get_json()["message"]
+
+    loan = Loan(person_id=make_user().person_id, amount=100.0, status="pending")
+    db.session.add(loan)
+    db.session.commit()
+    response = client.post(f"/api/loan/approve/{loan.id}", headers=auth_header("Treasurer"), json={"interest": "ten"})
+    assert response.status_code == 400
+    assert db.session.get(Loan, loan.id).status == "pending"
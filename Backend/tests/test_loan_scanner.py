@@ -0,0 +1,32 @@
+from datetime import date, timedelta
+
+from app.models import Loan, Notification
+from app.utils.loan_scanner import scan_loans
+
+
+def _loan(db, person_id, due_in, status="approved"):
+    loan = Loan(person_id=person_id, amount=1000.0, status=status, due_date=date.today() + timedelta(days=due_in))
+    db.session.add(loan)
+    db.session.commit()
+    return loan
+
+
+def test_loan_approved_after_a_scan_is_still_reminded(db, make_user):
+    member = make_user()
+    _loan(db, member.person_id, 1)
+    assert scan_loans(days=3)["due_soon"] == 1
+
+    # Due inside the window the first scan already covered
+    _loan(db, member.person_id, 2)
+    assert scan_loans(days=3)["due_soon"] == 1
+    assert scan_loans(days=3)["due_soon"] == 0
+    assert Notification.query.filter_by(user_id=member.id, title="Loan Due Soon").count() == 2
+
+
+def test_overdue_loans_are_flagged_once(db, make_user):
+    member = make_user()
+    loan = _loan(db, member.person_id, -1)
+    assert scan_loans(days=3)["overdue"] == 1
+    assert scan_loans(days=3)["overdue"] == 0
+    assert db.session.get(Loan, loan.id).status == "overdue"
+    assert Notification.query.filter_by(user_id=member.id, title="Loan Overdue").count() == 1
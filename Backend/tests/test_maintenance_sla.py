@@ -0,0 +1,86 @@
+import math
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import MaintenanceRequest, Property, ResolutionSketch
+from app.utils import sla
+
+
+def _exact(values, q):
+    return sorted(values)[math.floor(q * (len(values) - 1))]
+
+
+def test_quantiles_are_within_the_relative_accuracy():
+    rng = random.Random(23)
+    hours = [rng.lognormvariate(3, 1.5) + 1 for _ in range(5000)]
+    buckets = sorted(Counter(sla.bucket_of(h) for h in hours).items())
+
+    result = sla.quantiles(buckets, qs=(0.5, 0.9, 0.99))
+    for q, estimate in result.items():
+        exact = _exact(hours, q)
+        assert abs(estimate - exact) <= sla.RELATIVE_ACCURACY * exact + 0.01, q
+
+
+def test_quantiles_of_an_empty_sketch_are_none():
+    assert sla.quantiles([]) == {0.5: None, 0.9: None}
+
+
+def _resolve_after(client, headers, request_obj, hours, db):
+    request_obj.reported_date = datetime.utcnow() - timedelta(hours=hours)
+    db.session.commit()
+    response = client.post(f"/api/maintenance/resolve/{request_obj.id}", json={"resolution_notes": "done"},
+                           headers=headers)
+    assert response.status_code == 200
+
+
+def test_metrics_report_resolution_percentiles_per_property(client, auth_header, db):
+    headers = auth_header("Chairperson")
+    flats = [Property(name="Block A", monthly_rent=900), Property(name="Block B", monthly_rent=900)]
+    db.session.add_all(flats)
+    db.session.commit()
+
+    durations = {flats[0].id: [2, 4, 6, 8, 10], flats[1].id: [48]}
+    for property_id, hours in durations.items():
+        for h in hours:
+            issue = MaintenanceRequest(property_id=property_id, issue_description="Leak")
+            db.session.add(issue)
+            db.session.commit()
+            _resolve_after(client, headers, issue, h, db)
+
+    # Resolving again only updates the notes
+    again = MaintenanceRequest.query.filter_by(property_id=flats[1].id).one()
+    client.post(f"/api/maintenance/resolve/{again.id}", json={"resolution_notes": "rechecked"}, headers=headers)
+    db.session.add(MaintenanceRequest(property_id=flats[1].id, issue_description="Door"))
+    db.session.commit()
+
+    metrics = client.get("/api/maintenance/metrics", headers=headers).get_json()
+    assert (metrics["resolved"], metrics["open_requests"]) == (6, 1)
+    by_property = {p["property_id"]: p for p in metrics["properties"]}
+    block_a, block_b = by_property[flats[0].id], by_property[flats[1].id]
+    assert block_a["resolved"] == 5 and block_a["open_requests"] == 0
+    assert block_a["p50_hours"] == pytest.approx(6, rel=sla.RELATIVE_ACCURACY)
+    assert block_a["p90_hours"] == pytest.approx(8, rel=sla.RELATIVE_ACCURACY)
+    assert block_b["resolved"] == 1 and block_b["open_requests"] == 1
+    assert block_b["p50_hours"] == pytest.approx(48, rel=sla.RELATIVE_ACCURACY)
+
+
+def test_rebuild_matches_the_incremental_sketch(client, auth_header, db):
+    headers = auth_header("Chairperson")
+    flat = Property(name="Block A", monthly_rent=900)
+    db.session.add(flat)
+    db.session.commit()
+    for h in (1, 3, 30, 200):
+        issue = MaintenanceRequest(property_id=flat.id, issue_description="Leak")
+        db.session.add(issue)
+        db.session.commit()
+        _resolve_after(client, headers, issue, h, db)
+
+    def counts():
+        return {(r.property_id, r.bucket): r.count for r in ResolutionSketch.query}
+
+    incremental = counts()
+    assert sla.rebuild() == 4
+    assert counts() == incremental
@@ -0,0 +1,49 @@
+from datetime import datetime
+from urllib.parse import urlparse
+
+from itsdangerous import URLSafeSerializer
+
+from app.models import Meeting, User
+from app.utils.ical import FEED_SALT, feed_token
+
+
+def _feed_path(client, headers):
+    return urlparse(client.get("/api/meeting/calendar-link", headers=headers).get_json()["url"]).path
+
+
+def test_the_signed_link_serves_the_feed(client, auth_header, db):
+    db.session.add(Meeting(date=datetime(2026, 11, 7, 14, 0), location="Hall, Room 2", description="AGM"))
+    db.session.commit()
+
+    response = client.get(_feed_path(client, auth_header("Member")))
+    assert response.status_code == 200 and response.mimetype == "text/calendar"
+    body = response.get_data(as_text=True)
+    assert "DTSTART:20261107T140000\r\n" in body
+    assert "LOCATION:Hall\\, Room 2\r\n" in body
+
+
+def test_tampered_and_foreign_tokens_are_rejected(client, make_user, app, db):
+    user = make_user("Member")
+    token = feed_token(user.id)
+    forged = [
+        ("f" if token[0] != "f" else "e") + token[1:],
+        URLSafeSerializer(app.config["SECRET_KEY"], salt=FEED_SALT).dumps({"user_id": user.id}) + "x",
+        URLSafeSerializer("not-the-secret", salt=FEED_SALT).dumps({"user_id": user.id}),
+        URLSafeSerializer(app.config["SECRET_KEY"], salt="other").dumps({"user_id": user.id}),
+        URLSafeSerializer(app.config["SECRET_KEY"], salt=FEED_SALT).dumps({"id": user.id}),
+        "not-a-token",
+    ]
+    for bad in forged:
+        response = client.get(f"/api/meeting/calendar/{bad}.ics")
+        assert response.status_code == 404, bad
+        assert response.get_json()["message"] == "Invalid calendar link"
+    assert client.get(f"/api/meeting/calendar/{token}.ics").status_code == 200
+
+
+def test_links_stop_working_when_the_user_is_removed(client, make_user, db):
+    user = make_user("Member")
+    token = feed_token(user.id)
+    db.session.delete(db.session.get(User, user.id))
+    db.session.commit()
+
+    assert client.get(f"/api/meeting/calendar/{token}.ics").status_code == 404
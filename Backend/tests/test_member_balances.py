@@ -0,0 +1,84 @@
+from datetime import date, timedelta
+
+from flask_jwt_extended import create_access_token
+
+from app.models import Contribution, Loan, MemberBalance
+from app.utils import balances
+
+
+def _balance(person_id):
+    row = MemberBalance.query.filter_by(person_id=person_id).one()
+    return {field: getattr(row, field) for field in balances.BALANCE_FIELDS}
+
+
+def test_balance_cache_follows_every_write(db, make_user):
+    person_id = make_user().person_id
+    contribution = Contribution(person_id=person_id, amount=1000, payment_method="Cash")
+    loan = Loan(person_id=person_id, amount=500, interest=50, installments=1, status="pending")
+    db.session.add_all([contribution, loan])
+    db.session.commit()
+    assert _balance(person_id) == {"savings": 1000, "outstanding": 0, "pending": 500}
+
+    loan.status = "approved"
+    contribution.amount = 1200
+    db.session.commit()
+    assert _balance(person_id) == {"savings": 1200, "outstanding": 550, "pending": 0}
+
+    loan.repayment_amount = 550
+    loan.status = "repaid"
+    db.session.delete(contribution)
+    db.session.commit()
+    assert _balance(person_id) == {"savings": 0, "outstanding": 0, "pending": 0}
+    assert balances.verify() == {}
+
+
+def test_first_write_for_a_member_upserts(db, make_user):
+    person_id = make_user().person_id
+    # Both calls find no row; the second lands on the conflict path and adds
+    balances.apply_deltas(db.session, {person_id: {"savings": 10.0}})
+    balances.apply_deltas(db.session, {person_id: {"savings": 5.0, "pending": 2.0}})
+    db.session.commit()
+    assert _balance(person_id) == {"savings": 15.0, "outstanding": 0, "pending": 2.0}
+
+    db.session.execute(MemberBalance.__table__.delete())
+    db.session.commit()
+    assert balances.verify() == {}
+    assert balances.rebuild() == 0
+
+
+def test_drift_is_reported_and_rebuilt(db, make_user):
+    person_id = make_user().person_id
+    db.session.add(Contribution(person_id=person_id, amount=300, payment_method="Cash"))
+    db.session.commit()
+    db.session.get(MemberBalance, person_id).savings = 1
+    db.session.commit()
+
+    assert balances.verify() == {person_id: {"savings": (1, 300)}}
+    balances.rebuild()
+    assert balances.verify() == {}
+
+
+def test_loan_requests_are_capped_by_eligibility(client, make_user, db, app):
+    user = make_user("Member")
+    headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+    db.session.add(Contribution(person_id=user.person_id, amount=1000, payment_method="Cash"))
+    db.session.commit()
+    due = (date.today() + timedelta(days=60)).isoformat()
+
+    limits = client.get("/api/loan/eligibility", headers=headers).get_json()
+    assert (limits["limit"], limits["available"]) == (3000, 3000)
+
+    response = client.post("/api/loan/request", headers=headers, json={"amount": 3000.01, "due_date": due})
+    assert response.status_code == 400
+    assert response.get_json()["eligibility"]["available"] == 3000
+
+    assert client.post("/api/loan/request", headers=headers, json={"amount": 2000, "due_date": due}).status_code == 201
+    # The pending request counts against the limit
+    assert client.get("/api/loan/eligibility", headers=headers).get_json()["available"] == 1000
+    assert client.post("/api/loan/request", headers=headers, json={"amount": 1500, "due_date": due}).status_code == 400
+
+    app.config["LOAN_ELIGIBILITY_COUNT_PENDING"] = False
+    try:
+        assert client.get("/api/loan/eligibility", headers=headers).get_json()["available"] == 3000
+    finally:
+        app.config["LOAN_ELIGIBILITY_COUNT_PENDING"] = True
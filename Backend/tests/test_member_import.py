@@ -0,0 +1,37 @@
+from app.models import User
+from app.routes.user import IMPORT_MAX_ROWS
+from app.utils.passwords import hasher
+
+
+def _members(count):
+    return [
+        {"full_name": f"Member {i}", "phone": f"0711{i:06d}", "email": f"m{i}@example.com", "password": "secret"}
+        for i in range(count)
+    ]
+
+
+def test_import_hashes_every_member(client, auth_header):
+    response = client.post("/api/user/import", headers=auth_header("Chairperson"), json=_members(5))
+    assert response.status_code == 201
+    assert response.get_json()["created"] == 5
+    assert all(hasher.check(u.password_hash, "secret") for u in User.query.filter(User.email.like("m%")))
+
+
+def test_import_returns_503_when_hashing_times_out(client, auth_header, monkeypatch):
+    monkeypatch.setattr(hasher, "bulk_timeout", 0)
+    response = client.post("/api/user/import", headers=auth_header("Chairperson"), json=_members(50))
+    assert response.status_code == 503
+    assert response.headers["Retry-After"]
+    assert User.query.count() == 1
+
+
+def test_import_returns_503_while_another_import_is_hashing(client, auth_header):
+    headers = auth_header("Chairperson")
+    with hasher._bulk_slot:
+        response = client.post("/api/user/import", headers=headers, json=_members(1))
+    assert response.status_code == 503
+
+
+def test_import_row_cap(client, auth_header):
+    response = client.post("/api/user/import", headers=auth_header("Chairperson"), json=_members(IMPORT_MAX_ROWS + 1))
+    assert response.status_code == 400
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from app.models import Contribution, Loan, Person
+
+
+@pytest.fixture
+def members(db):
+    """A generated membership with random contributions and loans (some members have neither)."""
+    rng = random.Random(12)
+    people = [Person(full_name=f"Member {i:03d}", phone=f"0711{i:06d}") for i in range(120)]
+    db.session.add_all(people)
+    db.session.flush()
+
+    for person in people:
+        for _ in range(rng.randint(0, 6)):
+            db.session.add(Contribution(person_id=person.id, amount=round(rng.uniform(50, 5000), 2),
+                                        payment_method=rng.choice(["M-Pesa", "Cash"])))
+        for _ in range(rng.randint(0, 3)):
+            amount = round(rng.uniform(1000, 50000), 2)
+            status = rng.choice(["pending", "approved", "repaid", "rejected"])
+            repaid = round(rng.uniform(0, amount), 2) if status in ("approved", "repaid") else 0.0
+            db.session.add(Loan(person_id=person.id, amount=amount, status=status, repayment_amount=repaid))
+    db.session.commit()
+    return people
+
+
+def test_members_report_matches_member_report(client, auth_header, members):
+    headers = auth_header("Treasurer")
+
+    rows, page = [], 1
+    while True:
+        response = client.get(f"/api/report/members?sort=id&per_page=50&page={page}", headers=headers)
+        assert response.status_code == 200
+        body = response.get_json()
+        rows += body["members"]
+        if page * body["per_page"] >= body["total"]:
+            break
+        page += 1
+
+    # Every person, including the Treasurer account created for the request
+    assert len(rows) == Person.query.count()
+    for row in rows:
+        single = client.get(f"/api/report/member/{row['person_id']}", headers=headers).get_json()
+        assert row["member_name"] == single["member_name"]
+        assert row["phone"] == single["phone"]
+        for field in ("contributions", "loans_taken", "loans_repaid"):
+            assert row[field] == pytest.approx(single[field]), (row["person_id"], field)
+
+
+def test_members_report_sorts_filters_and_paginates(client, auth_header, members):
+    headers = auth_header("Treasurer")
+
+    body = client.get("/api/report/members?sort=contributions&order=desc&per_page=10", headers=headers).get_json()
+    totals = [row["contributions"] for row in body["members"]]
+    assert totals == sorted(totals, reverse=True)
+    assert len(body["members"]) == 10
+
+    body = client.get("/api/report/members?q=Member 00", headers=headers).get_json()
+    assert body["total"] == 10
+    assert all(row["member_name"].startswith("Member 00") for row in body["members"])
+
+    assert client.get("/api/report/members?sort=bogus", headers=headers).status_code == 400
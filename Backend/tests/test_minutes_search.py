@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from sqlalchemy import text
+
+from app.models import Meeting, Minute
+from app.utils import search
+
+
+def _minute(db, make_user, content):
+    writer = make_user("Secretary")
+    meeting = Meeting(date=datetime(2026, 3, 1, 10), location="Hall", created_by=writer.id)
+    db.session.add(meeting)
+    db.session.flush()
+    minute = Minute(meeting_id=meeting.id, content=content, written_by=writer.id)
+    db.session.add(minute)
+    db.session.commit()
+    return minute
+
+
+def test_search_works_on_a_create_all_database(db, make_user):
+    minute = _minute(db, make_user, "The members agreed to raise the welfare contribution.")
+    [hit] = search.search_minutes("welfare contrib")
+    assert hit["minute_id"] == minute.id
+    assert "<mark>" in hit["snippet"]
+
+
+def test_missing_fts_table_is_rebuilt_on_the_next_write(db, make_user):
+    first = _minute(db, make_user, "Loan committee report on arrears.")
+    db.session.execute(text("DROP TABLE minute_fts"))
+    db.session.commit()
+    search._ready.clear()
+
+    _minute(db, make_user, "Treasurer presented the arrears list.")
+    # The rebuild picks up the minute written before the table went missing
+    hits = {hit["minute_id"] for hit in search.search_minutes("arrears")}
+    assert first.id in hits and len(hits) == 2
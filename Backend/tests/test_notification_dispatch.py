@@ -0,0 +1,39 @@
+import pytest
+
+from app.models import Notification
+from app.utils.dispatch import NotificationDispatcher
+
+
+@pytest.fixture
+def async_dispatch(app, db):
+    """A private dispatcher running its worker threads against the test database."""
+    app.config["NOTIFY_ASYNC"] = True
+    registered = app.extensions["notify_dispatcher"]
+    dispatcher = NotificationDispatcher()
+    yield dispatcher
+    dispatcher.shutdown(timeout=5)
+    app.extensions["notify_dispatcher"] = registered
+    app.config["NOTIFY_ASYNC"] = False
+
+
+def _rows(user_id, count, title):
+    return [{"user_id": user_id, "title": title, "message": "m", "is_read": False} for _ in range(count)]
+
+
+def test_reinitialising_stops_the_old_workers_after_draining(app, async_dispatch, make_user):
+    user_id = make_user().id
+    async_dispatch.init_app(app)
+    assert async_dispatch.submit(_rows(user_id, 30, "first"))
+    old_workers = list(async_dispatch._workers)
+    assert old_workers
+
+    async_dispatch.init_app(app)
+    assert not any(worker.is_alive() for worker in old_workers)
+    assert Notification.query.filter_by(title="first").count() == 30
+
+    # New workers serve the new queue, and flush waits on that queue
+    assert async_dispatch.submit(_rows(user_id, 20, "second"))
+    assert async_dispatch.flush(timeout=5)
+    assert Notification.query.filter_by(title="second").count() == 20
+    assert async_dispatch.counters() == {"written": 50, "failed": 0, "dropped": 0}
+    assert async_dispatch.stats()["queue_depth"] == 0
@@ -0,0 +1,123 @@
+import json
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app.models import BroadcastNotification, BroadcastReceipt, Notification, User
+from app.utils import notify
+from app.utils.notify import send_broadcast, send_notification, send_notifications_bulk
+
+
+def test_inbox_limit_is_clamped(client, auth_header):
+    headers = auth_header("Member")
+    user = User.query.one()
+    send_notifications_bulk([user.id, user.id, user.id], "Hello", "Welcome")
+
+    for limit in (0, -5):
+        response = client.get(f"/api/notifications/?limit={limit}", headers=headers)
+        assert response.status_code == 200
+        assert len(response.get_json()) == 1
+        assert "X-Next-Cursor" in response.headers
+
+    assert len(client.get("/api/notifications/?limit=1000", headers=headers).get_json()) == 3
+
+
+def test_fan_out_writes_every_row_in_one_insert(db, make_user):
+    user_ids = [make_user().id for _ in range(25)]
+    inserts = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("INSERT INTO NOTIFICATION"):
+            inserts.append(len(parameters) if executemany else 1)
+
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        assert send_notifications_bulk(user_ids, "Meeting", "Saturday 10am") == 25
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+
+    assert inserts == [25]
+    rows = Notification.query.order_by(Notification.user_id).all()
+    assert [n.user_id for n in rows] == sorted(user_ids)
+    assert {(n.title, n.is_read) for n in rows} == {("Meeting", False)}
+    assert len({n.created_at for n in rows}) == 1
+
+
+def test_fan_out_is_queued_when_dispatch_is_async(app, db, make_user, monkeypatch):
+    queued = []
+    monkeypatch.setattr(notify.dispatcher, "submit", lambda rows: queued.extend(rows) or True)
+    assert send_notifications_bulk([make_user().id, make_user().id], "Hi", "There") == 2
+    assert len(queued) == 2
+    assert Notification.query.count() == 0
+
+
+def _headers(user):
+    return {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+
+
+def test_broadcast_is_one_row_with_per_member_receipts(client, auth_header, make_user):
+    first, second = _headers(make_user()), _headers(make_user())
+    response = client.post("/api/meeting/create", headers=auth_header("Secretary"),
+                           json={"date": "2031-01-04 10:00", "location": "Hall"})
+    assert response.status_code == 201
+    assert BroadcastNotification.query.count() == 1
+    assert Notification.query.count() == 0
+
+    [item] = client.get("/api/notifications/", headers=first).get_json()
+    assert (item["type"], item["is_read"]) == ("broadcast", False)
+    assert client.get("/api/notifications/unread-count", headers=first).get_json() == {"unread": 1}
+
+    mark = {"broadcast_ids": [item["id"]]}
+    assert client.post("/api/notifications/read", headers=first, json=mark).get_json() == {"updated": 1}
+    assert client.post("/api/notifications/read", headers=first, json=mark).get_json() == {"updated": 0}
+    assert client.get("/api/notifications/", headers=first).get_json()[0]["is_read"] is True
+    assert client.get("/api/notifications/unread-count", headers=first).get_json() == {"unread": 0}
+    # Read state is per member
+    assert client.get("/api/notifications/unread-count", headers=second).get_json() == {"unread": 1}
+    assert BroadcastReceipt.query.count() == 1
+
+
+def test_broadcasts_before_joining_are_not_delivered(client, make_user):
+    send_broadcast("Old news", "Sent before the member joined")
+    newcomer = _headers(make_user())
+
+    assert client.get("/api/notifications/", headers=newcomer).get_json() == []
+    assert client.get("/api/notifications/unread-count", headers=newcomer).get_json() == {"unread": 0}
+    assert client.post("/api/notifications/read", headers=newcomer, json={"all": True}).get_json() == {"updated": 0}
+    assert BroadcastReceipt.query.count() == 0
+
+
+def _events(chunks, count):
+    """The next ``count`` notification events from an SSE body, skipping keepalives."""
+    events = []
+    while len(events) < count:
+        chunk = next(chunks).decode()
+        if "event: notification" in chunk:
+            fields = dict(line.split(": ", 1) for line in chunk.strip().split("\n"))
+            events.append((fields["id"], json.loads(fields["data"])))
+    return events
+
+
+def test_stream_sends_new_notifications_and_resumes_from_last_event_id(client, make_user, app, db, monkeypatch):
+    monkeypatch.setitem(app.config, "NOTIFY_STREAM_HEARTBEAT", 0.05)
+    user = make_user("Member")
+    user_id, headers = user.id, _headers(user)  # the stream closes the test's session
+    send_notification(user_id, "Before", "already in the inbox")
+
+    response = client.get("/api/notifications/stream", headers=headers)
+    assert response.mimetype == "text/event-stream"
+    chunks = iter(response.response)
+    assert next(chunks).decode().startswith("retry: ")
+    send_notification(user_id, "Live", "arrived while connected")
+    [(live_id, live)] = _events(chunks, 1)
+    assert live["title"] == "Live"
+    response.close()
+
+    send_notification(user_id, "Missed", "arrived while disconnected")
+    resumed = client.get("/api/notifications/stream", headers={**headers, "Last-Event-ID": live_id})
+    chunks = iter(resumed.response)
+    next(chunks)
+    assert [event["title"] for _, event in _events(chunks, 1)] == ["Missed"]
+    resumed.close()
+
+    assert client.get("/api/notifications/stream", headers={**headers, "Last-Event-ID": "bogus"}).status_code == 400
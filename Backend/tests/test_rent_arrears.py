@@ -0,0 +1,105 @@
+from datetime import date
+
+from app.models import Property, RentInvoice, RentPayment
+from app.utils.arrears import run_invoicing
+from app.utils.periods import add_months, current_month, month_key
+
+
+def _months_ago(n):
+    today = date.today()
+    return month_key(*add_months(today.year, today.month, -n))
+
+
+def test_arrears_is_read_only_and_bills_from_the_let_date(client, auth_header):
+    headers = auth_header("Rent Manager")
+    response = client.post("/api/rent/property", headers=headers,
+                           json={"name": "Flat 1", "monthly_rent": 1000, "tenant_name": "New tenant"})
+    assert response.status_code == 201
+
+    body = client.get("/api/rent/arrears", headers=headers).get_json()
+    assert RentInvoice.query.count() == 0
+    [flat] = body["properties"]
+    assert [m["month"] for m in flat["months"]] == [current_month()]
+    assert body["total_arrears"] == 1000
+
+
+def test_invoicing_job_starts_at_occupied_since(db):
+    let_on = date.fromisoformat(_months_ago(2) + "-15")
+    flat = Property(name="Flat 2", monthly_rent=800, is_occupied=True, occupied_since=let_on)
+    db.session.add(flat)
+    db.session.add(Property(name="Empty", monthly_rent=500, is_occupied=False))
+    db.session.commit()
+    db.session.add(RentPayment(property_id=flat.id, amount=800, payment_date=let_on, payment_method="Cash"))
+    db.session.commit()
+
+    # The current and previous months are invoiced; nothing for the vacant property
+    assert run_invoicing()["invoices_created"] == 2
+    assert run_invoicing()["invoices_created"] == 0
+    assert {i.month for i in RentInvoice.query} == {_months_ago(1), current_month()}
+
+    from app.utils.arrears import arrears
+    [entry] = arrears(_months_ago(5), current_month())
+    assert [m["month"] for m in entry["months"]] == [_months_ago(2), _months_ago(1), current_month()]
+    assert entry["arrears"] == 1600
+
+
+def test_arrears_rejects_bad_ranges(client, auth_header):
+    headers = auth_header("Rent Manager")
+    for query, message in [
+        ("start=2026-01&end=garbage", "YYYY-MM"),
+        ("start=garbage", "YYYY-MM"),
+        ("start=2026-05&end=2026-01", "after"),
+        ("start=1960-01", "months per request"),
+    ]:
+        response = client.get(f"/api/rent/arrears?{query}", headers=headers)
+        assert response.status_code == 400, query
+        assert message in response.get_json()["message"]
+
+
+def test_portfolio_cache_rolls_over_with_the_month(client, auth_header, monkeypatch):
+    import app.utils.periods as periods
+
+    headers = auth_header("Rent Manager")
+    assert client.get("/api/rent/portfolio", headers=headers).get_json()["as_of"] == current_month()
+
+    class Later(date):
+        @classmethod
+        def today(cls):
+            return date(2031, 3, 5)
+
+    monkeypatch.setattr(periods, "date", Later)
+    assert client.get("/api/rent/portfolio", headers=headers).get_json()["as_of"] == "2031-03"
+
+
+def test_property_let_after_the_invoicing_run_still_shows_arrears(client, auth_header):
+    headers = auth_header("Rent Manager")
+    client.post("/api/rent/property", headers=headers, json={"name": "Flat A", "monthly_rent": 1000})
+    assert run_invoicing()["invoices_created"] == 1
+
+    # Let after this month's run: no invoice yet, so the month is computed live
+    client.post("/api/rent/property", headers=headers, json={"name": "Flat B", "monthly_rent": 600})
+    body = client.get("/api/rent/arrears", headers=headers).get_json()
+    assert {p["property"]: p["arrears"] for p in body["properties"]} == {"Flat A": 1000, "Flat B": 600}
+    assert body["total_arrears"] == 1600
+    assert RentInvoice.query.count() == 1
+
+
+def test_portfolio_potential_starts_at_the_let_date(client, auth_header, db):
+    headers = auth_header("Rent Manager")
+    let_on = date.fromisoformat(_months_ago(2) + "-20")
+    recent = Property(name="Recent", monthly_rent=1000, is_occupied=True, occupied_since=let_on)
+    older = Property(name="Older", monthly_rent=500, is_occupied=True, occupied_since=date(2000, 1, 1))
+    db.session.add_all([recent, older])
+    db.session.commit()
+    db.session.add_all(
+        RentPayment(property_id=recent.id, amount=1000, payment_date=date.fromisoformat(_months_ago(n) + "-25"),
+                    payment_method="Cash")
+        for n in range(3)
+    )
+    db.session.commit()
+
+    body = client.get("/api/rent/portfolio", headers=headers).get_json()
+    rates = {p["name"]: p["collection_rate_12m"] for p in body["properties"]}
+    # Let two months ago: three billed months, all paid
+    assert rates == {"Recent": 1.0, "Older": 0.0}
+    assert body["totals"]["potential_12m"] == 3 * 1000 + 12 * 500
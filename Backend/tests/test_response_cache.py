@@ -0,0 +1,57 @@
+from sqlalchemy import insert
+
+from app.models import Contribution
+from app.utils.response_cache import mark_dirty, response_cache
+
+
+def _summary(client, headers, etag=None):
+    if etag:
+        headers = {**headers, "If-None-Match": f'"{etag}"'}
+    return client.get("/api/report/summary", headers=headers)
+
+
+def test_repeat_reads_answer_304_until_a_write_commits(client, auth_header, make_user, db):
+    person_id = make_user().person_id
+    headers = auth_header("Chairperson")
+
+    first = _summary(client, headers)
+    etag = first.headers["ETag"].strip('"')
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "private, no-cache"
+
+    again = _summary(client, headers, etag)
+    assert again.status_code == 304 and again.get_data() == b""
+    assert again.headers["ETag"] == first.headers["ETag"]
+
+    db.session.add(Contribution(person_id=person_id, amount=750, payment_method="Cash"))
+    db.session.commit()
+
+    changed = _summary(client, headers, etag)
+    assert changed.status_code == 200
+    assert changed.get_json()["total_contributions"] == first.get_json()["total_contributions"] + 750
+    assert changed.headers["ETag"] != first.headers["ETag"]
+
+
+def test_rolled_back_writes_keep_the_cached_response(client, auth_header, make_user, db):
+    person_id = make_user().person_id
+    headers = auth_header("Chairperson")
+    etag = _summary(client, headers).headers["ETag"].strip('"')
+
+    db.session.add(Contribution(person_id=person_id, amount=750, payment_method="Cash"))
+    db.session.flush()
+    db.session.rollback()
+
+    assert _summary(client, headers, etag).status_code == 304
+
+
+def test_bulk_writes_invalidate_through_mark_dirty(client, auth_header, make_user, db):
+    person_id = make_user().person_id
+    headers = auth_header("Chairperson")
+    before = response_cache.versions(["contribution"])
+    etag = _summary(client, headers).headers["ETag"].strip('"')
+
+    db.session.execute(insert(Contribution), [{"person_id": person_id, "amount": 10, "payment_method": "Cash"}])
+    mark_dirty(db.session, "contribution")
+    db.session.commit()
+
+    assert response_cache.versions(["contribution"]) == (before[0] + 1,)
+    assert _summary(client, headers, etag).status_code == 200
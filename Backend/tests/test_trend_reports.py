@@ -0,0 +1,59 @@
+from datetime import date
+
+from app.models import Contribution, Loan, ReportRollup
+
+
+def _contribute(db, person_id, day, amount):
+    db.session.add(Contribution(person_id=person_id, amount=amount, date=day, payment_method="Cash"))
+
+
+def test_months_are_bucketed_by_period(client, auth_header, make_user, db):
+    person_id = make_user().person_id
+    for day, amount in [(date(2024, 1, 5), 100), (date(2024, 3, 31), 50), (date(2024, 4, 1), 25),
+                        (date(2024, 12, 20), 10), (date(2025, 2, 1), 7)]:
+        _contribute(db, person_id, day, amount)
+    db.session.add(Loan(person_id=person_id, amount=900, request_date=date(2024, 2, 1), installments=1, status="approved"))
+    db.session.add(Loan(person_id=person_id, amount=400, request_date=date(2024, 2, 1), installments=1, status="pending"))
+    db.session.commit()
+    headers = auth_header("Treasurer")
+
+    def series(period, name="contributions"):
+        body = client.get(f"/api/report/trends?period={period}&start=2024-01&end=2025-03", headers=headers).get_json()
+        return {b["period"]: (b["total"], b["count"]) for b in body["series"][name] if b["count"]}
+
+    assert series("month") == {"2024-01": (100, 1), "2024-03": (50, 1), "2024-04": (25, 1),
+                               "2024-12": (10, 1), "2025-02": (7, 1)}
+    assert series("quarter") == {"2024-Q1": (150, 2), "2024-Q2": (25, 1), "2024-Q4": (10, 1), "2025-Q1": (7, 1)}
+    assert series("year") == {"2024": (185, 4), "2025": (7, 1)}
+    # Only issued loans count
+    assert series("year", "loans") == {"2024": (900, 1)}
+
+
+def test_closed_months_are_cached_and_invalidated_by_writes(client, auth_header, make_user, db):
+    person_id = make_user().person_id
+    _contribute(db, person_id, date(2024, 5, 3), 40)
+    db.session.commit()
+    headers = auth_header("Treasurer")
+    url = "/api/report/trends?period=year&start=2024-01&end=2024-12&series=contributions"
+
+    assert client.get(url, headers=headers).get_json()["series"]["contributions"][0]["total"] == 40
+    assert ReportRollup.query.filter_by(series="contributions").count() == 12
+
+    _contribute(db, person_id, date(2024, 5, 20), 60)
+    db.session.commit()
+    assert ReportRollup.query.filter_by(series="contributions", month="2024-05").count() == 0
+    assert client.get(url, headers=headers).get_json()["series"]["contributions"][0]["total"] == 100
+
+
+def test_trends_rejects_bad_and_oversized_ranges(client, auth_header):
+    headers = auth_header("Treasurer")
+    for query, message in [
+        ("start=1900-01&end=2025-12", "months per request"),
+        ("start=2025-06&end=2025-01", "after"),
+        ("start=2025-13", "YYYY-MM"),
+        ("period=week", "period"),
+    ]:
+        response = client.get(f"/api/report/trends?{query}", headers=headers)
+        assert response.status_code == 400, query
+        assert message in response.get_json()["message"]
+    assert client.get("/api/report/trends?start=2016-01&end=2025-12", headers=headers).status_code == 200